@@ -7,12 +7,22 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 
-# Beat 排程：每分鐘執行一次 flush_comment_counts
+# Beat 排程：每分鐘補跑一次 flush_counters，防抖排程的任務遺失時計數也不會一直卡在 Redis；
+# 每半小時替熱門貼文預先查核，FACT_CHECK_PREWARM_LIMIT=0 時任務直接結束；
+# 熱門動態每 5 分鐘整批重算，兩次重算之間由計數 flush 增量更新
 app.conf.beat_schedule = {
-    # "flush-comment-counts-every-minute": {
-    #     "task": "threads.tasks.flush_comment_counts",
-    #     "schedule": 10000.0,
-    # },
+    "flush-counters-every-minute": {
+        "task": "threads.tasks.flush_counters",
+        "schedule": 60.0,
+    },
+    "prewarm-fact-checks-every-30-minutes": {
+        "task": "threads.tasks.prewarm_fact_checks",
+        "schedule": 30 * 60.0,
+    },
+    "rebuild-trending-every-5-minutes": {
+        "task": "threads.tasks.rebuild_trending",
+        "schedule": 5 * 60.0,
+    },
 }
 
 
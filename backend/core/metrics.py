@@ -0,0 +1,248 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import redis
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "metrics:requests"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+METRIC_TYPES = {
+    "threads_http_requests_total": "counter",
+    "threads_http_request_duration_seconds": "histogram",
+    "threads_http_sampled_requests_total": "counter",
+    "threads_http_db_queries_total": "counter",
+    "threads_http_db_seconds_total": "counter",
+    "threads_http_redis_calls_total": "counter",
+    "threads_http_redis_seconds_total": "counter",
+    "threads_search_cache_requests_total": "counter",
+}
+
+
+@dataclass
+class RequestRecorder:
+    """單一抽樣請求內累計的 SQL / Redis 次數與耗時"""
+
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    redis_calls: int = 0
+    redis_seconds: float = 0.0
+
+
+# 只有被抽樣的請求會設定 recorder，其餘請求的 Redis 呼叫只多一次 ContextVar 讀取
+current_recorder: ContextVar[Optional[RequestRecorder]] = ContextVar("current_recorder", default=None)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.db_queries += 1
+        recorder.db_seconds += time.perf_counter() - started
+
+
+def install_db_wrapper(sender=None, connection=None, **kwargs):
+    """在連線上常駐 db_execute_wrapper，未抽樣時只多一次 ContextVar 讀取
+
+    async view 的 ORM 查詢在 sync_to_async 的執行緒裡跑，用的是那條執行緒自己的連線，
+    所以不能只在 middleware 外層用 connection.execute_wrapper 包一次，改由 connection_created 掛上。
+    """
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+def _timed(call):
+    def wrapper(*args, **kwargs):
+        recorder = current_recorder.get()
+        if recorder is None:
+            return call(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            recorder.redis_calls += 1
+            recorder.redis_seconds += time.perf_counter() - started
+    return wrapper
+
+
+def instrument_redis(client):
+    """替 client 的單一指令與 pipeline.execute 計時，一次 pipeline 來回算一次呼叫"""
+    client.execute_command = _timed(client.execute_command)
+    make_pipeline = client.pipeline
+
+    def pipeline(*args, **kwargs):
+        pipe = make_pipeline(*args, **kwargs)
+        pipe.execute = _timed(pipe.execute)
+        return pipe
+
+    client.pipeline = pipeline
+    return client
+
+
+def _atimed(call):
+    async def wrapper(*args, **kwargs):
+        recorder = current_recorder.get()
+        if recorder is None:
+            return await call(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await call(*args, **kwargs)
+        finally:
+            recorder.redis_calls += 1
+            recorder.redis_seconds += time.perf_counter() - started
+    return wrapper
+
+
+def instrument_async_redis(client):
+    """redis.asyncio 版本的 instrument_redis"""
+    client.execute_command = _atimed(client.execute_command)
+    make_pipeline = client.pipeline
+
+    def pipeline(*args, **kwargs):
+        pipe = make_pipeline(*args, **kwargs)
+        pipe.execute = _atimed(pipe.execute)
+        return pipe
+
+    client.pipeline = pipeline
+    return client
+
+
+class MetricsRegistry:
+    """行程內累計指標，定期用一個 pipeline 併入 Redis hash
+
+    gunicorn 多個 worker 各自累計，/metrics 讀 Redis 上的總和，不會因為打到不同 worker 而跳動。
+    """
+
+    def __init__(self, client=None, flush_interval=None):
+        self._client = client
+        self._flush_interval = flush_interval
+        self._values: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from threads.infrastructure.cache import redis_client
+            self._client = redis_client
+        return self._client
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is None:
+            from django.conf import settings
+            self._flush_interval = settings.REQUEST_METRICS_FLUSH_INTERVAL_SECONDS
+        return self._flush_interval
+
+    def observe_request(self, route: str, method: str, status: int, duration: float,
+                        recorder: Optional[RequestRecorder] = None) -> None:
+        route_label = (("route", route),)
+        with self._lock:
+            self._values[("threads_http_requests_total", (("method", method), ("route", route), ("status", str(status))))] += 1
+            # 沒落在範圍內的 bucket 也要加 0，確保每個路由都輸出完整的 bucket
+            for bound in DURATION_BUCKETS:
+                self._values[("threads_http_request_duration_seconds_bucket", route_label + (("le", str(bound)),))] += duration <= bound
+            self._values[("threads_http_request_duration_seconds_bucket", route_label + (("le", "+Inf"),))] += 1
+            self._values[("threads_http_request_duration_seconds_sum", route_label)] += duration
+            self._values[("threads_http_request_duration_seconds_count", route_label)] += 1
+            if recorder is not None:
+                self._values[("threads_http_sampled_requests_total", route_label)] += 1
+                self._values[("threads_http_db_queries_total", route_label)] += recorder.db_queries
+                self._values[("threads_http_db_seconds_total", route_label)] += recorder.db_seconds
+                self._values[("threads_http_redis_calls_total", route_label)] += recorder.redis_calls
+                self._values[("threads_http_redis_seconds_total", route_label)] += recorder.redis_seconds
+
+    def increment(self, name: str, labels: Tuple[Tuple[str, str], ...] = (), value: float = 1) -> None:
+        """請求以外的計數（例如快取命中），name 需先登記在 METRIC_TYPES 才會輸出"""
+        with self._lock:
+            self._values[(name, labels)] += value
+
+    def flush_due(self) -> bool:
+        return time.monotonic() - self._last_flush >= self.flush_interval
+
+    def maybe_flush(self) -> None:
+        if self.flush_due():
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            values, self._values = self._values, defaultdict(float)
+            self._last_flush = time.monotonic()
+        if not values:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for (name, labels), value in values.items():
+                pipe.hincrbyfloat(METRICS_KEY, json.dumps([name, labels]), value)
+            pipe.execute()
+        except redis.RedisError as e:
+            # 寫不進去就留到下一輪，指標只會延遲不會遺失
+            logger.warning("[Metrics] 寫入 Redis 失敗: %s", e)
+            with self._lock:
+                for key, value in values.items():
+                    self._values[key] += value
+
+    def collect(self) -> Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]:
+        self.flush()
+        raw = self.client.hgetall(METRICS_KEY)
+        collected = {}
+        for field, value in raw.items():
+            name, labels = json.loads(field)
+            collected[(name, tuple(tuple(label) for label in labels))] = float(value)
+        return collected
+
+    def render(self) -> str:
+        """輸出 Prometheus text exposition format"""
+        collected = self.collect()
+        lines = []
+        for family, metric_type in METRIC_TYPES.items():
+            samples = sorted(
+                ((name, labels, value) for (name, labels), value in collected.items()
+                 if name == family or (metric_type == "histogram" and name.startswith(family + "_"))),
+                key=_sample_sort_key,
+            )
+            if not samples:
+                continue
+            lines.append(f"# TYPE {family} {metric_type}")
+            for name, labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _sample_sort_key(sample):
+    name, labels, _ = sample
+    # le 依數值排序，bucket 才會由小到大列出
+    return name, [(key, float(value) if key == "le" else value) for key, value in labels]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+registry = MetricsRegistry()
+
+
+def metrics_view(request):
+    try:
+        body = registry.render()
+    except redis.RedisError as e:
+        logger.warning("[Metrics] 讀取 Redis 失敗: %s", e)
+        return HttpResponse("metrics unavailable\n", status=503, content_type="text/plain")
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,83 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from core.metrics import RequestRecorder, current_recorder, install_db_wrapper, registry
+
+
+class RequestMetricsMiddleware:
+    """每個請求記錄路由、狀態碼與延遲；抽樣的請求另外統計 SQL / Redis 的次數與耗時並回傳 Server-Timing
+
+    silk 會把每條 SQL 寫進資料庫，只適合開發環境；這裡只在記憶體累計數字，正式環境也能常駐。
+    同時支援 sync 與 async，ASGI 下不會因為這層 middleware 而被切回執行緒。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.REQUEST_METRICS_ENABLED
+        self.sample_rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        if self.enabled:
+            connection_created.connect(install_db_wrapper, dispatch_uid="request_metrics_db_wrapper")
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        recorder = self._sample()
+        # 目前執行緒的連線可能在 middleware 初始化前就已建立，沒經過 connection_created
+        install_db_wrapper(connection=connection)
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self._observe(request, response, recorder, time.perf_counter() - started)
+        registry.maybe_flush()
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        recorder = self._sample()
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self._observe(request, response, recorder, time.perf_counter() - started)
+        if registry.flush_due():
+            await sync_to_async(registry.flush, thread_sensitive=False)()
+        return response
+
+    def _sample(self):
+        return RequestRecorder() if random.random() < self.sample_rate else None
+
+    def _observe(self, request, response, recorder, duration) -> None:
+        if recorder is not None:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={recorder.db_seconds * 1000:.2f};desc="{recorder.db_queries} queries"',
+                f'redis;dur={recorder.redis_seconds * 1000:.2f};desc="{recorder.redis_calls} calls"',
+                f"total;dur={duration * 1000:.2f}",
+            ])
+        registry.observe_request(self._route(request), request.method, response.status_code, duration, recorder)
+
+    def _route(self, request) -> str:
+        # 用路由樣板而非實際路徑當 label，/posts/1 與 /posts/2 才會歸在同一列，也不會讓 label 數量無限成長
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "unmatched"
+        return "/" + match.route
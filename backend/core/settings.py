@@ -6,6 +6,8 @@ load_dotenv()
 
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# 未設定時使用官方 API；測試與本地開發可指向相容的假 LLM 服務
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY")
 ENV = os.getenv("ENV", "feature-dev")
@@ -26,6 +28,84 @@ CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND")
 REDIS_URL = os.getenv("REDIS_URL")
 
+# Home timeline：一般作者發文時 fan-out 到追蹤者的 Redis ZSET，追蹤者過多的作者改為讀取時 pull
+TIMELINE_MAX_LENGTH = int(os.getenv("TIMELINE_MAX_LENGTH", 800))
+TIMELINE_TTL_SECONDS = int(os.getenv("TIMELINE_TTL_SECONDS", 3 * 24 * 60 * 60))
+TIMELINE_FANOUT_MAX_FOLLOWERS = int(os.getenv("TIMELINE_FANOUT_MAX_FOLLOWERS", 10000))
+
+# 貼文/留言快照快取（read-through），只存與觀看者無關的欄位
+ENTITY_CACHE_TTL_SECONDS = int(os.getenv("ENTITY_CACHE_TTL_SECONDS", 300))
+
+# 作者摘要快取：行程內 LRU 無法跨行程失效，TTL 要短；Redis 層在使用者更新時清除
+AUTHOR_CACHE_TTL_SECONDS = int(os.getenv("AUTHOR_CACHE_TTL_SECONDS", 60 * 60))
+AUTHOR_CACHE_LOCAL_TTL_SECONDS = int(os.getenv("AUTHOR_CACHE_LOCAL_TTL_SECONDS", 30))
+AUTHOR_CACHE_LOCAL_MAXSIZE = int(os.getenv("AUTHOR_CACHE_LOCAL_MAXSIZE", 10000))
+
+# 計數 flush 的防抖時間窗：同一窗內的寫入只排一次 flush，beat 另外定期補跑
+COUNTER_FLUSH_INTERVAL_SECONDS = int(os.getenv("COUNTER_FLUSH_INTERVAL_SECONDS", 5))
+
+# 列表的 is_liked 判斷方式：exists 為每列一個 EXISTS 子查詢；batch 為取回整頁後一次 IN 查詢
+IS_LIKED_LOOKUP_MODE = os.getenv("IS_LIKED_LOOKUP_MODE", "batch")
+
+# 背景查核（?mode=job）的狀態與結果保留時間
+FACT_CHECK_JOB_TTL_SECONDS = int(os.getenv("FACT_CHECK_JOB_TTL_SECONDS", 24 * 60 * 60))
+
+# 查核結果快取：以正規化後的內容 + prompt + model 為鍵；相同查核進行中時其他請求最多等 INFLIGHT 秒（設定在 OpenAI 逾時之後）
+FACT_CHECK_CACHE_TTL_SECONDS = int(os.getenv("FACT_CHECK_CACHE_TTL_SECONDS", 24 * 60 * 60))
+
+# 查核的網頁搜尋並行送出，整次搜尋（含重試）的時間上限
+FACT_CHECK_SEARCH_TIMEOUT_SECONDS = float(os.getenv("FACT_CHECK_SEARCH_TIMEOUT_SECONDS", 8))
+
+# SerpAPI 搜尋結果快取：同一查詢字串（含 site: 過濾）在 TTL 內直接讀 Redis
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true") == "true"
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", 6 * 60 * 60))
+
+# 對外 HTTP（SerpAPI、OpenAI）：行程內共用連線池，限制連線數並保持 keep-alive；
+# SerpAPI 對 429 / 5xx / 連線錯誤以指數退避重試，OpenAI 由 SDK 依 OPENAI_MAX_RETRIES 重試
+EXTERNAL_HTTP_MAX_CONNECTIONS = int(os.getenv("EXTERNAL_HTTP_MAX_CONNECTIONS", 20))
+EXTERNAL_HTTP_MAX_KEEPALIVE = int(os.getenv("EXTERNAL_HTTP_MAX_KEEPALIVE", 10))
+EXTERNAL_HTTP_KEEPALIVE_SECONDS = float(os.getenv("EXTERNAL_HTTP_KEEPALIVE_SECONDS", 30))
+EXTERNAL_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("EXTERNAL_HTTP_CONNECT_TIMEOUT_SECONDS", 3))
+EXTERNAL_HTTP_RETRIES = int(os.getenv("EXTERNAL_HTTP_RETRIES", 2))
+EXTERNAL_HTTP_BACKOFF_SECONDS = float(os.getenv("EXTERNAL_HTTP_BACKOFF_SECONDS", 0.3))
+EXTERNAL_HTTP_MAX_RETRY_AFTER_SECONDS = float(os.getenv("EXTERNAL_HTTP_MAX_RETRY_AFTER_SECONDS", 5))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 2))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", 60))
+# in-flight 鎖要撐過最慢的一次查核（整次搜尋 + OpenAI 逾時 ×（1 + 重試次數），再留 30 秒給 SDK 的退避），
+# 鎖在查核途中過期，等待的請求會接手再打一次上游
+FACT_CHECK_INFLIGHT_TIMEOUT_SECONDS = int(os.getenv(
+    "FACT_CHECK_INFLIGHT_TIMEOUT_SECONDS",
+    FACT_CHECK_SEARCH_TIMEOUT_SECONDS + OPENAI_TIMEOUT_SECONDS * (1 + OPENAI_MAX_RETRIES) + 30,
+))
+
+# 查核限流：每位使用者的令牌桶（可連續 BURST 次，之後每分鐘補 PER_MINUTE 次），
+# 以及所有行程共用的 LLM 並行上限；超過時回 429 與 Retry-After
+FACT_CHECK_RATE_BURST = int(os.getenv("FACT_CHECK_RATE_BURST", 5))
+FACT_CHECK_RATE_PER_MINUTE = float(os.getenv("FACT_CHECK_RATE_PER_MINUTE", 10))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+# 搜尋在 LLM 名額內進行，每次查核同時送出 4 個搜尋；共用執行緒池至少 4 × LLM_MAX_CONCURRENCY 才不會排隊
+FACT_CHECK_SEARCH_MAX_WORKERS = int(os.getenv("FACT_CHECK_SEARCH_MAX_WORKERS", 4 * LLM_MAX_CONCURRENCY))
+LLM_SEMAPHORE_LEASE_SECONDS = int(os.getenv("LLM_SEMAPHORE_LEASE_SECONDS", 180))
+LLM_SEMAPHORE_RETRY_AFTER_SECONDS = int(os.getenv("LLM_SEMAPHORE_RETRY_AFTER_SECONDS", 5))
+
+# 熱門貼文預先查核：近 WINDOW 小時內讚數 + 轉發數前 LIMIT 名，並行數應小於 LLM_MAX_CONCURRENCY
+FACT_CHECK_PREWARM_LIMIT = int(os.getenv("FACT_CHECK_PREWARM_LIMIT", 20))
+FACT_CHECK_PREWARM_WINDOW_HOURS = float(os.getenv("FACT_CHECK_PREWARM_WINDOW_HOURS", 24))
+FACT_CHECK_PREWARM_CONCURRENCY = int(os.getenv("FACT_CHECK_PREWARM_CONCURRENCY", 2))
+
+# 熱門動態：近 WINDOW 小時的原創貼文依「互動 × 每 HALF_LIFE 小時減半」排序，只保留前 MAX_LENGTH 篇；
+# beat 每 5 分鐘整批重算，計數 flush 時只更新有變動的貼文；超過 TTL 沒有重建（beat 停擺）時由讀取端重建
+TRENDING_WINDOW_HOURS = float(os.getenv("TRENDING_WINDOW_HOURS", 72))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 6))
+TRENDING_MAX_LENGTH = int(os.getenv("TRENDING_MAX_LENGTH", 1000))
+TRENDING_TTL_SECONDS = int(os.getenv("TRENDING_TTL_SECONDS", 30 * 60))
+
+# 請求指標：所有請求記錄次數與延遲，依比例抽樣的請求另外統計 SQL / Redis 並回傳 Server-Timing；
+# 各 worker 在記憶體累計，每隔 FLUSH 秒併入 Redis，由 /metrics 輸出
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "true") == "true"
+REQUEST_METRICS_SAMPLE_RATE = float(os.getenv("REQUEST_METRICS_SAMPLE_RATE", 0.1))
+REQUEST_METRICS_FLUSH_INTERVAL_SECONDS = int(os.getenv("REQUEST_METRICS_FLUSH_INTERVAL_SECONDS", 10))
+
 # Application definition
 INSTALLED_APPS = [
     'rest_framework',
@@ -59,6 +139,7 @@ if DEBUG:
         }
     }
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -21,12 +21,15 @@ from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.http import HttpResponse
 
+from core.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/threads/', include('threads.urls')),  # 這一行很重要
     path("healthz", lambda r: HttpResponse("ok"), name="healthz"),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 
@@ -0,0 +1,66 @@
+import math
+import os
+
+import pytest
+import redis
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.benchmarks.seed import seed_social_graph
+
+BENCH_SCALE = int(os.getenv("BENCH_SCALE", 1))
+BENCH_ROUNDS = int(os.getenv("BENCH_ROUNDS", 20))
+
+
+def _percentile(data, percent):
+    ordered = sorted(data)
+    index = max(math.ceil(len(ordered) * percent / 100) - 1, 0)
+    return ordered[index]
+
+
+@pytest.fixture
+def social_graph(db):
+    from django.contrib.contenttypes.models import ContentType
+    from threads.models import Post, Comment
+    from threads.infrastructure.repository.content_base_repository import ContentBaseRepository
+
+    graph = seed_social_graph(scale=BENCH_SCALE)
+    # ContentType 對照表是整個行程共用的快取，先暖好，查詢數才不會受測試執行順序影響
+    for model in (Post, Comment):
+        ContentBaseRepository.get_content_type_from_ids(ContentType.objects.get_for_model(model).id)
+    return graph
+
+
+@pytest.fixture
+def redis_available():
+    from threads.infrastructure.cache import redis_client
+
+    try:
+        redis_client.ping()
+    except redis.RedisError:
+        pytest.skip("需要 Redis")
+
+
+@pytest.fixture
+def measure(benchmark):
+    """先以冷快取跑一次計算 SQL 數量並檢查上限，再交給 pytest-benchmark 量測延遲並記錄 p50/p99"""
+    def _measure(fn, max_queries):
+        with CaptureQueriesContext(connection) as ctx:
+            fn()
+        queries = len(ctx.captured_queries)
+
+        result = benchmark.pedantic(fn, rounds=BENCH_ROUNDS, warmup_rounds=1, iterations=1)
+        benchmark.extra_info["queries"] = queries
+        benchmark.extra_info["scale"] = BENCH_SCALE
+        if benchmark.stats is not None:
+            data = benchmark.stats.stats.data
+            benchmark.extra_info["p50_ms"] = round(_percentile(data, 50) * 1000, 3)
+            benchmark.extra_info["p99_ms"] = round(_percentile(data, 99) * 1000, 3)
+
+        # 查詢數與資料量無關，超過上限代表出現 N+1
+        assert queries <= max_queries, (
+            f"SQL 查詢數 {queries} 超過上限 {max_queries}:\n"
+            + "\n".join(query["sql"] for query in ctx.captured_queries)
+        )
+        return result
+    return _measure
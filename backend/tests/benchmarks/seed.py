@@ -0,0 +1,92 @@
+import random
+from dataclasses import dataclass, field
+from typing import List
+
+from django.contrib.contenttypes.models import ContentType
+
+from threads.models import User, Follow, Post, Comment, LikePost, LikeComment
+
+USERS_PER_SCALE = 20
+FOLLOWINGS_PER_USER = 10
+POSTS_PER_USER = 10
+COMMENTS_PER_POST = 3
+CHILD_COMMENTS_PER_COMMENT = 2
+LIKES_PER_USER = 20
+REPOST_RATIO = 0.05
+
+
+@dataclass
+class SocialGraph:
+    viewer: User
+    author: User
+    hot_post: Post
+    hot_comment: Comment
+    user_ids: List[int] = field(default_factory=list)
+    post_ids: List[int] = field(default_factory=list)
+    comment_ids: List[int] = field(default_factory=list)
+
+
+def seed_social_graph(scale: int = 1, seed: int = 42) -> SocialGraph:
+    """以 bulk_create 建立假資料，不觸發計數/fan-out signal，計數欄位直接寫入最終值"""
+    rng = random.Random(seed)
+    users = User.objects.bulk_create([
+        User(username=f"benchuser{i}", email=f"benchuser{i}@example.com")
+        for i in range(USERS_PER_SCALE * scale)
+    ])
+
+    follows = set()
+    for user in users:
+        for following in rng.sample(users, min(FOLLOWINGS_PER_USER, len(users) - 1)):
+            if following.id != user.id:
+                follows.add((user.id, following.id))
+    Follow.objects.bulk_create([
+        Follow(follower_id=follower_id, following_id=following_id) for follower_id, following_id in follows
+    ])
+
+    posts = Post.objects.bulk_create([
+        Post(author=user, content=f"{user.username} post {i}")
+        for user in users for i in range(POSTS_PER_USER)
+    ])
+    post_type = ContentType.objects.get_for_model(Post)
+    reposts = Post.objects.bulk_create([
+        Post(
+            author=rng.choice(users), content="repost", is_repost=True,
+            repost_of_content_type=post_type, repost_of_content_item_id=original.id,
+        )
+        for original in rng.sample(posts, int(len(posts) * REPOST_RATIO))
+    ])
+
+    comments = Comment.objects.bulk_create([
+        Comment(author=rng.choice(users), content=f"comment {i}", parent_post=post)
+        for post in posts for i in range(COMMENTS_PER_POST)
+    ])
+    child_comments = Comment.objects.bulk_create([
+        Comment(author=rng.choice(users), content=f"reply {i}", parent_post_id=comment.parent_post_id, parent_comment=comment)
+        for comment in comments for i in range(CHILD_COMMENTS_PER_COMMENT)
+    ])
+
+    post_likes = set()
+    comment_likes = set()
+    for user in users:
+        for post in rng.sample(posts, min(LIKES_PER_USER, len(posts))):
+            post_likes.add((user.id, post.id))
+        for comment in rng.sample(comments, min(LIKES_PER_USER, len(comments))):
+            comment_likes.add((user.id, comment.id))
+    LikePost.objects.bulk_create([LikePost(user_id=user_id, post_id=post_id) for user_id, post_id in post_likes])
+    LikeComment.objects.bulk_create([
+        LikeComment(user_id=user_id, comment_id=comment_id) for user_id, comment_id in comment_likes
+    ])
+
+    viewer = users[0]
+    author = next(user for user in users if (viewer.id, user.id) in follows)
+    hot_post = posts[0]
+    hot_comment = comments[0]
+    return SocialGraph(
+        viewer=viewer,
+        author=author,
+        hot_post=hot_post,
+        hot_comment=hot_comment,
+        user_ids=[user.id for user in users],
+        post_ids=[post.id for post in posts + reposts],
+        comment_ids=[comment.id for comment in comments + child_comments],
+    )
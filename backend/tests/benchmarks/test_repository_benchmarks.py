@@ -0,0 +1,89 @@
+import pytest
+
+from threads.domain.entities import Comment as DomainComment
+from threads.infrastructure.repository.post_repository import PostRepositoryImpl
+from threads.infrastructure.repository.comment_repository import CommentRepositoryImpl
+from threads.infrastructure.repository.like_repository import LikeRepositoryImpl
+from threads.infrastructure.repository.user_repository import UserRepositoryImpl
+from threads.infrastructure.repository.timeline_repository import TimelineRepositoryImpl
+
+PAGE_SIZE = 20
+
+
+def test_get_post_by_id(measure, social_graph):
+    g = social_graph
+    measure(lambda: PostRepositoryImpl().get_post_by_id(g.hot_post.id, g.viewer.id), max_queries=3)
+
+
+def test_get_all_posts(measure, social_graph):
+    g = social_graph
+    measure(lambda: PostRepositoryImpl().get_all_posts(g.viewer.id, 0, PAGE_SIZE), max_queries=3)
+
+
+def test_get_posts_by_author_id(measure, social_graph):
+    g = social_graph
+    measure(lambda: PostRepositoryImpl().get_posts_by_author_id(g.viewer.id, g.author.id, 0, PAGE_SIZE), max_queries=4)
+
+
+def test_get_posts_by_following_ids(measure, social_graph):
+    g = social_graph
+    following_ids = UserRepositoryImpl().get_following_user_ids(g.viewer.id)
+    measure(
+        lambda: PostRepositoryImpl().get_posts_by_following_ids(g.viewer.id, following_ids, 0, PAGE_SIZE),
+        max_queries=3,
+    )
+
+
+def test_get_posts_by_ids(measure, social_graph):
+    g = social_graph
+    measure(lambda: PostRepositoryImpl().get_posts_by_ids(g.viewer.id, g.post_ids[:PAGE_SIZE]), max_queries=3)
+
+
+def test_get_comment_by_id(measure, social_graph):
+    g = social_graph
+    measure(lambda: CommentRepositoryImpl().get_comment_by_id(g.hot_comment.id, g.viewer.id), max_queries=3)
+
+
+def test_get_comments_by_post_id(measure, social_graph):
+    g = social_graph
+    measure(
+        lambda: CommentRepositoryImpl().get_comments_by_post_id(g.viewer.id, g.hot_post.id, 0, PAGE_SIZE),
+        max_queries=4,
+    )
+
+
+def test_get_all_child_comments_by_comment_id(measure, social_graph):
+    g = social_graph
+    parent = DomainComment(
+        id=g.hot_comment.id, author_id=g.hot_comment.author_id, content=g.hot_comment.content,
+        parent_post_id=g.hot_post.id,
+    )
+    measure(
+        lambda: CommentRepositoryImpl().get_all_child_comments_by_comment_id(g.viewer.id, parent, 0, PAGE_SIZE),
+        max_queries=3,
+    )
+
+
+def test_get_comments_by_ids(measure, social_graph):
+    g = social_graph
+    measure(lambda: CommentRepositoryImpl().get_comments_by_ids(g.viewer.id, g.comment_ids[:PAGE_SIZE]), max_queries=3)
+
+
+def test_get_like_by_id(measure, social_graph):
+    g = social_graph
+    measure(lambda: LikeRepositoryImpl().get_like_by_id(g.viewer.id, g.hot_post.id, "post"), max_queries=2)
+
+
+def test_get_user_by_id(measure, social_graph):
+    g = social_graph
+    measure(lambda: UserRepositoryImpl().get_user_by_id(g.author.id), max_queries=1)
+
+
+def test_get_following_user_ids(measure, social_graph):
+    g = social_graph
+    measure(lambda: UserRepositoryImpl().get_following_user_ids(g.viewer.id), max_queries=2)
+
+
+def test_timeline_get_post_ids(measure, social_graph, redis_available):
+    g = social_graph
+    measure(lambda: TimelineRepositoryImpl().get_post_ids(g.viewer.id, 0, PAGE_SIZE), max_queries=2)
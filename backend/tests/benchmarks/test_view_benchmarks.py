@@ -0,0 +1,58 @@
+import pytest
+from rest_framework.test import APIClient
+
+PAGE_SIZE = 20
+
+
+@pytest.fixture
+def client(social_graph):
+    client = APIClient()
+    client.force_authenticate(user=social_graph.viewer)
+    return client
+
+
+def _get(client, url):
+    def _call():
+        response = client.get(url)
+        assert response.status_code == 200, response.content
+        return response
+    return _call
+
+
+def test_posts_list_view(measure, client):
+    measure(_get(client, f"/api/threads/posts/?limit={PAGE_SIZE}"), max_queries=3)
+
+
+def test_posts_list_cursor_view(measure, client):
+    measure(_get(client, f"/api/threads/posts/?cursor=&limit={PAGE_SIZE}"), max_queries=3)
+
+
+def test_profile_posts_view(measure, client, social_graph):
+    measure(_get(client, f"/api/threads/posts/?author_id={social_graph.author.id}&limit={PAGE_SIZE}"), max_queries=4)
+
+
+def test_following_posts_view(measure, client, redis_available):
+    measure(_get(client, f"/api/threads/posts/?following=true&limit={PAGE_SIZE}"), max_queries=5)
+
+
+def test_post_detail_view(measure, client, social_graph):
+    measure(_get(client, f"/api/threads/posts/{social_graph.hot_post.id}"), max_queries=3)
+
+
+def test_post_comments_view(measure, client, social_graph):
+    measure(_get(client, f"/api/threads/posts/{social_graph.hot_post.id}/comments?limit={PAGE_SIZE}"), max_queries=4)
+
+
+def test_child_comments_view(measure, client, social_graph):
+    measure(
+        _get(client, f"/api/threads/comments/{social_graph.hot_comment.id}/child_comments?limit={PAGE_SIZE}"),
+        max_queries=6,
+    )
+
+
+def test_comment_detail_view(measure, client, social_graph):
+    measure(_get(client, f"/api/threads/comments/{social_graph.hot_comment.id}"), max_queries=3)
+
+
+def test_user_profile_view(measure, client, social_graph):
+    measure(_get(client, f"/api/threads/users/{social_graph.author.id}/"), max_queries=1)
@@ -0,0 +1,99 @@
+"""本機假的 OpenAI 相容服務，只實作 /v1/chat/completions
+
+測試把 OpenAI client 的 base_url 指過來，不花額度也能驗證串流行為；
+也可以單獨啟動給前端開發用：python -m tests.fake_llm_server 8001
+"""
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+
+@dataclass
+class FakeLLMConfig:
+    tokens: List[str] = field(default_factory=lambda: ["```markdown\n", "這則", "貼文", "是錯誤的", "[^1]", "\n```"])
+    token_delay: float = 0.0
+    status: int = 200
+    requests: List[dict] = field(default_factory=list)
+    # 每個請求來源的 (host, port)，用來確認 client 是否重用 keep-alive 連線
+    peers: List[tuple] = field(default_factory=list)
+
+
+def _handler(config: FakeLLMConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            config.requests.append(body)
+            config.peers.append(self.client_address)
+            if config.status != 200:
+                return self._json(config.status, {"error": {"message": "fake upstream error", "type": "server_error"}})
+            if body.get("stream"):
+                return self._stream(body["model"])
+            return self._json(200, {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(config.tokens)},
+                             "finish_reason": "stop"}],
+            })
+
+        def _json(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, model):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            deltas = [{"role": "assistant", "content": ""}] + [{"content": token} for token in config.tokens]
+            for index, delta in enumerate(deltas):
+                if index:
+                    time.sleep(config.token_delay)
+                self._chunk(model, delta, None)
+            self._chunk(model, {}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+        def _chunk(self, model, delta, finish_reason):
+            chunk = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+            self.wfile.flush()
+
+    return Handler
+
+
+@contextmanager
+def run_fake_llm_server(config: FakeLLMConfig = None, port: int = 0):
+    """啟動假服務，yield (base_url, config)；port 為 0 時自動挑空的埠"""
+    config = config or FakeLLMConfig()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(config))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1", config
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    with run_fake_llm_server(FakeLLMConfig(token_delay=0.05), port=int(sys.argv[1]) if len(sys.argv) > 1 else 8001) as (url, _):
+        print(f"Fake LLM server listening on {url}，設定 OPENAI_BASE_URL={url}")
+        threading.Event().wait()
@@ -0,0 +1,99 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from rest_framework.test import APIClient
+
+from threads.infrastructure.repository.post_repository import PostRepositoryImpl
+from threads.infrastructure.repository.comment_repository import CommentRepositoryImpl
+from threads.infrastructure.repository.user_repository import UserRepositoryImpl
+from threads.infrastructure.repository.timeline_repository import TimelineRepositoryImpl
+from threads.interface.views.posts.posts_view import PostListCreateView
+from threads.interface.views.posts.post_view import PostDetailView
+from threads.interface.views.comments.post_comments_view import CommentListCreateView
+from threads.interface.views.users.user_view import UserDetailView
+from tests.benchmarks.seed import seed_social_graph
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def graph():
+    return seed_social_graph(scale=1)
+
+
+@pytest.mark.parametrize("view", [PostListCreateView, PostDetailView, CommentListCreateView, UserDetailView])
+def test_read_views_are_async(view):
+    assert view.view_is_async
+    assert iscoroutinefunction(view.as_view())
+
+
+def test_async_post_reads_match_sync(graph):
+    repo = PostRepositoryImpl()
+    viewer, author = graph.viewer.id, graph.author.id
+
+    assert async_to_sync(repo.aget_all_posts)(viewer, 0, 20) == repo.get_all_posts(viewer, 0, 20)
+    assert (
+        async_to_sync(repo.aget_posts_by_author_id)(viewer, author, 0, 20)
+        == repo.get_posts_by_author_id(viewer, author, 0, 20)
+    )
+    # 先讓 sync 版本回填快取，async 版本同時驗證讀快照與回源兩條路徑
+    ids = graph.post_ids[:10]
+    assert async_to_sync(repo.aget_posts_by_ids)(viewer, ids) == repo.get_posts_by_ids(viewer, ids)
+    assert async_to_sync(repo.aget_post_by_id)(graph.hot_post.id, viewer) == repo.get_post_by_id(graph.hot_post.id, viewer)
+
+
+def test_async_comment_user_and_timeline_reads_match_sync(graph):
+    viewer = graph.viewer.id
+    comments = CommentRepositoryImpl()
+    assert (
+        async_to_sync(comments.aget_comments_by_post_id)(viewer, graph.hot_post.id, 0, 20)
+        == comments.get_comments_by_post_id(viewer, graph.hot_post.id, 0, 20)
+    )
+
+    users = UserRepositoryImpl()
+    assert async_to_sync(users.aget_user_by_id)(graph.author.id) == users.get_user_by_id(graph.author.id)
+
+    timeline = TimelineRepositoryImpl()
+    assert async_to_sync(timeline.aget_post_ids)(viewer, 0, 20) == timeline.get_post_ids(viewer, 0, 20)
+
+
+def test_async_views_map_errors_like_sync_views(graph):
+    client = APIClient()
+    client.force_authenticate(user=graph.viewer)
+
+    response = client.get(f"/api/threads/posts/{graph.hot_post.id}")
+    assert response.status_code == 200
+    assert response.data["id"] == graph.hot_post.id
+
+    assert client.get("/api/threads/posts/?author_id=999999").status_code == 404
+    assert client.get("/api/threads/posts/999999/comments").status_code == 404
+    assert client.get("/api/threads/users/999999/").status_code == 404
+    # 未帶 JWT 時由 DRF 的認證流程擋下，async dispatch 仍回 401
+    assert APIClient().get("/api/threads/posts/").status_code == 401
+
+
+def test_wsgi_requests_close_their_loop_bound_redis_client(graph, monkeypatch):
+    from threads.infrastructure import cache
+
+    created, closed = [], []
+    instrument = cache.instrument_async_redis
+
+    def capture(client):
+        created.append(client)
+        aclose = client.aclose
+
+        async def tracked_aclose():
+            closed.append(client)
+            await aclose()
+
+        client.aclose = tracked_aclose
+        return instrument(client)
+
+    monkeypatch.setattr(cache, "instrument_async_redis", capture)
+    client = APIClient()
+    client.force_authenticate(user=graph.viewer)
+    # 測試 client 走 WSGI，每個請求是新的 event loop，用完的連線池要在請求結束時關掉
+    for _ in range(2):
+        assert client.get("/api/threads/posts/?following=true").status_code == 200
+
+    assert len(created) == 2
+    assert closed == created
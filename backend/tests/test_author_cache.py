@@ -0,0 +1,29 @@
+import json
+from unittest.mock import MagicMock
+from threads.infrastructure.author_cache import AuthorCache
+
+
+def _cache(client):
+    return AuthorCache(client=client, ttl=60, local_ttl=30, local_maxsize=2)
+
+
+def test_get_usernames_reads_redis_then_serves_from_local_lru():
+    client = MagicMock()
+    client.mget.return_value = [json.dumps({"username": "alice"}), json.dumps({"username": "bob"})]
+    cache = _cache(client)
+
+    assert cache.get_usernames([1, 2]) == {1: "alice", 2: "bob"}
+    assert cache.get_usernames([2, 1]) == {1: "alice", 2: "bob"}
+    client.mget.assert_called_once_with(["author:1", "author:2"])
+
+
+def test_local_lru_evicts_oldest_and_invalidate_clears_both_layers():
+    client = MagicMock()
+    cache = _cache(client)
+    cache._set_local({1: {"username": "a"}, 2: {"username": "b"}, 3: {"username": "c"}})
+
+    assert set(cache._get_local([1, 2, 3])) == {2, 3}
+
+    cache.invalidate(3)
+    assert cache._get_local([3]) == {}
+    client.delete.assert_called_once_with("author:3")
@@ -0,0 +1,97 @@
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from threads.models import User, Post
+from threads.infrastructure.counters import bulk_increment, buffer_counter_delta, _pending_keys
+
+
+def _model(table):
+    model = MagicMock()
+    model._meta.db_table = table
+    model._meta.get_field.side_effect = lambda name: MagicMock(column=name)
+    return model
+
+
+def test_bulk_increment_merges_all_counters_into_one_update():
+    with patch("threads.infrastructure.counters.connection") as connection:
+        connection.ops.quote_name = lambda name: f'"{name}"'
+        cursor = MagicMock(rowcount=2)
+        connection.cursor.return_value.__enter__.return_value = cursor
+
+        updated = bulk_increment(_model("threads_post"), {
+            7: {"likes_count": 3},
+            2: {"likes_count": -1, "comments_count": 2},
+            5: {"reposts_count": 0},
+        })
+
+    assert updated == 2
+    cursor.execute.assert_called_once()
+    sql, params = cursor.execute.call_args.args
+    assert sql.startswith("WITH v(id, d0, d1) AS (VALUES")
+    assert 'UPDATE "threads_post" SET "comments_count" =' in sql
+    assert '"likes_count" = CASE' in sql
+    assert params == [2, 2, -1, 7, 0, 3]
+
+
+def test_bulk_increment_skips_empty_deltas():
+    with patch("threads.infrastructure.counters.connection") as connection:
+        assert bulk_increment(_model("threads_post"), {1: {"likes_count": 0}}) == 0
+    connection.cursor.assert_not_called()
+
+
+def test_pending_keys_only_visits_dirty_rows_in_batches():
+    with patch("threads.infrastructure.counters._claim_dirty_script", return_value=[b"12", b"3", b"7"]) as claim, \
+         patch("threads.infrastructure.counters.FLUSH_BATCH_SIZE", 2):
+        batches = list(_pending_keys("post"))
+
+    claim.assert_called_once_with(keys=["counters:dirty:post", "counters:flushing:post"])
+    assert batches == [["post:3", "post:7"], ["post:12"]]
+
+
+def test_schedule_counter_flush_enqueues_once_per_window():
+    from threads.tasks import schedule_counter_flush, FLUSH_SCHEDULED_KEY
+
+    with patch("threads.infrastructure.cache.redis_client") as redis_client, \
+         patch("threads.tasks.flush_counters.apply_async") as apply_async:
+        redis_client.set.side_effect = [True, None, None]
+        for _ in range(3):
+            schedule_counter_flush()
+
+    assert redis_client.set.call_args.args[0] == FLUSH_SCHEDULED_KEY
+    assert redis_client.set.call_args.kwargs["nx"] is True
+    apply_async.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_flush_keeps_deltas_until_update_commits():
+    from threads.infrastructure.counters import flush_counters
+    from threads.infrastructure import counters
+
+    author = User.objects.create(username=f"cnt{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex[:8]}@example.com")
+    post = Post.objects.create(author=author, content="計數")
+    buffer_counter_delta("post", post.id, "likes_count", 3)
+
+    # 寫回資料庫前 worker 中斷（逾時、斷線、被砍），增量不能跟著消失
+    with patch.object(counters, "bulk_increment", side_effect=RuntimeError("killed")):
+        with pytest.raises(RuntimeError):
+            flush_counters()
+    post.refresh_from_db()
+    assert post.likes_count == 0
+
+    real_bulk_increment = counters.bulk_increment
+
+    def increment_during_flush(model, deltas):
+        # flush 進行中新進的增量留給下一輪
+        buffer_counter_delta("post", post.id, "likes_count", 1)
+        return real_bulk_increment(model, deltas)
+
+    with patch.object(counters, "bulk_increment", side_effect=increment_during_flush):
+        flush_counters()
+    post.refresh_from_db()
+    assert post.likes_count == 3
+
+    flush_counters()
+    post.refresh_from_db()
+    assert post.likes_count == 4
+    assert not counters.redis_client.exists(f"post:{post.id}")
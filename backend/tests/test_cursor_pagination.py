@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from threads.domain.entities import Post as DomainPost
+from threads.domain.pagination import PageCursor
+from threads.interface.util.cursor_pagination import encode_cursor, decode_cursor, parse_cursor_params, build_cursor_page
+
+
+def test_cursor_round_trip():
+    cursor = PageCursor(created_at=datetime(2025, 7, 14, 4, 21, 5, 123456, tzinfo=timezone.utc), id=42)
+
+    token = encode_cursor(cursor)
+
+    assert "=" not in token
+    assert decode_cursor(token) == cursor
+
+
+def test_invalid_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_cursor_mode_is_enabled_by_empty_cursor_param():
+    assert parse_cursor_params({}) == (False, None)
+    assert parse_cursor_params({"cursor": ""}) == (True, None)
+
+
+def test_next_cursor_only_when_page_is_full():
+    created_at = datetime(2025, 7, 14, tzinfo=timezone.utc)
+    posts = [
+        DomainPost(id=i, author_id=1, content="hello", created_at=created_at)
+        for i in (1, 2)
+    ]
+
+    full_page = build_cursor_page([], posts, limit=2)
+    last_page = build_cursor_page([], posts, limit=3)
+
+    assert decode_cursor(full_page["next_cursor"]) == PageCursor(created_at=created_at, id=2)
+    assert last_page["next_cursor"] is None
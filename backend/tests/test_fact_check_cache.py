@@ -0,0 +1,134 @@
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from threads.models import User, Post
+from threads.infrastructure.external.openai_client import OpenAIClient
+from threads.infrastructure import fact_check_cache
+from threads.infrastructure.fact_check_cache import FactCheckCache, normalize
+
+
+@pytest.fixture
+def content():
+    # 測試可能跑在共用的 Redis 上，每個測試用不同內容避免互相命中
+    return f"颱風假 {uuid.uuid4().hex} 明天全台停班停課"
+
+
+def test_normalized_content_shares_one_entry(content):
+    cache = FactCheckCache()
+    cache.set(content, "真的嗎", "gpt-4o", "錯誤")
+
+    variant = "  " + content.replace(" ", "　  ").upper() + "\n"
+    assert normalize(variant) == normalize(content)
+    assert cache.get(variant, "真的嗎 ", "gpt-4o") == "錯誤"
+    # prompt 或 model 不同就是不同的查核
+    assert cache.get(content, "是誰說的", "gpt-4o") is None
+    assert cache.get(content, "真的嗎", "gpt-4o-mini") is None
+
+
+def test_entries_expire_and_can_be_invalidated(content, monkeypatch):
+    cache = FactCheckCache(ttl=60)
+    cache.set(content, None, "gpt-4o", "錯誤")
+    cache.set(content, "補充問題", "gpt-4o", "部分正確")
+
+    # 只讓模組內的時間前進，Redis 端的 key 仍在，驗證的是個別結果自己的時效
+    later = SimpleNamespace(time=lambda: time.time() + 61)
+    monkeypatch.setattr(fact_check_cache, "time", later)
+    assert cache.get(content, None, "gpt-4o") is None
+    monkeypatch.undo()
+    assert cache.get(content, "補充問題", "gpt-4o") == "部分正確"
+
+    assert cache.invalidate(content)
+    assert cache.get(content, None, "gpt-4o") is None
+    assert cache.get(content, "補充問題", "gpt-4o") is None
+
+
+def test_concurrent_identical_requests_make_one_upstream_call(content):
+    cache = FactCheckCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.3)
+        return "錯誤"
+
+    results = []
+    workers = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute(content, None, "gpt-4o", compute)))
+        for _ in range(5)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(calls) == 1
+    assert results == ["錯誤"] * 5
+
+
+def test_inflight_lock_outlives_the_slowest_compute(content, settings):
+    worst_case = (
+        settings.FACT_CHECK_SEARCH_TIMEOUT_SECONDS
+        + settings.OPENAI_TIMEOUT_SECONDS * (1 + settings.OPENAI_MAX_RETRIES)
+    )
+    cache = FactCheckCache()
+    ttls = []
+
+    def compute():
+        ttls.append(cache.client.ttl(cache._lock_key(content, None, "gpt-4o")))
+        return "錯誤"
+
+    cache.get_or_compute(content, None, "gpt-4o", compute)
+    # 鎖在查核途中過期，等待的請求會重複打上游
+    assert ttls[0] > worst_case
+
+
+def test_waiters_take_over_when_the_owner_fails(content):
+    cache = FactCheckCache()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.2)
+        raise RuntimeError("openai down")
+
+    errors = []
+
+    def owner():
+        try:
+            cache.get_or_compute(content, None, "gpt-4o", failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=owner)
+    thread.start()
+    started.wait()
+    assert cache.get_or_compute(content, None, "gpt-4o", lambda: "改由等待者查核") == "改由等待者查核"
+    thread.join()
+    assert len(errors) == 1
+
+
+@pytest.mark.django_db
+def test_fact_check_view_serves_repeated_requests_from_cache(content, monkeypatch):
+    user = User.objects.create(username="cacheuser", email="cacheuser@example.com")
+    post = Post.objects.create(author=user, content=content)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    calls = []
+    monkeypatch.setattr(OpenAIClient, "fact_check", lambda self, target: calls.append(target) or "錯誤")
+
+    url = f"/api/threads/posts/{post.id}/factCheck"
+    first = client.post(url, {"content": content}, format="json")
+    second = client.post(url, {"content": content + "  "}, format="json")
+    assert first.data == second.data == {"response": "錯誤"}
+    assert calls == [content]
+
+    call_command("invalidate_fact_checks", post=[post.id], stdout=open("/dev/null", "w"))
+    client.post(url, {"content": content}, format="json")
+    assert len(calls) == 2
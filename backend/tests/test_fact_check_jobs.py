@@ -0,0 +1,106 @@
+import uuid
+
+import pytest
+from rest_framework.test import APIClient
+
+from threads.models import User, Post
+from threads.infrastructure.external.openai_client import OpenAIClient
+from threads.infrastructure.cache import redis_client
+from threads import tasks
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def author():
+    return User.objects.create(username="factchecker", email="factchecker@example.com")
+
+
+@pytest.fixture
+def post(author):
+    # 查核結果以內容為鍵快取，每個測試用不同內容才會真的跑到 fact_check
+    return Post.objects.create(author=author, content=f"地球是平的 {uuid.uuid4().hex}")
+
+
+@pytest.fixture
+def client(author):
+    client = APIClient()
+    client.force_authenticate(user=author)
+    return client
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    # 不經 broker，記下送出的 job_id，測試再手動執行任務
+    job_ids = []
+    monkeypatch.setattr(tasks.run_fact_check_job, "delay", job_ids.append)
+    return job_ids
+
+
+def test_job_mode_returns_202_and_runs_in_worker(client, post, enqueued, monkeypatch):
+    calls = []
+
+    def fake_fact_check(self, target):
+        calls.append(target)
+        return "```markdown\n錯誤[^1]\n```"
+
+    monkeypatch.setattr(OpenAIClient, "fact_check", fake_fact_check)
+
+    response = client.post(f"/api/threads/posts/{post.id}/factCheck?mode=job",
+                           {"content": post.content, "prompt": "真的嗎"}, format="json")
+    assert response.status_code == 202
+    job_id = response.data["job_id"]
+    assert enqueued == [job_id]
+    assert response["Location"] == f"/api/threads/factCheck/jobs/{job_id}"
+    # 請求內不呼叫 OpenAI
+    assert calls == []
+
+    pending = client.get(response["Location"])
+    assert pending.data["status"] == "pending"
+    assert pending["Retry-After"]
+
+    tasks.run_fact_check_job(job_id)
+    assert calls == [{"content": post.content, "prompt": "真的嗎"}]
+
+    done = client.get(response["Location"])
+    assert done.status_code == 200
+    assert done.data == {"job_id": job_id, "status": "done", "response": "```markdown\n錯誤[^1]\n```"}
+
+
+def test_failed_job_reports_error_without_leaking_details(client, post, enqueued, monkeypatch):
+    def broken_fact_check(self, target):
+        raise RuntimeError("serpapi key=secret")
+
+    monkeypatch.setattr(OpenAIClient, "fact_check", broken_fact_check)
+
+    job_id = client.post(f"/api/threads/posts/{post.id}/factCheck?mode=job",
+                         {"content": post.content}, format="json").data["job_id"]
+    tasks.run_fact_check_job(job_id)
+
+    response = client.get(f"/api/threads/factCheck/jobs/{job_id}")
+    assert response.data["status"] == "failed"
+    assert "secret" not in response.data["error"]
+
+
+def test_job_is_private_to_its_owner(client, post, enqueued):
+    job_id = client.post(f"/api/threads/posts/{post.id}/factCheck?mode=job",
+                         {"content": post.content}, format="json").data["job_id"]
+
+    stranger = APIClient()
+    stranger.force_authenticate(user=User.objects.create(username="stranger", email="stranger@example.com"))
+    assert stranger.get(f"/api/threads/factCheck/jobs/{job_id}").status_code == 404
+    assert client.get("/api/threads/factCheck/jobs/doesnotexist").status_code == 404
+
+
+def test_enqueue_failure_cleans_up_job(client, post, monkeypatch):
+    def broker_down(job_id):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr(tasks.run_fact_check_job, "delay", broker_down)
+    before = set(redis_client.keys("factcheck:job:*"))
+
+    response = client.post(f"/api/threads/posts/{post.id}/factCheck?mode=job",
+                           {"content": post.content}, format="json")
+    assert response.status_code == 500
+    # 沒送出的工作不留在 Redis，避免永遠 pending
+    assert set(redis_client.keys("factcheck:job:*")) == before
@@ -0,0 +1,75 @@
+import threading
+import time
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.utils import timezone
+
+from threads.models import User, Post
+from threads.infrastructure.external.openai_client import OpenAIClient
+from threads.infrastructure.fact_check_cache import FactCheckCache
+from threads.infrastructure.fact_check_prewarm import prewarm_fact_checks, select_viral_posts
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def posts():
+    author = User.objects.create(username="viralauthor", email="viralauthor@example.com")
+
+    def make(likes, reposts, **extra):
+        return Post.objects.create(author=author, content=f"熱門謠言 {uuid.uuid4().hex}",
+                                   likes_count=likes, reposts_count=reposts, **extra)
+
+    viral = [make(50, 30), make(70, 0), make(10, 5), make(1, 0)]
+    old = make(999, 999)
+    Post.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(days=3))
+    make(500, 0, is_repost=True, repost_of_content_type=ContentType.objects.get_for_model(Post),
+         repost_of_content_item_id=viral[0].id)
+    return viral
+
+
+def test_select_viral_posts_ranks_recent_originals(posts):
+    selected = select_viral_posts(limit=3, window_hours=24)
+    assert [post_id for post_id, _ in selected] == [posts[0].id, posts[1].id, posts[2].id]
+
+
+def test_prewarm_fills_cache_with_bounded_concurrency(posts, monkeypatch):
+    lock = threading.Lock()
+    active, peak, calls = [0], [0], []
+
+    def slow_fact_check(self, target):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            calls.append(target)
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return f"查核：{target}"
+
+    monkeypatch.setattr(OpenAIClient, "fact_check", slow_fact_check)
+
+    stats = prewarm_fact_checks(limit=4, window_hours=24, concurrency=2)
+    assert stats["selected"] == 4 and stats["checked"] == 4 and stats["failed"] == 0
+    assert peak[0] == 2
+    assert FactCheckCache().get(posts[0].content, None, "gpt-4o") == f"查核：{posts[0].content}"
+
+    # 第二輪全部命中快取，不再呼叫上游
+    again = prewarm_fact_checks(limit=4, window_hours=24, concurrency=2)
+    assert again["cached"] == 4 and again["checked"] == 0
+    assert len(calls) == 4
+
+
+def test_prewarm_command_reports_failures(posts, monkeypatch):
+    def broken(self, target):
+        raise RuntimeError("openai down")
+
+    monkeypatch.setattr(OpenAIClient, "fact_check", broken)
+    out = StringIO()
+    call_command("prewarm_fact_checks", limit=2, concurrency=1, stdout=out)
+    assert "失敗 2" in out.getvalue()
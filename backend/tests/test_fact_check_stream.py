@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+import uuid
+import weakref
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from threads.models import User, Post
+from threads.infrastructure.external import http_clients, openai_client
+from threads.infrastructure.external.search_backend import StubSearchBackend
+from threads.infrastructure.fact_check_cache import FactCheckCache
+from threads.infrastructure.rate_limit import RedisSemaphore
+from tests.fake_llm_server import FakeLLMConfig, run_fake_llm_server
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def llm(monkeypatch, settings):
+    config = FakeLLMConfig(token_delay=0.1)
+    with run_fake_llm_server(config) as (base_url, config):
+        settings.OPENAI_BASE_URL = base_url
+        settings.OPENAI_MAX_RETRIES = 0
+        # 共用 client 依設定建立，換掉快取的實例讓它們改連假服務
+        monkeypatch.setattr(http_clients, "_openai_client", None)
+        monkeypatch.setattr(http_clients, "_async_openai_clients", weakref.WeakKeyDictionary())
+        monkeypatch.setattr(openai_client, "default_search_backend", lambda: StubSearchBackend())
+        yield config
+
+
+@pytest.fixture
+def user():
+    return User.objects.create(username="streamuser", email="streamuser@example.com")
+
+
+@pytest.fixture
+def post(user):
+    return Post.objects.create(author=user, content=f"喝熱水可以殺死病毒 {uuid.uuid4().hex}")
+
+
+def parse_events(chunks):
+    events = []
+    for chunk in chunks:
+        for block in chunk.decode().strip().split("\n\n"):
+            event, data = block.split("\n")
+            events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_stream_relays_tokens_as_they_are_generated(llm, user, post):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.post(f"/api/threads/posts/{post.id}/factCheck?mode=stream", {"content": post.content}, format="json")
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/event-stream")
+    assert response["X-Accel-Buffering"] == "no"
+
+    started = time.monotonic()
+    arrivals, chunks = [], []
+    for chunk in response.streaming_content:
+        arrivals.append(time.monotonic() - started)
+        chunks.append(chunk)
+    events = parse_events(chunks)
+
+    assert events[0] == ("start", {})
+    assert "".join(data["delta"] for name, data in events if name == "token") == "".join(llm.tokens)
+    assert events[-1] == ("done", {"cached": False})
+    # 第一個 token 在上游生成完之前就送出
+    assert arrivals[1] < arrivals[-1] - 0.3
+    assert llm.requests[0]["stream"] is True
+
+    # 串流完成的結果寫入查核快取，一般 POST 直接命中
+    again = client.post(f"/api/threads/posts/{post.id}/factCheck", {"content": post.content}, format="json")
+    assert again.data == {"response": "".join(llm.tokens)}
+    assert len(llm.requests) == 1
+
+
+def test_stream_reports_upstream_failure_as_error_event(llm, user, post):
+    llm.status = 500
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.post(f"/api/threads/posts/{post.id}/factCheck?mode=stream", {"content": post.content}, format="json")
+
+    events = parse_events(response.streaming_content)
+    assert events[0] == ("start", {})
+    assert events[-1][0] == "error"
+
+
+def test_stream_is_asynchronous_under_asgi(llm, user, post):
+    token = str(RefreshToken.for_user(user).access_token)
+
+    async def consume():
+        response = await AsyncClient().post(
+            f"/api/threads/posts/{post.id}/factCheck?mode=stream", {"content": post.content},
+            content_type="application/json", headers={"Authorization": f"Bearer {token}"},
+        )
+        # ASGI 下必須是非同步 iterator，否則 Django 會整包讀完才送出
+        assert response.is_async
+        return [chunk async for chunk in response.streaming_content]
+
+    events = parse_events(async_to_sync(consume)())
+    assert "".join(data["delta"] for name, data in events if name == "token") == "".join(llm.tokens)
+    assert events[-1] == ("done", {"cached": False})
+
+
+def test_unread_stream_releases_lease_and_inflight_lock_on_close(llm, user, post, monkeypatch):
+    from threads.interface.views.fact_checks import base_fact_check_view
+
+    semaphore = RedisSemaphore(f"llm-{uuid.uuid4().hex}", limit=1, lease_seconds=180, retry_after=5)
+    monkeypatch.setattr(base_fact_check_view, "llm_semaphore", lambda: semaphore)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.post(f"/api/threads/posts/{post.id}/factCheck?mode=stream", {"content": post.content}, format="json")
+
+    cache = FactCheckCache()
+    lock_key = cache._lock_key(post.content, None, "gpt-4o")
+    assert cache.client.zcard(semaphore.key) == 1 and cache.client.exists(lock_key)
+    # 使用者在第一個事件前就斷線，generator 從未開始跑，名額與鎖仍要在回應關閉時歸還
+    response.close()
+    assert cache.client.zcard(semaphore.key) == 0
+    assert not cache.client.exists(lock_key)
+    assert llm.requests == []
+
+
+def test_identical_stream_waits_for_inflight_check_instead_of_calling_upstream(llm, user, post):
+    cache = FactCheckCache()
+    token = cache.acquire_inflight(post.content, None, "gpt-4o")
+
+    def finish_other_check():
+        time.sleep(0.3)
+        cache.set(post.content, None, "gpt-4o", "另一個請求的查核結果")
+        cache.release_inflight(post.content, None, "gpt-4o", token)
+
+    worker = threading.Thread(target=finish_other_check)
+    worker.start()
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.post(f"/api/threads/posts/{post.id}/factCheck?mode=stream", {"content": post.content}, format="json")
+    events = parse_events(response.streaming_content)
+    worker.join()
+
+    assert events == [("start", {}), ("token", {"delta": "另一個請求的查核結果"}), ("done", {"cached": True})]
+    assert llm.requests == []
@@ -0,0 +1,141 @@
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+import pytest
+from threads.use_cases.queries.get_home_timeline import GetHomeTimeline
+from threads.domain.entities import Post as DomainPost
+from threads.domain.pagination import PageCursor
+from threads.models import User, Post, Follow
+from threads.infrastructure.repository.timeline_repository import TimelineRepositoryImpl
+from threads.infrastructure.cache import redis_client
+
+
+def test_execute_hydrates_timeline_ids_in_order():
+    timeline_repo = Mock()
+    post_repo = Mock()
+    use_case = GetHomeTimeline(timeline_repository=timeline_repo, post_repository=post_repo)
+
+    timeline_repo.get_post_ids.return_value = [3, 1]
+    hydrated = [
+        DomainPost(id=3, author_id=10, content="newer post"),
+        DomainPost(id=1, author_id=11, content="older post"),
+    ]
+    post_repo.get_posts_by_ids.return_value = hydrated
+
+    result = use_case.execute(auth_user_id=5, offset=0, limit=10)
+
+    timeline_repo.get_post_ids.assert_called_once_with(5, 0, 10, None)
+    post_repo.get_posts_by_ids.assert_called_once_with(5, [3, 1])
+    assert result == hydrated
+
+
+
+def _user():
+    name = f"tl{uuid.uuid4().hex[:10]}"
+    return User.objects.create(username=name, email=f"{name}@example.com")
+
+
+@pytest.mark.django_db
+def test_follow_changes_rebuild_the_follower_timeline(django_capture_on_commit_callbacks):
+    viewer, author = _user(), _user()
+    old_post = Post.objects.create(author=author, content="追蹤前的貼文")
+    repo = TimelineRepositoryImpl()
+    assert repo.get_post_ids(viewer.id, 0, 10) == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        follow = Follow.objects.create(follower=viewer, following=author)
+    assert repo.get_post_ids(viewer.id, 0, 10) == [old_post.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        follow.delete()
+    assert repo.get_post_ids(viewer.id, 0, 10) == []
+
+
+@pytest.mark.django_db
+def test_pulled_cursor_keeps_posts_in_the_same_millisecond(settings):
+    settings.TIMELINE_FANOUT_MAX_FOLLOWERS = 0
+    viewer, author = _user(), _user()
+    Follow.objects.create(follower=viewer, following=author)
+    # 同一毫秒內，id 較小的貼文微秒較晚；以 (毫秒, id) 排序時它排在後面，不能被 cursor 漏掉
+    later_micro = Post.objects.create(author=author, content="a")
+    earlier_micro = Post.objects.create(author=author, content="b")
+    Post.objects.filter(id=later_micro.id).update(created_at=datetime(2025, 7, 1, 0, 0, 0, 900, tzinfo=timezone.utc))
+    Post.objects.filter(id=earlier_micro.id).update(created_at=datetime(2025, 7, 1, 0, 0, 0, 100, tzinfo=timezone.utc))
+
+    repo = TimelineRepositoryImpl()
+    first = repo.get_post_ids(viewer.id, 0, 1, PageCursor(created_at=datetime(2025, 7, 2, tzinfo=timezone.utc), id=0))
+    assert first == [earlier_micro.id]
+    cursor = PageCursor(created_at=datetime(2025, 7, 1, 0, 0, 0, 100, tzinfo=timezone.utc), id=earlier_micro.id)
+    assert repo.get_post_ids(viewer.id, 0, 1, cursor) == [later_micro.id]
+
+
+@pytest.mark.django_db
+def test_author_past_follower_threshold_is_pulled_not_fanned_out(settings):
+    settings.TIMELINE_FANOUT_MAX_FOLLOWERS = 3
+    celebrity, regular = _user(), _user()
+    viewer, *others = [_user() for _ in range(3)]
+    for follower in [viewer, *others]:
+        Follow.objects.create(follower=follower, following=celebrity)
+    Follow.objects.create(follower=viewer, following=regular)
+
+    celebrity.refresh_from_db()
+    viewer.refresh_from_db()
+    assert celebrity.followers_count == 3
+    assert viewer.followings_count == 2
+
+    repo = TimelineRepositoryImpl()
+    assert repo.get_post_ids(viewer.id, 0, 10) == []
+    star_post = Post.objects.create(author=celebrity, content="名人貼文")
+    regular_post = Post.objects.create(author=regular, content="一般貼文")
+    assert repo.fan_out_post(celebrity.id, star_post.id, star_post.created_at) == 0
+    assert repo.fan_out_post(regular.id, regular_post.id, regular_post.created_at) == 1
+
+    # 名人貼文沒有寫進追蹤者的 timeline，讀取時從資料庫合併進來
+    assert redis_client.zscore(repo._key(viewer.id), star_post.id) is None
+    assert repo.get_post_ids(viewer.id, 0, 10) == [regular_post.id, star_post.id]
+
+    Follow.objects.filter(follower=others[0], following=celebrity).delete()
+    celebrity.refresh_from_db()
+    assert celebrity.followers_count == 2
+
+
+@pytest.mark.django_db
+def test_post_fanned_out_while_rebuilding_is_kept(monkeypatch):
+    viewer, author = _user(), _user()
+    Follow.objects.create(follower=viewer, following=author)
+    old_post = Post.objects.create(author=author, content="重建前的貼文")
+    repo = TimelineRepositoryImpl()
+    snapshot = repo._timeline_entries
+    racing = []
+
+    def entries_then_new_post(user_id, pull_author_ids):
+        # 資料庫已經讀完，才有新貼文 commit 並推送
+        rows = list(snapshot(user_id, pull_author_ids))
+        post = Post.objects.create(author=author, content="重建中的貼文")
+        repo.fan_out_post(author.id, post.id, post.created_at)
+        racing.append(post)
+        return rows
+
+    monkeypatch.setattr(repo, "_timeline_entries", entries_then_new_post)
+    assert repo.get_post_ids(viewer.id, 0, 10) == [racing[0].id, old_post.id]
+    assert not redis_client.exists(repo._building_key(viewer.id))
+
+
+@pytest.mark.django_db
+def test_rebuild_is_dropped_when_invalidated_midway(monkeypatch):
+    viewer, author = _user(), _user()
+    Follow.objects.create(follower=viewer, following=author)
+    Post.objects.create(author=author, content="舊追蹤關係的貼文")
+    repo = TimelineRepositoryImpl()
+    snapshot = repo._timeline_entries
+
+    def entries_then_invalidate(user_id, pull_author_ids):
+        rows = list(snapshot(user_id, pull_author_ids))
+        repo.invalidate(user_id)
+        return rows
+
+    monkeypatch.setattr(repo, "_timeline_entries", entries_then_invalidate)
+    repo.get_post_ids(viewer.id, 0, 10)
+    # 依舊追蹤關係建出的結果不寫回，下次讀取重建
+    assert not redis_client.exists(repo._key(viewer.id))
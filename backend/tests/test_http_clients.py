@@ -0,0 +1,100 @@
+import threading
+import time
+import weakref
+
+import httpx
+import pytest
+
+from threads.infrastructure.external import http_clients
+from threads.infrastructure.external.http_clients import get_openai_client
+from threads.infrastructure.external.openai_client import OpenAIClient
+from threads.infrastructure.external.search_backend import SerpApiSearchBackend
+from tests.fake_llm_server import run_fake_llm_server
+
+
+@pytest.fixture
+def fast_retries(settings):
+    settings.EXTERNAL_HTTP_RETRIES = 2
+    settings.EXTERNAL_HTTP_BACKOFF_SECONDS = 0.01
+
+
+def serpapi(handler):
+    return httpx.Client(base_url="https://serpapi.com", transport=httpx.MockTransport(handler))
+
+
+def test_serpapi_backend_retries_transient_errors(fast_retries):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"organic_results": [{"title": "ok"}]})
+
+    data = SerpApiSearchBackend("secret", http_client=serpapi(handler)).search({"q": "謠言", "num": 5})
+    assert data == {"organic_results": [{"title": "ok"}]}
+    assert len(calls) == 3
+    assert calls[0].url.path == "/search"
+    assert calls[0].url.params["engine"] == "google"
+    assert calls[0].url.params["api_key"] == "secret"
+
+
+def test_serpapi_backend_returns_error_payload_after_giving_up(fast_retries):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, json={"error": "Your account has run out of searches."})
+
+    data = SerpApiSearchBackend("secret", http_client=serpapi(handler)).search({"q": "謠言", "num": 5})
+    assert data == {"error": "Your account has run out of searches."}
+    assert len(calls) == 3
+
+
+def test_serpapi_backend_raises_on_connection_errors(fast_retries):
+    def handler(request):
+        raise httpx.ConnectError("connection refused")
+
+    with pytest.raises(httpx.ConnectError):
+        SerpApiSearchBackend("secret", http_client=serpapi(handler)).search({"q": "謠言", "num": 5})
+
+
+def test_openai_client_is_shared_and_keeps_connections_alive(settings, monkeypatch):
+    with run_fake_llm_server() as (base_url, config):
+        settings.OPENAI_BASE_URL = base_url
+        monkeypatch.setattr(http_clients, "_openai_client", None)
+        monkeypatch.setattr(http_clients, "_async_openai_clients", weakref.WeakKeyDictionary())
+
+        instances = []
+        threads = [threading.Thread(target=lambda: instances.append(get_openai_client())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({id(instance) for instance in instances}) == 1
+
+        for _ in range(3):
+            OpenAIClient().ask("測試")
+        # 三次呼叫共用同一條 keep-alive 連線，只做一次 TCP 交握
+        assert len(config.requests) == 3
+        assert len(set(config.peers)) == 1
+
+
+def test_request_with_retry_stays_within_deadline(settings):
+    settings.EXTERNAL_HTTP_RETRIES = 5
+    settings.EXTERNAL_HTTP_BACKOFF_SECONDS = 0.01
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503, headers={"Retry-After": "5"})
+
+    started = time.monotonic()
+    response = http_clients.request_with_retry(serpapi(handler), "GET", "/search", deadline=time.monotonic() + 0.3)
+    # Retry-After 要等 5 秒，期限內等不到下一次重試，直接交回這次的回應
+    assert time.monotonic() - started < 0.3
+    assert response.status_code == 503 and len(calls) == 1
+
+    with pytest.raises(httpx.TimeoutException):
+        http_clients.request_with_retry(serpapi(handler), "GET", "/search", deadline=time.monotonic() - 1)
+    assert len(calls) == 1
@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from threads.models import User, Post, Comment
+from threads.domain.entities import Comment as DomainComment
+from threads.infrastructure.repository.post_repository import PostRepositoryImpl
+from threads.infrastructure.repository.comment_repository import CommentRepositoryImpl
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != "postgresql", reason="EXPLAIN 輸出格式以 PostgreSQL 為準"),
+]
+
+
+@pytest.fixture
+def seeded():
+    author, viewer = User.objects.bulk_create([
+        User(username="author", email="author@example.com"),
+        User(username="viewer", email="viewer@example.com"),
+    ])
+    # bulk_create 不觸發 signal，測試只需要資料表內容
+    posts = Post.objects.bulk_create([
+        Post(author=author if i % 2 else viewer, content=f"post {i}") for i in range(50)
+    ])
+    root, = Comment.objects.bulk_create([Comment(author=viewer, content="root", parent_post=posts[0])])
+    Comment.objects.bulk_create([
+        Comment(author=author, content=f"comment {i}", parent_post=posts[0], parent_comment=root if i % 2 else None)
+        for i in range(400)
+    ])
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE app_post")
+        cursor.execute("ANALYZE app_comment")
+    return {"author": author, "viewer": viewer, "post": posts[0], "root": root}
+
+
+def _list_query_plans(table, call):
+    with CaptureQueriesContext(connection) as ctx:
+        call()
+    list_queries = [
+        query["sql"] for query in ctx.captured_queries
+        if f'FROM "{table}"' in query["sql"] and "ORDER BY" in query["sql"]
+    ]
+    assert list_queries, f"沒有抓到 {table} 的列表查詢"
+
+    plans = []
+    with connection.cursor() as cursor:
+        # 測試資料很小，不關掉 seq scan / bitmap scan / sort 的話規劃器會偏好全表掃描或單欄 FK 索引再排序
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+        cursor.execute("SET LOCAL enable_sort = off")
+        for sql in list_queries:
+            cursor.execute("EXPLAIN " + sql)
+            plans.append("\n".join(row[0] for row in cursor.fetchall()))
+    return plans
+
+
+def _assert_uses_index(plans, table, index_names):
+    for plan in plans:
+        assert f"Seq Scan on {table}" not in plan, plan
+        assert any(name in plan for name in index_names), plan
+
+
+def test_get_all_posts_uses_created_at_index(seeded):
+    plans = _list_query_plans("app_post", lambda: PostRepositoryImpl().get_all_posts(seeded["viewer"].id, 0, 20))
+    _assert_uses_index(plans, "app_post", ["post_created_id_idx"])
+
+
+def test_get_posts_by_author_id_uses_author_index(seeded):
+    plans = _list_query_plans(
+        "app_post",
+        lambda: PostRepositoryImpl().get_posts_by_author_id(seeded["viewer"].id, seeded["author"].id, 0, 20),
+    )
+    _assert_uses_index(plans, "app_post", ["post_author_created_id_idx"])
+
+
+def test_get_posts_by_following_ids_uses_index(seeded):
+    plans = _list_query_plans(
+        "app_post",
+        lambda: PostRepositoryImpl().get_posts_by_following_ids(seeded["viewer"].id, [seeded["author"].id], 0, 20),
+    )
+    _assert_uses_index(plans, "app_post", ["post_author_created_id_idx", "post_created_id_idx"])
+
+
+def test_get_comments_by_post_id_uses_parent_post_index(seeded):
+    plans = _list_query_plans(
+        "app_comment",
+        lambda: CommentRepositoryImpl().get_comments_by_post_id(seeded["viewer"].id, seeded["post"].id, 0, 20),
+    )
+    _assert_uses_index(plans, "app_comment", ["comment_post_created_id_idx"])
+
+
+def test_get_child_comments_uses_parent_comment_index(seeded):
+    root = DomainComment(
+        id=seeded["root"].id, author_id=seeded["viewer"].id, content="root", parent_post_id=seeded["post"].id
+    )
+    plans = _list_query_plans(
+        "app_comment",
+        lambda: CommentRepositoryImpl().get_all_child_comments_by_comment_id(seeded["viewer"].id, root, 0, 20),
+    )
+    _assert_uses_index(plans, "app_comment", ["comment_parent_created_id_idx"])
\ No newline at end of file
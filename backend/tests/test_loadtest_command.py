@@ -0,0 +1,42 @@
+import pytest
+from django.core.management.base import CommandError
+
+from threads.management.commands.loadtest import LatencyStats, parse_mix
+
+
+def test_parse_mix_keeps_listed_weights():
+    assert parse_mix("feed=3, like=1") == {"feed": 3, "like": 1}
+
+
+@pytest.mark.parametrize("spec", ["feed", "unknown=1", "feed=x", "feed=-1", "feed=0"])
+def test_parse_mix_rejects_invalid_spec(spec):
+    with pytest.raises(CommandError):
+        parse_mix(spec)
+
+
+def test_latency_stats_percentiles_use_nearest_rank():
+    stats = LatencyStats()
+    for elapsed_ms in range(1, 101):
+        stats.record(float(elapsed_ms), 200, True)
+
+    assert stats.percentile(50) == 50.0
+    assert stats.percentile(99) == 99.0
+    assert stats.percentile(100) == 100.0
+
+
+def test_latency_stats_histogram_and_errors():
+    stats = LatencyStats()
+    stats.record(3.0, 200, True)
+    stats.record(10.0, 201, True)
+    stats.record(7000.0, "ReadTimeout", False)
+
+    histogram = dict(stats.histogram())
+    assert histogram["<= 5ms"] == 1
+    assert histogram["<= 10ms"] == 1
+    assert histogram["> 5000ms"] == 1
+
+    summary = stats.summary(elapsed_s=1.5)
+    assert summary["count"] == 3
+    assert summary["errors"] == 1
+    assert summary["rps"] == 2.0
+    assert summary["statuses"] == {"200": 1, "201": 1, "ReadTimeout": 1}
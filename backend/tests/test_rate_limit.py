@@ -0,0 +1,109 @@
+import time
+import uuid
+
+import pytest
+from celery.exceptions import Retry
+from rest_framework.test import APIClient
+
+from threads import tasks
+from threads.models import User, Post
+from threads.infrastructure.external.openai_client import OpenAIClient
+from threads.infrastructure.fact_check_jobs import FactCheckJobStore
+from threads.infrastructure.rate_limit import CapacityExceeded, RedisSemaphore, TokenBucket
+
+
+def unique(name):
+    return f"{name}-{uuid.uuid4().hex}"
+
+
+def test_token_bucket_allows_burst_then_refills():
+    bucket = TokenBucket(capacity=2, rate=20)
+    key = unique("bucket")
+
+    assert bucket.consume(key)[0]
+    assert bucket.consume(key)[0]
+    allowed, retry_after = bucket.consume(key)
+    assert not allowed
+    assert 0 < retry_after <= 0.05
+
+    time.sleep(retry_after + 0.01)
+    assert bucket.consume(key)[0]
+
+
+def test_semaphore_limits_holders_and_reclaims_expired_leases():
+    semaphore = RedisSemaphore(unique("llm"), limit=2, lease_seconds=0.2, retry_after=3)
+    first = semaphore.acquire()
+    semaphore.acquire()
+    with pytest.raises(CapacityExceeded) as excinfo:
+        semaphore.acquire()
+    assert excinfo.value.retry_after == 3
+
+    semaphore.release(first)
+    semaphore.acquire()
+
+    # 持有者當掉沒釋放，租約到期後名額自動回收
+    time.sleep(0.25)
+    with semaphore.hold():
+        semaphore.acquire()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create(username=unique("ratelimit")[:30], email=f"{uuid.uuid4().hex}@example.com")
+
+
+@pytest.fixture
+def post(user):
+    return Post.objects.create(author=user, content=unique("限流測試"))
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_fact_check_posts_are_throttled_per_user(settings, client, post, monkeypatch):
+    settings.FACT_CHECK_RATE_BURST = 2
+    settings.FACT_CHECK_RATE_PER_MINUTE = 1
+    monkeypatch.setattr(OpenAIClient, "fact_check", lambda self, target: "錯誤")
+    url = f"/api/threads/posts/{post.id}/factCheck"
+
+    assert client.post(url, {"content": post.content}, format="json").status_code == 200
+    assert client.post(url, {"content": post.content}, format="json").status_code == 200
+    throttled = client.post(url, {"content": post.content}, format="json")
+    assert throttled.status_code == 429
+    assert throttled.data["error"]["type"] == "TooManyRequests"
+    assert 0 < int(throttled["Retry-After"]) <= 60
+
+    # 讀取貼文與輪詢結果不消耗令牌
+    assert client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_full_llm_semaphore_returns_429(settings, client, post, monkeypatch):
+    settings.LLM_MAX_CONCURRENCY = 0
+    settings.LLM_SEMAPHORE_RETRY_AFTER_SECONDS = 7
+    calls = []
+    monkeypatch.setattr(OpenAIClient, "fact_check", lambda self, target: calls.append(target) or "錯誤")
+    url = f"/api/threads/posts/{post.id}/factCheck"
+
+    for mode in ("", "?mode=stream"):
+        response = client.post(url + mode, {"content": post.content}, format="json")
+        assert response.status_code == 429
+        assert response["Retry-After"] == "7"
+    assert calls == []
+
+
+@pytest.mark.django_db
+def test_job_waits_in_queue_while_llm_semaphore_is_full(settings, user, post, monkeypatch):
+    settings.LLM_MAX_CONCURRENCY = 0
+    monkeypatch.setattr(OpenAIClient, "fact_check", lambda self, target: "錯誤")
+    store = FactCheckJobStore()
+    job_id = store.create(user.id, post.content)
+
+    with pytest.raises(Retry):
+        tasks.run_fact_check_job(job_id)
+    assert store.get(job_id)["status"] == "pending"
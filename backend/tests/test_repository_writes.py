@@ -0,0 +1,99 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from threads.models import User, Post
+from threads.domain.entities import Post as DomainPost
+from threads.domain.entities import Comment as DomainComment
+from threads.domain.entities import Like as DomainLike
+from threads.infrastructure.repository.post_repository import PostRepositoryImpl
+from threads.infrastructure.repository.comment_repository import CommentRepositoryImpl
+from threads.infrastructure.repository.like_repository import LikeRepositoryImpl
+from threads.use_cases.commands.update_post import UpdatePost
+from threads.common.exceptions.repository_exceptions import EntityDoesNotExist
+from threads.common.exceptions.use_case_exceptions import NotFound
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def author():
+    return User.objects.create(username="writer", email="writer@example.com")
+
+
+def _queries_on(ctx, table):
+    return [query["sql"] for query in ctx.captured_queries if f'"{table}"' in query["sql"]]
+
+
+def test_create_post_does_not_refetch_row(author):
+    with CaptureQueriesContext(connection) as ctx:
+        post = PostRepositoryImpl().create_post(DomainPost(id=None, author_id=author.id, content="hello"))
+
+    queries = _queries_on(ctx, "app_post")
+    assert len(queries) == 1 and queries[0].startswith("INSERT")
+    assert post.id == Post.objects.get().id
+    assert post.author_name == "writer"
+    assert post.created_at is not None and post.likes_count == 0
+
+
+def test_update_post_uses_single_update_returning(author):
+    db_post = Post.objects.create(author=author, content="before")
+    updated_at = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+    with CaptureQueriesContext(connection) as ctx:
+        post = PostRepositoryImpl().update_post(
+            DomainPost(id=db_post.id, author_id=author.id, content="after", updated_at=updated_at)
+        )
+
+    queries = _queries_on(ctx, "app_post")
+    assert len(queries) == 1 and "RETURNING" in queries[0]
+    assert post.content == "after"
+    assert post.updated_at == updated_at
+    assert post.created_at == db_post.created_at
+    Post.objects.get(id=db_post.id, content="after")
+
+
+def test_update_missing_post_raises_not_found(author):
+    with pytest.raises(EntityDoesNotExist):
+        PostRepositoryImpl().update_post(DomainPost(id=999999, author_id=author.id, content="after"))
+
+
+def test_update_post_deleted_after_read_returns_404(author):
+    db_post = Post.objects.create(author=author, content="before")
+    repo = PostRepositoryImpl()
+    domain_post = repo.get_post_by_id(db_post.id, author.id)
+    Post.objects.filter(id=db_post.id).delete()
+
+    # 讀取之後、UPDATE 之前被刪除，不能回傳成功
+    with patch.object(PostRepositoryImpl, "get_post_by_id", return_value=domain_post):
+        with pytest.raises(NotFound):
+            UpdatePost(repo).execute(db_post.id, {"content": "after"}, author.id)
+
+
+def test_create_and_update_comment_without_refetch(author):
+    db_post = Post.objects.create(author=author, content="parent")
+    repo = CommentRepositoryImpl()
+
+    with CaptureQueriesContext(connection) as ctx:
+        comment = repo.create_comment(DomainComment(id=None, author_id=author.id, content="first", parent_post_id=db_post.id))
+    assert [sql for sql in _queries_on(ctx, "app_comment") if sql.startswith("SELECT") and "LIMIT 1" not in sql] == []
+    assert comment.parent_post_id == db_post.id
+
+    comment.content = "edited"
+    with CaptureQueriesContext(connection) as ctx:
+        updated = repo.update_comment(comment)
+    assert len(_queries_on(ctx, "app_comment")) == 1
+    assert updated.content == "edited"
+
+
+def test_create_like_builds_entity_from_insert(author):
+    db_post = Post.objects.create(author=author, content="likeable")
+
+    with CaptureQueriesContext(connection) as ctx:
+        like = LikeRepositoryImpl().create_like(DomainLike(id=None, user_id=author.id, content_item_id=db_post.id, content_type="post"))
+
+    assert [sql for sql in _queries_on(ctx, "app_like") if sql.startswith("SELECT")] == []
+    assert (like.user_id, like.content_item_id, like.content_type) == (author.id, db_post.id, "post")
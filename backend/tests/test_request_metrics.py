@@ -0,0 +1,73 @@
+from collections import defaultdict
+
+import pytest
+from django.test import Client
+
+from core.metrics import MetricsRegistry, RequestRecorder
+
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.commands = []
+
+    def hincrbyfloat(self, key, field, value):
+        self.commands.append((key, field, value))
+
+    def execute(self):
+        for key, field, value in self.commands:
+            self.store[key][field.encode()] += value
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = defaultdict(lambda: defaultdict(float))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store)
+
+    def hgetall(self, key):
+        return {field: str(value).encode() for field, value in self.store[key].items()}
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry(client=FakeRedis(), flush_interval=60)
+    registry.observe_request("/api/threads/posts/", "GET", 200, 0.03)
+    registry.observe_request(
+        "/api/threads/posts/", "GET", 200, 0.2,
+        RequestRecorder(db_queries=3, db_seconds=0.01, redis_calls=2, redis_seconds=0.002),
+    )
+
+    body = registry.render()
+
+    assert "# TYPE threads_http_request_duration_seconds histogram" in body
+    assert 'threads_http_requests_total{method="GET",route="/api/threads/posts/",status="200"} 2' in body
+    assert 'threads_http_request_duration_seconds_bucket{route="/api/threads/posts/",le="0.05"} 1' in body
+    assert 'threads_http_request_duration_seconds_bucket{route="/api/threads/posts/",le="+Inf"} 2' in body
+    assert 'threads_http_sampled_requests_total{route="/api/threads/posts/"} 1' in body
+    assert 'threads_http_db_queries_total{route="/api/threads/posts/"} 3' in body
+    buckets = [line for line in body.splitlines() if line.startswith("threads_http_request_duration_seconds_bucket")]
+    assert len(buckets) == 11
+    assert buckets[0].endswith(" 0") and buckets[-1].endswith(" 2") and 'le="+Inf"' in buckets[-1]
+
+
+def test_registry_flush_merges_workers_in_redis():
+    client = FakeRedis()
+    first, second = MetricsRegistry(client=client, flush_interval=60), MetricsRegistry(client=client, flush_interval=60)
+    first.observe_request("/healthz", "GET", 200, 0.001)
+    second.observe_request("/healthz", "GET", 200, 0.001)
+    first.flush()
+
+    assert 'threads_http_requests_total{method="GET",route="/healthz",status="200"} 2' in second.render()
+
+
+@pytest.mark.parametrize("sample_rate, expected", [(1.0, True), (0.0, False)])
+def test_middleware_adds_server_timing_only_for_sampled_requests(settings, sample_rate, expected):
+    settings.REQUEST_METRICS_SAMPLE_RATE = sample_rate
+    response = Client().get("/healthz")
+
+    assert response.status_code == 200
+    assert ("Server-Timing" in response) is expected
+    if expected:
+        assert 'db;dur=' in response["Server-Timing"]
+        assert 'desc="0 queries"' in response["Server-Timing"]
@@ -0,0 +1,65 @@
+import uuid
+
+import pytest
+
+from core.metrics import MetricsRegistry
+from threads.infrastructure.cache import redis_client
+from threads.infrastructure.external import search_backend
+from threads.infrastructure.external.openai_client import OpenAIClient
+from threads.infrastructure.external.search_backend import CachedSearchBackend, StubSearchBackend
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    registry = MetricsRegistry(client=redis_client, flush_interval=3600)
+    monkeypatch.setattr(search_backend, "registry", registry)
+    return registry
+
+
+@pytest.fixture
+def query():
+    return f"蒜頭可以治新冠 {uuid.uuid4().hex}"
+
+
+def test_repeated_queries_are_served_from_redis(query, metrics):
+    stub = StubSearchBackend(results={query: [{"title": "查核", "link": "https://example.com", "snippet": "錯誤"}]})
+    cached = CachedSearchBackend(stub)
+
+    first = cached.search({"q": query, "num": 5, "hl": "zh-tw"})
+    second = cached.search({"q": "  " + query.upper(), "num": 5, "hl": "zh-tw", "api_key": "other"})
+    assert first == second
+    assert stub.queries == [query]
+
+    # site 過濾或筆數不同是不同的查詢
+    cached.search({"q": f"{query} site:cna.com.tw", "num": 5, "hl": "zh-tw"})
+    cached.search({"q": query, "num": 3, "hl": "zh-tw"})
+    assert len(stub.queries) == 3
+
+    body = metrics.render()
+    assert 'threads_search_cache_requests_total{result="hit"}' in body
+    assert 'threads_search_cache_requests_total{result="miss"}' in body
+
+
+def test_error_responses_are_not_cached(query, metrics):
+    class QuotaExceeded(StubSearchBackend):
+        def search(self, params, timeout=None):
+            self.queries.append(params["q"])
+            return {"error": "Your account has run out of searches."}
+
+    stub = QuotaExceeded()
+    cached = CachedSearchBackend(stub)
+    cached.search({"q": query, "num": 5})
+    cached.search({"q": query, "num": 5})
+    assert len(stub.queries) == 2
+
+
+def test_search_web_reuses_cached_site_queries(query, metrics):
+    stub = StubSearchBackend(results={query: [{"title": "t", "link": f"https://example.com/{i}", "snippet": "s"}
+                                              for i in range(5)]})
+    client = OpenAIClient(search_backend=CachedSearchBackend(stub))
+
+    first = client.search_web(query)
+    second = client.search_web(query)
+    assert first == second
+    # 三個可信來源加一般搜尋，第二次全部命中
+    assert len(stub.queries) == 4
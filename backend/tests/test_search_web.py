@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from threads.infrastructure.external.openai_client import OpenAIClient
+from threads.infrastructure.external.search_backend import StubSearchBackend
+
+QUERY = "疫苗含有晶片"
+TFC = f"{QUERY} site:tfc-taiwan.org.tw"
+CNA = f"{QUERY} site:cna.com.tw"
+TWREPORTER = f"{QUERY} site:twreporter.org"
+
+
+def hits(site, count):
+    return [{"title": f"{site} {i}", "link": f"https://{site}/{i}\nextra", "snippet": f" 摘要 {i} "} for i in range(count)]
+
+
+def test_searches_run_in_parallel_and_keep_priority_order():
+    backend = StubSearchBackend(
+        results={TFC: hits("tfc-taiwan.org.tw", 1), CNA: hits("cna.com.tw", 1),
+                 TWREPORTER: hits("twreporter.org", 1), QUERY: hits("example.com", 5)},
+        default_delay=0.3,
+    )
+    started = time.monotonic()
+    results = OpenAIClient(search_backend=backend).search_web(QUERY)
+    # 四次搜尋各 0.3 秒，循序要 1.2 秒
+    assert time.monotonic() - started < 0.8
+
+    assert [r["link"] for r in results] == [
+        "https://tfc-taiwan.org.tw/0", "https://cna.com.tw/0", "https://twreporter.org/0",
+        "https://example.com/0", "https://example.com/1",
+    ]
+    assert [r["idx"] for r in results] == [1, 2, 3, 4, 5]
+    assert [r["is_tfc"] for r in results] == [True, False, False, False, False]
+    assert results[0]["snippet"] == "摘要 0"
+
+
+def test_stops_waiting_once_priority_sources_fill_five_results():
+    backend = StubSearchBackend(
+        results={TFC: hits("tfc-taiwan.org.tw", 5), CNA: hits("cna.com.tw", 5)},
+        delays={TFC: 0.05},
+        default_delay=1.0,
+    )
+    started = time.monotonic()
+    results = OpenAIClient(search_backend=backend).search_web(QUERY)
+    assert time.monotonic() - started < 0.5
+    assert all(r["is_tfc"] for r in results)
+    assert len(results) == 5
+
+
+def test_slow_source_is_skipped_after_timeout():
+    backend = StubSearchBackend(
+        results={TFC: hits("tfc-taiwan.org.tw", 2), CNA: hits("cna.com.tw", 2), QUERY: hits("example.com", 5)},
+        delays={TFC: 1.0},
+    )
+    started = time.monotonic()
+    results = OpenAIClient(search_backend=backend, search_timeout=0.2).search_web(QUERY)
+    assert time.monotonic() - started < 0.6
+    assert [r["link"] for r in results][:2] == ["https://cna.com.tw/0", "https://cna.com.tw/1"]
+    assert len(results) == 5
+
+
+def test_raises_when_every_search_fails():
+    class BrokenBackend(StubSearchBackend):
+        def search(self, params, timeout=None):
+            raise ConnectionError("serpapi unreachable")
+
+    with pytest.raises(ConnectionError):
+        OpenAIClient(search_backend=BrokenBackend()).search_web(QUERY)
+
+
+def test_queued_search_past_deadline_does_not_call_backend():
+    backend = StubSearchBackend(results={QUERY: hits("example.com", 1)})
+    client = OpenAIClient(search_backend=backend)
+    # 在執行緒池排隊到期限已過的搜尋直接放棄，不再打 SerpAPI
+    with pytest.raises(TimeoutError):
+        client._search(QUERY, 5, deadline=time.monotonic() - 0.1)
+    assert backend.queries == []
+    assert client._search(QUERY, 5, deadline=time.monotonic() + 1) == hits("example.com", 1)
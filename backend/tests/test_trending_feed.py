@@ -0,0 +1,125 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from threads.models import User, Post
+from threads.infrastructure.cache import redis_client
+from threads.infrastructure.counters import buffer_counter_delta, flush_counters
+from threads.infrastructure.repository.trending_repository import TRENDING_KEY, TrendingRepositoryImpl, trending_score
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def author():
+    # 排行是全域的 key，每個測試從尚未建立的狀態開始
+    redis_client.delete(TRENDING_KEY)
+    yield User.objects.create(username=f"trend{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex[:8]}@example.com")
+    redis_client.delete(TRENDING_KEY)
+
+
+def make_post(author, hours_ago=0, **counts):
+    post = Post.objects.create(author=author, content=f"熱門 {uuid.uuid4().hex}", **counts)
+    if hours_ago:
+        Post.objects.filter(id=post.id).update(created_at=timezone.now() - timedelta(hours=hours_ago))
+    return post
+
+
+def test_score_halves_engagement_every_half_life(settings):
+    settings.TRENDING_HALF_LIFE_HOURS = 6
+    now = timezone.now()
+    # 6 小時前 15 個讚（log2 16 = 4）與現在 7 個讚（log2 8 = 3）相差一個半衰期，分數相同
+    older = trending_score(15, 0, 0, now - timedelta(hours=6))
+    newer = trending_score(7, 0, 0, now)
+    assert older == pytest.approx(newer)
+    assert trending_score(0, 1, 0, now) > trending_score(1, 0, 0, now)
+
+
+def test_rebuild_ranks_recent_originals_by_decayed_score(author, settings):
+    settings.TRENDING_WINDOW_HOURS = 72
+    hot = make_post(author, hours_ago=2, likes_count=40, comments_count=5)
+    fresh = make_post(author, likes_count=3)
+    stale = make_post(author, hours_ago=48, likes_count=200)
+    expired = make_post(author, hours_ago=100, likes_count=5000)
+    make_post(author, is_repost=True, likes_count=999, repost_of_content_type=ContentType.objects.get_for_model(Post),
+              repost_of_content_item_id=hot.id)
+
+    repo = TrendingRepositoryImpl()
+    assert repo.rebuild() == 3
+    assert repo.get_post_ids(0, 10) == [hot.id, fresh.id, stale.id]
+    assert repo.get_post_ids(1, 1) == [fresh.id]
+    assert expired.id not in repo.get_post_ids(0, 10)
+    assert async_to_sync(repo.aget_post_ids)(0, 10) == repo.get_post_ids(0, 10)
+
+
+def test_read_builds_missing_ranking_and_keeps_empty_ranking(author):
+    repo = TrendingRepositoryImpl()
+    assert repo.get_post_ids(0, 10) == []
+    # 空排行也已建立，不會每次讀取都回資料庫重算
+    assert redis_client.exists(TRENDING_KEY)
+
+    post = make_post(author, likes_count=1)
+    assert repo.get_post_ids(0, 10) == []
+    repo.update_scores([post.id])
+    assert repo.get_post_ids(0, 10) == [post.id]
+
+
+def test_counter_flush_updates_scores_incrementally(author, settings):
+    settings.TRENDING_MAX_LENGTH = 2
+    first = make_post(author, likes_count=10)
+    second = make_post(author, likes_count=5)
+    third = make_post(author)
+    repo = TrendingRepositoryImpl()
+    repo.rebuild()
+    assert repo.get_post_ids(0, 10) == [first.id, second.id]
+
+    for _ in range(30):
+        buffer_counter_delta("post", third.id, "likes_count", 1)
+    flush_counters()
+
+    # 只重算有變動的貼文，超過 MAX_LENGTH 的尾端被裁掉
+    assert repo.get_post_ids(0, 10) == [third.id, first.id]
+
+
+def test_update_scores_drops_deleted_posts(author):
+    kept = make_post(author, likes_count=2)
+    gone = make_post(author, likes_count=9)
+    repo = TrendingRepositoryImpl()
+    repo.rebuild()
+
+    Post.objects.filter(id=gone.id).delete()
+    repo.update_scores([gone.id])
+    assert repo.get_post_ids(0, 10) == [kept.id]
+
+
+def test_trending_feed_view(author):
+    low = make_post(author, likes_count=1)
+    high = make_post(author, likes_count=50)
+    client = APIClient()
+    client.force_authenticate(user=author)
+
+    response = client.get("/api/threads/posts/?feed=trending&limit=5")
+    assert response.status_code == 200
+    assert [post["id"] for post in response.data] == [high.id, low.id]
+
+    # 排名會變動，沒有穩定的 cursor
+    assert client.get("/api/threads/posts/?feed=trending&cursor=").status_code == 400
+
+
+def test_trending_feed_rejects_bad_paging(author):
+    for likes in range(60):
+        make_post(author, likes_count=likes)
+    client = APIClient()
+    client.force_authenticate(user=author)
+
+    assert client.get("/api/threads/posts/?feed=trending&limit=0").status_code == 400
+    assert client.get("/api/threads/posts/?feed=trending&limit=-1").status_code == 400
+    assert client.get("/api/threads/posts/?feed=trending&offset=-5").status_code == 400
+    response = client.get("/api/threads/posts/?feed=trending&limit=1000")
+    assert response.status_code == 200 and len(response.data) == 50
+    assert TrendingRepositoryImpl().get_post_ids(0, 0) == []
@@ -30,4 +30,9 @@ class AlreadyExist(BusinessRuleViolation):
 
 class ServiceUnavailable(BusinessRuleViolation):
     def __init__(self, message):
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+class TooManyRequests(BusinessRuleViolation):
+    def __init__(self, message, retry_after=None):
+        self.retry_after = retry_after
+        super().__init__(message)
@@ -0,0 +1,14 @@
+# domain/pagination.py
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    # Keyset 分頁的定位點：以 (created_at, id) 定位上一頁最後一筆，id 用來打破同時間的平手
+    created_at: datetime
+    id: int
+
+    @classmethod
+    def from_entity(cls, entity) -> "PageCursor":
+        return cls(created_at=entity.created_at, id=entity.id)
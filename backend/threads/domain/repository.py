@@ -1,11 +1,13 @@
 # domain/repository.py
 from abc import ABC, abstractmethod
 from typing import Optional, List, Literal
+from datetime import datetime
 from .entities import User as DomainUser
 from .entities import Follow as DomainFollow
 from .entities import Post as DomainPost
 from .entities import Comment as DomainComment
 from .entities import Like as DomainLike
+from .pagination import PageCursor
 
 
 
@@ -17,6 +19,10 @@ class UserRepository(ABC):
     @abstractmethod
     def get_user_by_id(self, user_id: int) -> Optional[DomainUser]:
         pass
+
+    @abstractmethod #async 讀取路徑，給 ASGI 下的 async view 使用
+    async def aget_user_by_id(self, user_id: int) -> Optional[DomainUser]:
+        pass
     
     # @abstractmethod
     # def update_user(self, user: DomainUser) -> DomainUser:
@@ -82,21 +88,42 @@ class PostRepository(ABC):
         pass
 
     @abstractmethod
-    def get_all_posts(self,auth_user_id:int, offset:int,limit:int) -> List[DomainPost]:
+    def get_all_posts(self,auth_user_id:int, offset:int,limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
         pass
     
     @abstractmethod #取得作者的所有貼文 -> 支援profile頁面貼文
-    def get_posts_by_author_id(self,auth_user_id:int, author_id:int, offset:int, limit:int) -> List[DomainPost]:
+    def get_posts_by_author_id(self,auth_user_id:int, author_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
         pass
     
     @abstractmethod #取得所有followings的貼文 -> 支援following頁面貼文
-    def get_posts_by_following_ids(self,auth_user_id:int, following_ids:List[int], offset:int, limit:int) -> List[DomainPost]:
+    def get_posts_by_following_ids(self,auth_user_id:int, following_ids:List[int], offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
         pass
     
     @abstractmethod
     def repost_post(self, post:DomainPost) -> DomainPost:
         pass
 
+    @abstractmethod #依照傳入 id 順序批次取回貼文 -> 支援 timeline 等只持有 id 的列表
+    def get_posts_by_ids(self, auth_user_id:int, post_ids:List[int]) -> List[DomainPost]:
+        pass
+
+    # 以下為 async 讀取路徑，給 ASGI 下的 async view 使用
+    @abstractmethod
+    async def aget_post_by_id(self, post_id:int, auth_user_id: int) -> Optional[DomainPost]:
+        pass
+
+    @abstractmethod
+    async def aget_all_posts(self,auth_user_id:int, offset:int,limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
+        pass
+
+    @abstractmethod
+    async def aget_posts_by_author_id(self,auth_user_id:int, author_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
+        pass
+
+    @abstractmethod
+    async def aget_posts_by_ids(self, auth_user_id:int, post_ids:List[int]) -> List[DomainPost]:
+        pass
+
 class CommentRepository(ABC):
     @abstractmethod
     def get_comment_by_id(self, comment_id:int) -> Optional[DomainUser]:
@@ -114,16 +141,68 @@ class CommentRepository(ABC):
         pass
 
     @abstractmethod
-    def get_comments_by_post_id(self,auth_user_id:int, post_id:int, offset:int, limit:int) -> List[DomainComment]:
+    def get_comments_by_post_id(self,auth_user_id:int, post_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainComment]:
         pass
     
     @abstractmethod
-    def get_all_child_comments_by_comment_id(self,auth_user_id:int, comment_id:int, offset:int, limit:int) -> List[DomainComment]:
+    def get_all_child_comments_by_comment_id(self,auth_user_id:int, comment_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainComment]:
         pass
     @abstractmethod
     def repost_comment(self, comment:DomainComment)-> DomainComment:
         pass
 
+    @abstractmethod #依照傳入 id 順序批次取回留言
+    def get_comments_by_ids(self, auth_user_id:int, comment_ids:List[int]) -> List[DomainComment]:
+        pass
+
+    @abstractmethod #async 讀取路徑，給 ASGI 下的 async view 使用
+    async def aget_comments_by_post_id(self,auth_user_id:int, post_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainComment]:
+        pass
+
+
+
+class TimelineRepository(ABC):
+    @abstractmethod #把新貼文推進所有追蹤者的 timeline，回傳實際寫入的 timeline 數
+    def fan_out_post(self, author_id:int, post_id:int, created_at:datetime) -> int:
+        pass
+
+    @abstractmethod
+    def remove_post(self, author_id:int, post_id:int) -> None:
+        pass
+
+    @abstractmethod #追蹤關係變動後丟掉整條 timeline，下次讀取時從資料庫重建
+    def invalidate(self, user_id:int) -> None:
+        pass
+
+    @abstractmethod #依 timeline 由新到舊取出貼文 id
+    def get_post_ids(self, user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[int]:
+        pass
+
+    @abstractmethod #async 讀取路徑，給 ASGI 下的 async view 使用
+    async def aget_post_ids(self, user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[int]:
+        pass
+
+
+class TrendingRepository(ABC):
+    @abstractmethod #依目前的計數重算熱門排行，回傳排行內的貼文數
+    def rebuild(self) -> int:
+        pass
+
+    @abstractmethod #計數變動後只重算這些貼文的分數
+    def update_scores(self, post_ids:List[int]) -> None:
+        pass
+
+    @abstractmethod
+    def remove_post(self, post_id:int) -> None:
+        pass
+
+    @abstractmethod #依熱門分數由高到低取出貼文 id
+    def get_post_ids(self, offset:int, limit:int) -> List[int]:
+        pass
+
+    @abstractmethod #async 讀取路徑，給 ASGI 下的 async view 使用
+    async def aget_post_ids(self, offset:int, limit:int) -> List[int]:
+        pass
 
 
 class LikeRepository(ABC):
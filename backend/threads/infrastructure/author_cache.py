@@ -0,0 +1,174 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+import redis
+from django.conf import settings
+
+from threads.infrastructure.cache import redis_client, get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class AuthorCache:
+    """作者摘要（目前只有 username）的兩層快取：行程內 TTL-LRU，再來是 Redis，最後才查 app_user
+
+    使用者改名時 invalidate 只清得到 Redis 和本行程的 LRU，
+    其他行程的 LRU 最多舊 local_ttl 秒，所以 local_ttl 要設得短。
+    """
+
+    KEY_PREFIX = "author"
+
+    def __init__(self, client=redis_client, ttl=None, local_ttl=None, local_maxsize=None,
+                 async_client_factory=get_async_redis_client):
+        self.client = client
+        self.async_client_factory = async_client_factory
+        self.ttl = ttl or settings.AUTHOR_CACHE_TTL_SECONDS
+        self.local_ttl = local_ttl or settings.AUTHOR_CACHE_LOCAL_TTL_SECONDS
+        self.local_maxsize = local_maxsize or settings.AUTHOR_CACHE_LOCAL_MAXSIZE
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.KEY_PREFIX}:{user_id}"
+
+    def _get_local(self, user_ids: Iterable[int]) -> Dict[int, dict]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._local.get(user_id)
+                if entry is None:
+                    continue
+                summary, expires_at = entry
+                if expires_at <= now:
+                    del self._local[user_id]
+                    continue
+                self._local.move_to_end(user_id)
+                found[user_id] = summary
+        return found
+
+    def _set_local(self, summaries: Dict[int, dict]) -> None:
+        expires_at = time.monotonic() + self.local_ttl
+        with self._lock:
+            for user_id, summary in summaries.items():
+                self._local[user_id] = (summary, expires_at)
+                self._local.move_to_end(user_id)
+            while len(self._local) > self.local_maxsize:
+                self._local.popitem(last=False)
+
+    def _get_remote(self, user_ids: list) -> Dict[int, dict]:
+        try:
+            values = self.client.mget([self._key(user_id) for user_id in user_ids])
+        except redis.RedisError as e:
+            logger.warning("[AuthorCache] mget 失敗，改讀資料庫: %s", e)
+            return {}
+        return {
+            user_id: json.loads(value)
+            for user_id, value in zip(user_ids, values)
+            if value is not None
+        }
+
+    def _set_remote(self, summaries: Dict[int, dict]) -> None:
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for user_id, summary in summaries.items():
+                pipe.set(self._key(user_id), json.dumps(summary), ex=self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("[AuthorCache] 寫入快取失敗: %s", e)
+
+    def get_many(self, user_ids: Iterable[int]) -> Dict[int, dict]:
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
+        summaries = self._get_local(user_ids)
+
+        missing = [user_id for user_id in user_ids if user_id not in summaries]
+        if missing:
+            remote = self._get_remote(missing)
+            self._set_local(remote)
+            summaries.update(remote)
+
+        missing = [user_id for user_id in missing if user_id not in summaries]
+        if missing:
+            from threads.models import User as DatabaseUser
+
+            # 只選需要的欄位，避免讀整列寬表
+            fetched = {
+                user_id: {"username": username}
+                for user_id, username in DatabaseUser.objects.filter(id__in=missing).values_list("id", "username")
+            }
+            self._set_remote(fetched)
+            self._set_local(fetched)
+            summaries.update(fetched)
+        return summaries
+
+    def get_usernames(self, user_ids: Iterable[int]) -> Dict[int, str]:
+        return {user_id: summary["username"] for user_id, summary in self.get_many(user_ids).items()}
+
+    async def aget_many(self, user_ids: Iterable[int]) -> Dict[int, dict]:
+        # 行程內 LRU 只是記憶體操作，直接共用同步版本；Redis 與資料庫改走 async client / async ORM
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
+        summaries = self._get_local(user_ids)
+
+        missing = [user_id for user_id in user_ids if user_id not in summaries]
+        if missing:
+            remote = await self._aget_remote(missing)
+            self._set_local(remote)
+            summaries.update(remote)
+
+        missing = [user_id for user_id in missing if user_id not in summaries]
+        if missing:
+            from threads.models import User as DatabaseUser
+
+            fetched = {
+                user_id: {"username": username}
+                async for user_id, username in DatabaseUser.objects.filter(id__in=missing).values_list("id", "username")
+            }
+            await self._aset_remote(fetched)
+            self._set_local(fetched)
+            summaries.update(fetched)
+        return summaries
+
+    async def aget_usernames(self, user_ids: Iterable[int]) -> Dict[int, str]:
+        return {user_id: summary["username"] for user_id, summary in (await self.aget_many(user_ids)).items()}
+
+    async def _aget_remote(self, user_ids: list) -> Dict[int, dict]:
+        try:
+            values = await self.async_client_factory().mget([self._key(user_id) for user_id in user_ids])
+        except redis.RedisError as e:
+            logger.warning("[AuthorCache] mget 失敗，改讀資料庫: %s", e)
+            return {}
+        return {
+            user_id: json.loads(value)
+            for user_id, value in zip(user_ids, values)
+            if value is not None
+        }
+
+    async def _aset_remote(self, summaries: Dict[int, dict]) -> None:
+        if not summaries:
+            return
+        try:
+            pipe = self.async_client_factory().pipeline(transaction=False)
+            for user_id, summary in summaries.items():
+                pipe.set(self._key(user_id), json.dumps(summary), ex=self.ttl)
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("[AuthorCache] 寫入快取失敗: %s", e)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._local.pop(user_id, None)
+        try:
+            self.client.delete(self._key(user_id))
+        except redis.RedisError as e:
+            logger.warning("[AuthorCache] 清除快取失敗: %s", e)
+
+
+author_cache = AuthorCache()
\ No newline at end of file
@@ -1,4 +1,43 @@
+import asyncio
+import weakref
+
 import redis
+import redis.asyncio
 from django.conf import settings
 
-redis_client = redis.Redis.from_url(settings.REDIS_URL)
\ No newline at end of file
+from core.metrics import instrument_redis, instrument_async_redis
+
+# 抽樣請求的 Redis 次數與耗時由 RequestMetricsMiddleware 統計
+redis_client = instrument_redis(redis.Redis.from_url(settings.REDIS_URL))
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis_client():
+    """回傳綁定目前 event loop 的 redis.asyncio client
+
+    連線池裡的連線屬於建立它的 event loop；uvicorn 整個行程共用一個 loop，
+    但 WSGI 或測試下每次 async_to_sync 都是新的 loop，所以依 loop 各自建立。
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = instrument_async_redis(redis.asyncio.Redis.from_url(settings.REDIS_URL))
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_redis_client():
+    """關閉目前 event loop 的 client 與連線池
+
+    只給每個請求一個新 loop 的情況（WSGI、測試）在請求結束時呼叫，否則每個請求都會留下一組沒關的連線直到 GC；
+    uvicorn 的 loop 會一直存在，client 持續重用，不需要關。
+    """
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is None:
+        return
+    # redis-py 5.0.1 起改名為 aclose，舊版只有 close
+    if hasattr(client, "aclose"):
+        await client.aclose()
+    else:
+        await client.close()
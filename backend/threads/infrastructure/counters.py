@@ -0,0 +1,201 @@
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+import redis
+from django.db import connection
+
+from threads.infrastructure.cache import redis_client
+from threads.infrastructure.entity_cache import entity_cache
+
+logger = logging.getLogger(__name__)
+
+COUNTER_KINDS = ("post", "comment")
+COUNTER_FIELDS = ("likes_count", "comments_count", "reposts_count")
+FLUSH_BATCH_SIZE = 500
+FLUSH_LOCK_KEY = "counters:flush_lock"
+# 同一時間只有一個 flush，避免兩個 worker 讀到同一批增量各寫一次；worker 當掉時鎖在逾時後釋放
+FLUSH_LOCK_TIMEOUT_SECONDS = 300
+
+# 寫回資料庫之後才扣掉已套用的增量；flush 期間新進的增量留在 hash 裡，歸零的 hash 直接刪除。
+# ARGV 依 KEYS 順序排列，每個 key 先放欄位數，接著是 (欄位, 已套用的增量) 成對
+ACK_SCRIPT = """
+local pos = 1
+for i, key in ipairs(KEYS) do
+    local fields = tonumber(ARGV[pos])
+    pos = pos + 1
+    for j = 1, fields do
+        redis.call('HINCRBY', key, ARGV[pos], -tonumber(ARGV[pos + 1]))
+        pos = pos + 2
+    end
+    local remaining = 0
+    for _, value in ipairs(redis.call('HVALS', key)) do
+        if tonumber(value) ~= 0 then
+            remaining = 1
+        end
+    end
+    if remaining == 0 then
+        redis.call('DEL', key)
+    end
+end
+return #KEYS
+"""
+
+# 把待處理集合併進 flushing 集合後回傳；上一輪中途失敗留下的 flushing 成員也會一起重做
+CLAIM_DIRTY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('SUNIONSTORE', KEYS[2], KEYS[2], KEYS[1])
+    redis.call('DEL', KEYS[1])
+end
+return redis.call('SMEMBERS', KEYS[2])
+"""
+
+_ack_script = redis_client.register_script(ACK_SCRIPT)
+_claim_dirty_script = redis_client.register_script(CLAIM_DIRTY_SCRIPT)
+
+
+def _counter_key(kind: str, row_id) -> str:
+    return f"{kind}:{row_id}"
+
+
+def _dirty_key(kind: str) -> str:
+    return f"counters:dirty:{kind}"
+
+
+def _flushing_key(kind: str) -> str:
+    return f"counters:flushing:{kind}"
+
+
+def buffer_counter_delta(kind: str, row_id: int, field: str, delta: int) -> None:
+    """累加計數增量，並把這一列登記到待處理集合，flush 只需要處理有變動的列"""
+    pipe = redis_client.pipeline()
+    pipe.hincrby(_counter_key(kind, row_id), field, delta)
+    pipe.sadd(_dirty_key(kind), row_id)
+    pipe.execute()
+
+
+def bulk_increment(model, deltas: Dict[int, Dict[str, int]]) -> int:
+    """把多列、多個計數欄位的增量合併成一條 UPDATE ... FROM (VALUES ...)，回傳更新的列數"""
+    deltas = {row_id: fields for row_id, fields in deltas.items() if any(fields.values())}
+    if not deltas:
+        return 0
+
+    fields = sorted({field for row in deltas.values() for field, delta in row.items() if delta})
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = [quote(model._meta.get_field(field).column) for field in fields]
+    aliases = [f"d{index}" for index in range(len(fields))]
+
+    placeholder = "(" + ", ".join(["CAST(%s AS bigint)"] * (len(fields) + 1)) + ")"
+    values = ", ".join([placeholder] * len(deltas))
+    # 計數欄位是 PositiveIntegerField，緩衝與資料庫不同步時也不能減到負數
+    assignments = ", ".join(
+        f"{column} = CASE WHEN {table}.{column} + v.{alias} < 0 THEN 0 "
+        f"ELSE {table}.{column} + v.{alias} END"
+        for column, alias in zip(columns, aliases)
+    )
+    sql = (
+        f"WITH v(id, {', '.join(aliases)}) AS (VALUES {values}) "
+        f"UPDATE {table} SET {assignments} "
+        f"FROM v WHERE {table}.id = v.id"
+    )
+    params: List[int] = []
+    # 依 id 排序，並行的 flush 以相同順序取得列鎖，不會互相死鎖
+    for row_id, row in sorted(deltas.items()):
+        params.append(row_id)
+        params.extend(row.get(field, 0) for field in fields)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _read(keys: List[str]) -> Dict[int, Dict[str, int]]:
+    """只讀不刪，寫回資料庫前 worker 當掉、斷線或逾時，增量都還留在 Redis，下一輪重做"""
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.hgetall(key)
+    deltas = {}
+    for key, raw in zip(keys, pipe.execute()):
+        row = defaultdict(int)
+        for field, value in raw.items():
+            field = field.decode()
+            if field in COUNTER_FIELDS:
+                row[field] += int(value)
+        if any(row.values()):
+            deltas[int(key.split(":", 1)[1])] = dict(row)
+    return deltas
+
+
+def _ack(kind: str, deltas: Dict[int, Dict[str, int]]) -> None:
+    """UPDATE 已 commit，從 hash 扣掉這一輪套用的增量"""
+    row_ids = sorted(deltas)
+    for start in range(0, len(row_ids), FLUSH_BATCH_SIZE):
+        keys, args = [], []
+        for row_id in row_ids[start:start + FLUSH_BATCH_SIZE]:
+            keys.append(_counter_key(kind, row_id))
+            args.append(len(deltas[row_id]))
+            for field, delta in deltas[row_id].items():
+                args.extend([field, delta])
+        _ack_script(keys=keys, args=args)
+
+
+def _pending_keys(kind: str) -> Iterable[List[str]]:
+    """只列出待處理集合裡的列，成本和變動數成正比，與 Redis 裡的 key 總數無關"""
+    row_ids = sorted(int(row_id) for row_id in _claim_dirty_script(keys=[_dirty_key(kind), _flushing_key(kind)]))
+    for start in range(0, len(row_ids), FLUSH_BATCH_SIZE):
+        yield [_counter_key(kind, row_id) for row_id in row_ids[start:start + FLUSH_BATCH_SIZE]]
+
+
+def _update_trending(post_ids) -> None:
+    """計數已寫回資料庫，順手重算這些貼文的熱門分數；失敗不影響 flush，下一次整批重算會補上"""
+    from threads.common.exceptions.repository_exceptions import EntityOperationFailed
+    from threads.infrastructure.repository.trending_repository import TrendingRepositoryImpl
+
+    try:
+        TrendingRepositoryImpl().update_scores(list(post_ids))
+    except EntityOperationFailed as e:
+        logger.warning("[Counters] 熱門排行更新失敗: %s", e.message)
+
+
+def flush_counters() -> dict:
+    """把所有緩衝中的計數寫回資料庫，每張表一條 SQL，回傳這一輪的 keys/rows/耗時
+
+    增量在 UPDATE commit 之後才從 Redis 扣掉，flushing 集合也到那時才清；
+    中途任何一步失敗，下一輪會從 flushing 集合把同一批列重做一次（至少一次，不會遺失）。
+    """
+    from threads.models import Post, Comment
+
+    started = time.monotonic()
+    stats = {"keys": 0, "rows": 0}
+    lock = redis_client.lock(FLUSH_LOCK_KEY, timeout=FLUSH_LOCK_TIMEOUT_SECONDS, blocking=False)
+    if not lock.acquire():
+        # 另一個 flush 正在跑；這段期間新進的增量會由下一次排程或 beat 補跑處理
+        logger.info("[Counters] 另一個 flush 進行中，略過這一輪")
+        stats["elapsed_ms"] = round((time.monotonic() - started) * 1000, 2)
+        return stats
+
+    try:
+        models = {"post": Post, "comment": Comment}
+        for kind in COUNTER_KINDS:
+            deltas = {}
+            for keys in _pending_keys(kind):
+                stats["keys"] += len(keys)
+                deltas.update(_read(keys))
+            if deltas:
+                stats["rows"] += max(bulk_increment(models[kind], deltas), 0)
+                _ack(kind, deltas)
+            redis_client.delete(_flushing_key(kind))
+            if not deltas:
+                continue
+            entity_cache.invalidate(kind, deltas.keys())
+            if kind == "post":
+                _update_trending(deltas.keys())
+    finally:
+        try:
+            lock.release()
+        except redis.RedisError as e:
+            logger.warning("[Counters] 釋放 flush 鎖失敗，等待逾時: %s", e)
+    stats["elapsed_ms"] = round((time.monotonic() - started) * 1000, 2)
+    return stats
@@ -0,0 +1,135 @@
+import json
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+import redis
+from django.conf import settings
+
+from threads.infrastructure.cache import redis_client, get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 只有版本號和讀取時相同才回填，避免「讀到舊資料 -> 其他請求更新並失效 -> 舊資料被寫回」的競態
+SET_IF_VERSION_SCRIPT = """
+local current = redis.call('GET', KEYS[1]) or '0'
+if current == ARGV[1] then
+    redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class EntityCache:
+    """貼文/留言與觀看者無關的快照快取，is_liked 等個人化欄位不進快取
+
+    每個實體有獨立的版本號，寫入（更新、刪除、計數 flush）時遞增版本並刪除快照，
+    快照內記錄產生時的版本，版本不符即視為 miss。
+    """
+
+    KEY_PREFIX = "entity"
+
+    def __init__(self, client=redis_client, ttl=None, async_client_factory=get_async_redis_client):
+        self.client = client
+        self.async_client_factory = async_client_factory
+        self.ttl = ttl or settings.ENTITY_CACHE_TTL_SECONDS
+        self._set_if_version = client.register_script(SET_IF_VERSION_SCRIPT)
+
+    def _key(self, kind: str, entity_id: int) -> str:
+        return f"{self.KEY_PREFIX}:{kind}:{entity_id}"
+
+    def _version_key(self, kind: str, entity_id: int) -> str:
+        return f"{self.KEY_PREFIX}:ver:{kind}:{entity_id}"
+
+    def get_many(self, kind: str, ids: List[int]) -> Tuple[Dict[int, dict], Dict[int, str]]:
+        """回傳 (命中的快照, 讀取當下的版本號)，版本號在回填時使用"""
+        if not ids:
+            return {}, {}
+        keys = [self._version_key(kind, entity_id) for entity_id in ids]
+        keys += [self._key(kind, entity_id) for entity_id in ids]
+        try:
+            values = self.client.mget(keys)
+        except redis.RedisError as e:
+            # 快取掛掉時直接回源資料庫，不影響讀取
+            logger.warning("[EntityCache] mget 失敗，改讀資料庫: %s", e)
+            return {}, {}
+        return self._parse(ids, values)
+
+    async def aget_many(self, kind: str, ids: List[int]) -> Tuple[Dict[int, dict], Dict[int, str]]:
+        if not ids:
+            return {}, {}
+        keys = [self._version_key(kind, entity_id) for entity_id in ids]
+        keys += [self._key(kind, entity_id) for entity_id in ids]
+        try:
+            values = await self.async_client_factory().mget(keys)
+        except redis.RedisError as e:
+            logger.warning("[EntityCache] mget 失敗，改讀資料庫: %s", e)
+            return {}, {}
+        return self._parse(ids, values)
+
+    def _parse(self, ids: List[int], values: list) -> Tuple[Dict[int, dict], Dict[int, str]]:
+        versions = {
+            entity_id: (version.decode() if version is not None else "0")
+            for entity_id, version in zip(ids, values[:len(ids)])
+        }
+        hits = {}
+        for entity_id, value in zip(ids, values[len(ids):]):
+            if value is None:
+                continue
+            cached = json.loads(value)
+            if cached.get("version") == versions[entity_id]:
+                hits[entity_id] = cached["snapshot"]
+        return hits, versions
+
+    def set_many(self, kind: str, snapshots: Dict[int, dict], versions: Dict[int, str]) -> None:
+        if not snapshots:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for entity_id, snapshot in snapshots.items():
+                version = versions.get(entity_id, "0")
+                self._set_if_version(
+                    keys=[self._version_key(kind, entity_id), self._key(kind, entity_id)],
+                    args=[version, json.dumps({"version": version, "snapshot": snapshot}), self.ttl],
+                    client=pipe,
+                )
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("[EntityCache] 寫入快取失敗: %s", e)
+
+    async def aset_many(self, kind: str, snapshots: Dict[int, dict], versions: Dict[int, str]) -> None:
+        if not snapshots:
+            return
+        try:
+            client = self.async_client_factory()
+            set_if_version = client.register_script(SET_IF_VERSION_SCRIPT)
+            pipe = client.pipeline(transaction=False)
+            for entity_id, snapshot in snapshots.items():
+                version = versions.get(entity_id, "0")
+                await set_if_version(
+                    keys=[self._version_key(kind, entity_id), self._key(kind, entity_id)],
+                    args=[version, json.dumps({"version": version, "snapshot": snapshot}), self.ttl],
+                    client=pipe,
+                )
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("[EntityCache] 寫入快取失敗: %s", e)
+
+    def invalidate(self, kind: str, ids: Iterable[int]) -> None:
+        ids = list(ids)
+        if not ids:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for entity_id in ids:
+                version_key = self._version_key(kind, entity_id)
+                pipe.incr(version_key)
+                # 版本號活得比快照久即可，過期後從 0 重新起算也只會造成一次 miss
+                pipe.expire(version_key, self.ttl * 2)
+                pipe.delete(self._key(kind, entity_id))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("[EntityCache] 清除快取失敗: %s", e)
+
+
+entity_cache = EntityCache()
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from typing import Optional
+
+import httpx
+from django.conf import settings
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# 行程內共用的外部服務 client，第一次使用時才建立：gunicorn / celery fork 出的子行程各自建立，不會共用父行程的 socket
+_lock = threading.Lock()
+_serpapi_client: Optional[httpx.Client] = None
+_openai_client: Optional[OpenAI] = None
+_async_openai_clients = weakref.WeakKeyDictionary()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.EXTERNAL_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.EXTERNAL_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.EXTERNAL_HTTP_KEEPALIVE_SECONDS,
+    )
+
+
+def _timeout(read: float) -> httpx.Timeout:
+    return httpx.Timeout(read, connect=settings.EXTERNAL_HTTP_CONNECT_TIMEOUT_SECONDS)
+
+
+def get_serpapi_client() -> httpx.Client:
+    """SerpAPI 用的連線池，keep-alive 讓每次搜尋不必重新 TLS 交握"""
+    global _serpapi_client
+    if _serpapi_client is None:
+        with _lock:
+            if _serpapi_client is None:
+                _serpapi_client = httpx.Client(
+                    base_url="https://serpapi.com",
+                    timeout=_timeout(settings.FACT_CHECK_SEARCH_TIMEOUT_SECONDS),
+                    # 連線建立失敗（DNS、connect reset）由 transport 直接重試
+                    transport=httpx.HTTPTransport(retries=settings.EXTERNAL_HTTP_RETRIES, limits=_limits()),
+                )
+    return _serpapi_client
+
+
+def get_openai_client() -> OpenAI:
+    """OpenAI SDK 本身會對 429 / 5xx / 逾時以指數退避重試，這裡只替它換上有上限的連線池"""
+    global _openai_client
+    if _openai_client is None:
+        with _lock:
+            if _openai_client is None:
+                _openai_client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=settings.OPENAI_BASE_URL,
+                    max_retries=settings.OPENAI_MAX_RETRIES,
+                    timeout=_timeout(settings.OPENAI_TIMEOUT_SECONDS),
+                    http_client=DefaultHttpxClient(limits=_limits()),
+                )
+    return _openai_client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """AsyncOpenAI 底下的 httpx 連線池屬於建立它的 event loop，和 get_async_redis_client 一樣依 loop 各自建立"""
+    loop = asyncio.get_running_loop()
+    client = _async_openai_clients.get(loop)
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            timeout=_timeout(settings.OPENAI_TIMEOUT_SECONDS),
+            http_client=DefaultAsyncHttpxClient(limits=_limits()),
+        )
+        _async_openai_clients[loop] = client
+    return client
+
+
+async def close_async_openai_client() -> None:
+    """與 close_async_redis_client 相同，請求專用的 loop 結束前關掉這個 loop 的連線池"""
+    client = _async_openai_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def request_with_retry(client: httpx.Client, method: str, url: str, retries: Optional[int] = None,
+                       backoff: Optional[float] = None, deadline: Optional[float] = None, **kwargs) -> httpx.Response:
+    """429 / 5xx 與傳輸錯誤以指數退避加 jitter 重試，有 Retry-After 時照它等；最後一次的回應或錯誤原樣交給呼叫端
+
+    deadline 為 time.monotonic() 的絕對時間：每次請求的逾時縮到剩餘時間內，等不到下一次重試就不再睡，
+    整個呼叫（含重試與退避）不會超過 deadline，呼叫端放棄等待後執行緒也會在期限內釋放。
+    """
+    retries = settings.EXTERNAL_HTTP_RETRIES if retries is None else retries
+    backoff = settings.EXTERNAL_HTTP_BACKOFF_SECONDS if backoff is None else backoff
+    for attempt in range(retries + 1):
+        last_attempt = attempt == retries
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise httpx.TimeoutException(f"{method} {url} 超過期限")
+            kwargs["timeout"] = remaining
+        try:
+            response = client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if last_attempt:
+                raise
+            logger.warning("[HTTP] %s %s 失敗，第 %s 次重試: %s", method, url, attempt + 1, e)
+            delay = backoff * 2 ** attempt
+            error, response = e, None
+        else:
+            if response.status_code not in RETRYABLE_STATUS or last_attempt:
+                return response
+            logger.warning("[HTTP] %s %s 回應 %s，第 %s 次重試", method, url, response.status_code, attempt + 1)
+            delay = _retry_after(response) or backoff * 2 ** attempt
+            error = None
+        delay += random.uniform(0, backoff)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            # 退避完已經超過期限，直接交出這一次的結果
+            if error is not None:
+                raise error
+            return response
+        time.sleep(delay)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return min(float(response.headers["Retry-After"]), settings.EXTERNAL_HTTP_MAX_RETRY_AFTER_SECONDS)
+    except (KeyError, ValueError):
+        return None
@@ -1,16 +1,34 @@
-from openai import OpenAI
-from serpapi import GoogleSearch
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import AsyncIterator, Iterator, List, Optional, Union
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from typing import Union
 
-client = OpenAI(
-    api_key = settings.OPENAI_API_KEY
+from threads.infrastructure.external.http_clients import get_openai_client, get_async_openai_client
+from threads.infrastructure.external.search_backend import SearchBackend, default_search_backend
+
+logger = logging.getLogger(__name__)
+
+# 搜尋都在等網路，多個查核請求共用一個執行緒池，不必每次建立
+_search_executor = ThreadPoolExecutor(
+    max_workers=settings.FACT_CHECK_SEARCH_MAX_WORKERS, thread_name_prefix="fact-check-search"
 )
 
+SEARCH_PARAMS = {
+    "hl": "zh-tw",  # 使用繁體中文地區
+    "gl": "tw",     # 鎖定台灣地區
+    "safe": "active"  # 過濾低可信度或色情資訊
+}
+
+
 class OpenAIClient:
-    def __init__(self, model="gpt-4o"):
+    def __init__(self, model="gpt-4o", search_backend: Optional[SearchBackend] = None, search_timeout=None):
         self.model = model
         self.serpapi_key = settings.SERPAPI_API_KEY
+        self.search_backend = search_backend or default_search_backend()
+        self.search_timeout = search_timeout or settings.FACT_CHECK_SEARCH_TIMEOUT_SECONDS
 
     def search_web_v01(self, query: str):
 
@@ -21,17 +39,7 @@ class OpenAIClient:
         ]
                 
 
-        search = GoogleSearch({
-            "q": query,
-            "api_key": self.serpapi_key,
-            "num": 5,
-            "hl": "zh-tw",  # 使用繁體中文地區
-            "gl": "tw",     # 鎖定台灣地區
-            "safe": "active"  # 過濾低可信度或色情資訊
-        })
-
-
-        data = search.get_dict()
+        data = self.search_backend.search({"q": query, "num": 5, **SEARCH_PARAMS}, timeout=self.search_timeout)
         results = []
         for idx, r in enumerate(data.get("organic_results", []), start=1):
             title = r.get("title")
@@ -45,61 +53,73 @@ class OpenAIClient:
             })
         
         return results
-    
+
+    def _search(self, query: str, num: int, deadline: Optional[float] = None) -> List[dict]:
+        timeout = self.search_timeout
+        if deadline is not None:
+            # 在執行緒池排隊的時間也算在期限內，輪到時只剩多少時間就只搜多久
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                raise FuturesTimeout()
+        return self.search_backend.search({"q": query, "num": num, **SEARCH_PARAMS}, timeout=timeout) \
+            .get("organic_results", [])
+
     def search_web(self, query: str):
         priority_sites = [
             "site:tfc-taiwan.org.tw",  # ✅ TFC 優先
             "site:cna.com.tw",
             "site:twreporter.org"
         ]
-        results = []
 
-        # 第一階段：只查可信來源
-        for site in priority_sites:
-            resp = GoogleSearch({
-                "q": f"{query} {site}",
-                "api_key": self.serpapi_key,
-                "num": 5,
-                "hl": "zh-tw",
-                "gl": "tw",
-                "safe": "active"
-            }).get_dict()
-            for r in resp.get("organic_results", []):
-                link = r.get("link", "").split("\n")[0].strip()
-                results.append({
-                    "idx": len(results) + 1,
-                    "title": r.get("title", "").strip(),
-                    "link": link,
-                    "snippet": r.get("snippet", "").strip(),
-                    "is_tfc": "tfc-taiwan.org.tw" in link
-                })
-            if len(results) >= 5:
-                break
-
-        # 如果第一階段結果不足，才補一般來源
-        if len(results) < 5:
-            resp = GoogleSearch({
-                "q": query,
-                "api_key": self.serpapi_key,
-                "num": 5 - len(results),
-                "hl": "zh-tw",
-                "gl": "tw",
-                "safe": "active"
-            }).get_dict()
-            for r in resp.get("organic_results", []):
+        # 可信來源與一般搜尋同時送出，總耗時取決於最慢的一次而非加總；
+        # 一般搜尋只在可信來源不足 5 筆時採用，順序仍是可信來源優先
+        queries = [f"{query} {site}" for site in priority_sites] + [query]
+        deadline = time.monotonic() + self.search_timeout
+        # future.cancel() 停不了已經在跑的搜尋，所以每個搜尋自己也守同一個期限，逾時後不會繼續佔著執行緒
+        futures = [_search_executor.submit(self._search, q, 5, deadline) for q in queries]
+
+        batches, errors = [], []
+        try:
+            for future, q in zip(futures, queries):
+                try:
+                    batches.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+                except FuturesTimeout as e:
+                    logger.warning("[SearchWeb] 搜尋逾時: %s", q)
+                    errors.append(e)
+                    batches.append([])
+                except Exception as e:
+                    # 單一來源失敗不影響其他來源
+                    logger.warning("[SearchWeb] 搜尋失敗: %s (%s)", q, e)
+                    errors.append(e)
+                    batches.append([])
+                # 依優先順序累積到 5 筆就不再等後面的搜尋
+                if sum(len(batch) for batch in batches) >= 5:
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+
+        # 全部失敗時不要讓 GPT 在沒有來源的情況下作答
+        if len(errors) == len(queries):
+            raise errors[-1]
+
+        results = []
+        for site_index, batch in enumerate(batches):
+            is_priority = site_index < len(priority_sites)
+            for r in batch:
                 link = r.get("link", "").split("\n")[0].strip()
                 results.append({
                     "idx": len(results) + 1,
                     "title": r.get("title", "").strip(),
                     "link": link,
                     "snippet": r.get("snippet", "").strip(),
-                    "is_tfc": False
+                    "is_tfc": is_priority and "tfc-taiwan.org.tw" in link
                 })
 
         return results[:5]
     
     def ask(self, prompt: str) -> str:
-        response = client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model=self.model,
             messages=[
                 {"role": "system", "content": "你是一位幫助使用者解答問題的助理，你的目標是根據使用者詢問的事實主題，設計一個好的 Google Search prompt。"},
@@ -108,7 +128,7 @@ class OpenAIClient:
         )
         return response.choices[0].message.content
     
-    def fact_check(self, prompt_or_dict: Union[str, dict]) -> str:
+    def _fact_check_messages(self, prompt_or_dict: Union[str, dict]) -> List[dict]:
         if isinstance(prompt_or_dict, dict):
             prompt = prompt_or_dict.get("prompt") or ""
             content = prompt_or_dict.get("content")
@@ -119,19 +139,12 @@ class OpenAIClient:
             query = content
 
         results = self.search_web(query)
- 
-        # search_text = "\n".join(
-        #     f"[{r['idx']}] {r['title']}: {r['snippet']} ({r['link']})"
-        #     for r in results
-        # )
-        # print(search_text)
 
         # 製作搜尋結果文字（標記 TFC 來源）
         search_text = "\n".join(
             f"{'[TFC]' if r['is_tfc'] else ''}[{r['idx']}] {r['title']}: {r['snippet']} ({r['link']})"
             for r in results
         )
-        print(search_text)
 
         system_msg = "你是一位會根據提供來源以 Markdown 格式回答的查核助理。"
         user_msg = (
@@ -153,12 +166,45 @@ class OpenAIClient:
         )
 
 
-        resp = client.chat.completions.create(
+        return [
+            {"role": "system", "content": system_msg},
+            {"role": "user", "content": user_msg}
+        ]
+
+    def fact_check(self, prompt_or_dict: Union[str, dict]) -> str:
+        resp = get_openai_client().chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": user_msg}
-            ]
+            messages=self._fact_check_messages(prompt_or_dict)
         )
         
-        return resp.choices[0].message.content
\ No newline at end of file
+        return resp.choices[0].message.content
+
+    def fact_check_stream(self, prompt_or_dict: Union[str, dict]) -> Iterator[str]:
+        """與 fact_check 相同，但邊生成邊回傳文字片段"""
+        stream = get_openai_client().chat.completions.create(
+            model=self.model,
+            messages=self._fact_check_messages(prompt_or_dict),
+            stream=True
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # 使用者中途離開時關掉上游連線，不再為沒人看的 token 付費
+            stream.close()
+
+    async def afact_check_stream(self, prompt_or_dict: Union[str, dict]) -> AsyncIterator[str]:
+        """ASGI 下用的 fact_check_stream，搜尋在執行緒池跑，生成的 token 在 event loop 上轉送"""
+        messages = await sync_to_async(self._fact_check_messages, thread_sensitive=False)(prompt_or_dict)
+        stream = await get_async_openai_client().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
\ No newline at end of file
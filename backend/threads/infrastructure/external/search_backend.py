@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import redis
+from django.conf import settings
+
+from core.metrics import registry
+from threads.infrastructure.external.http_clients import get_serpapi_client, request_with_retry
+from threads.infrastructure.cache import redis_client
+from threads.infrastructure.fact_check_cache import normalize
+
+logger = logging.getLogger(__name__)
+
+
+class SearchBackend(ABC):
+    """網頁搜尋來源，回傳與 SerpAPI 相同結構的 dict（至少含 organic_results）
+
+    timeout 是整次搜尋（含重試）的時間上限，不是單一請求的逾時。
+    """
+
+    @abstractmethod
+    def search(self, params: dict, timeout: Optional[float] = None) -> dict:
+        pass
+
+
+class SerpApiSearchBackend(SearchBackend):
+    """直接呼叫 SerpAPI 的 HTTP API：GoogleSearch 每次都用 requests.get 開新連線，這裡改走共用的 keep-alive 連線池"""
+
+    def __init__(self, api_key: str, http_client=None):
+        self.api_key = api_key
+        self.http_client = http_client
+
+    def search(self, params: dict, timeout: Optional[float] = None) -> dict:
+        query = {**params, "engine": "google", "output": "json", "source": "python", "api_key": self.api_key}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        response = request_with_retry(
+            self.http_client or get_serpapi_client(), "GET", "/search", deadline=deadline, params=query
+        )
+        try:
+            # 額度用完、參數錯誤等情況 SerpAPI 仍回 JSON 的 {"error": ...}，與 GoogleSearch.get_dict 相同交給呼叫端判斷
+            return response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise
+
+
+class CachedSearchBackend(SearchBackend):
+    """在搜尋來源前加一層 Redis 快取，同一則謠言被許多人查核時只打一次 SerpAPI
+
+    鍵為正規化後的查詢字串（含 site: 過濾）與其餘參數的雜湊，只快取 organic_results；
+    命中與未命中計入 /metrics 的 threads_search_cache_requests_total。
+    """
+
+    KEY_PREFIX = "search"
+
+    def __init__(self, backend: SearchBackend, client=redis_client, ttl=None):
+        self.backend = backend
+        self.client = client
+        self.ttl = ttl or settings.SEARCH_CACHE_TTL_SECONDS
+
+    def _key(self, params: dict) -> str:
+        normalized = {**params, "q": normalize(params["q"])}
+        normalized.pop("api_key", None)
+        digest = hashlib.sha256(json.dumps(normalized, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+        return f"{self.KEY_PREFIX}:{digest}"
+
+    def search(self, params: dict, timeout: Optional[float] = None) -> dict:
+        key = self._key(params)
+        try:
+            cached = self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning("[SearchCache] 讀取失敗，直接搜尋: %s", e)
+            cached = None
+        if cached is not None:
+            self._count("hit")
+            return json.loads(cached)
+
+        self._count("miss")
+        data = self.backend.search(params, timeout=timeout)
+        # SerpAPI 額度用完或參數錯誤時回 {"error": ...}，不能當成「沒有結果」快取起來
+        if "error" not in data:
+            try:
+                self.client.set(key, json.dumps({"organic_results": data.get("organic_results", [])}), ex=self.ttl)
+            except redis.RedisError as e:
+                logger.warning("[SearchCache] 寫入失敗: %s", e)
+        return data
+
+    def _count(self, result: str) -> None:
+        registry.increment("threads_search_cache_requests_total", (("result", result),))
+        # Celery worker 沒有經過 middleware，由這裡觸發定期 flush
+        registry.maybe_flush()
+
+
+class StubSearchBackend(SearchBackend):
+    """測試與本地開發用：依查詢字串回傳預先給定的結果，可模擬延遲，並記錄收到的查詢"""
+
+    def __init__(self, results: Optional[Dict[str, List[dict]]] = None, delays: Optional[Dict[str, float]] = None,
+                 default_delay: float = 0.0):
+        self.results = results or {}
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self.queries: List[str] = []
+
+    def search(self, params: dict, timeout: Optional[float] = None) -> dict:
+        query = params["q"]
+        self.queries.append(query)
+        delay = self.delays.get(query, self.default_delay)
+        # 與真正的來源相同，超過 timeout 就放棄，不會一直佔著執行緒
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"搜尋逾時: {query}")
+        time.sleep(delay)
+        organic = self.results.get(query, [])
+        return {"organic_results": organic[:params.get("num", len(organic))]}
+
+
+def default_search_backend() -> SearchBackend:
+    backend = SerpApiSearchBackend(settings.SERPAPI_API_KEY)
+    if settings.SEARCH_CACHE_ENABLED:
+        return CachedSearchBackend(backend)
+    return backend
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+import uuid
+from typing import Callable, Optional
+
+import redis
+from django.conf import settings
+
+from threads.infrastructure.cache import redis_client
+from threads.infrastructure.rate_limit import llm_semaphore
+
+logger = logging.getLogger(__name__)
+
+# 只有持有者才能釋放，避免逾時後釋放到下一個請求拿到的鎖
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: Optional[str]) -> str:
+    """全形/半形、大小寫、多餘空白不同的轉貼文視為同一篇"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode()).hexdigest()
+
+
+class FactCheckCache:
+    """以正規化後的內容雜湊快取查核結果，同一內容同時只有一個請求會打 SerpAPI + OpenAI
+
+    factcheck:result:{content_hash} 是 hash，field 為 (prompt, model) 的雜湊，
+    同一篇內容的所有查核放在一起，清除時以內容為單位整個刪掉。
+    """
+
+    KEY_PREFIX = "factcheck"
+    POLL_INTERVAL_SECONDS = 0.2
+
+    def __init__(self, client=redis_client, ttl=None, inflight_timeout=None):
+        self.client = client
+        self.ttl = ttl or settings.FACT_CHECK_CACHE_TTL_SECONDS
+        self.inflight_timeout = inflight_timeout or settings.FACT_CHECK_INFLIGHT_TIMEOUT_SECONDS
+        self._release_lock = client.register_script(RELEASE_LOCK_SCRIPT)
+
+    def _result_key(self, content: str) -> str:
+        return f"{self.KEY_PREFIX}:result:{_digest(normalize(content))}"
+
+    def _field(self, prompt: Optional[str], model: str) -> str:
+        return _digest(normalize(prompt), model)
+
+    def _lock_key(self, content: str, prompt: Optional[str], model: str) -> str:
+        return f"{self.KEY_PREFIX}:inflight:{_digest(normalize(content), normalize(prompt), model)}"
+
+    def get(self, content: str, prompt: Optional[str], model: str) -> Optional[str]:
+        try:
+            raw = self.client.hget(self._result_key(content), self._field(prompt, model))
+        except redis.RedisError as e:
+            logger.warning("[FactCheckCache] 讀取失敗，改為直接查核: %s", e)
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        # hash 的 TTL 會被同內容的新結果延長，個別結果的時效看自己的寫入時間
+        if time.time() - entry["created_at"] > self.ttl:
+            return None
+        return entry["result"]
+
+    def set(self, content: str, prompt: Optional[str], model: str, result: str) -> None:
+        key = self._result_key(content)
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.hset(key, self._field(prompt, model), json.dumps({"result": result, "created_at": time.time()}))
+            pipe.expire(key, self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("[FactCheckCache] 寫入失敗: %s", e)
+
+    def invalidate(self, content: str) -> bool:
+        """清除這段內容的所有查核結果（任何 prompt、任何 model）"""
+        return bool(self.client.delete(self._result_key(content)))
+
+    def invalidate_all(self) -> int:
+        deleted = 0
+        for key in self.client.scan_iter(match=f"{self.KEY_PREFIX}:result:*", count=500):
+            deleted += self.client.delete(key)
+        return deleted
+
+    def acquire_inflight(self, content: str, prompt: Optional[str], model: str) -> Optional[str]:
+        """搶 in-flight 鎖，搶到回傳 token，已有人在查核回傳 None；Redis 無法使用時視為搶到，直接查核"""
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.client.set(self._lock_key(content, prompt, model), token, nx=True, ex=self.inflight_timeout)
+        except redis.RedisError as e:
+            logger.warning("[FactCheckCache] 無法取得 in-flight 鎖，改為直接查核: %s", e)
+            return token
+        return token if acquired else None
+
+    def release_inflight(self, content: str, prompt: Optional[str], model: str, token: str) -> None:
+        try:
+            self._release_lock(keys=[self._lock_key(content, prompt, model)], args=[token])
+        except redis.RedisError as e:
+            logger.warning("[FactCheckCache] 釋放 in-flight 鎖失敗，等待過期: %s", e)
+
+    def get_or_compute(self, content: str, prompt: Optional[str], model: str, compute: Callable[[], str]) -> str:
+        """命中直接回傳；未命中時搶 in-flight 鎖，搶到的人查核並寫入，其餘等結果出現
+
+        持有者失敗或鎖過期時，等待中的請求會接手重搶；Redis 掛掉則退回直接查核。
+        """
+        deadline = time.monotonic() + self.inflight_timeout
+        while True:
+            cached = self.get(content, prompt, model)
+            if cached is not None:
+                return cached
+            token = self.acquire_inflight(content, prompt, model)
+            if token is not None:
+                break
+            if time.monotonic() >= deadline:
+                logger.warning("[FactCheckCache] 等待相同查核逾時，改為直接查核")
+                return compute()
+            time.sleep(self.POLL_INTERVAL_SECONDS)
+
+        try:
+            result = compute()
+            self.set(content, prompt, model, result)
+            return result
+        finally:
+            self.release_inflight(content, prompt, model, token)
+
+
+def fact_check_with_cache(content: str, prompt: Optional[str] = None, client=None, cache=None, semaphore=None) -> str:
+    """view 與背景任務共用的查核入口；快取命中不佔 LLM 名額，名額已滿時丟 CapacityExceeded"""
+    from threads.infrastructure.external.openai_client import OpenAIClient
+
+    client = client or OpenAIClient()
+    cache = cache or FactCheckCache()
+    semaphore = semaphore or llm_semaphore()
+    target = {"content": content, "prompt": prompt} if prompt else content
+
+    def compute():
+        with semaphore.hold():
+            return client.fact_check(target)
+
+    return cache.get_or_compute(content, prompt, client.model, compute)
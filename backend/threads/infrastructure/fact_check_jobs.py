@@ -0,0 +1,71 @@
+import time
+import uuid
+from typing import Optional
+
+from django.conf import settings
+
+from threads.infrastructure.cache import redis_client
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class FactCheckJobStore:
+    """非同步查核工作的狀態與結果，存在 Redis hash factcheck:job:{job_id}
+
+    POST 只寫入 pending 並送出 Celery 任務，worker 執行完把結果寫回同一個 hash，
+    前端以 job_id 輪詢；結果只需保留到使用者看完，所以整個 hash 帶 TTL。
+    """
+
+    KEY_PREFIX = "factcheck:job"
+
+    def __init__(self, client=redis_client, ttl=None):
+        self.client = client
+        self.ttl = ttl or settings.FACT_CHECK_JOB_TTL_SECONDS
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{job_id}"
+
+    def create(self, user_id: int, content: str, prompt: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        self._write(job_id, {
+            "status": PENDING,
+            "user_id": user_id,
+            "content": content,
+            "prompt": prompt or "",
+            "created_at": time.time(),
+        })
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        raw = self.client.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        job = {key.decode(): value.decode() for key, value in raw.items()}
+        job["job_id"] = job_id
+        job["user_id"] = int(job["user_id"])
+        return job
+
+    def mark_pending(self, job_id: str) -> None:
+        self._write(job_id, {"status": PENDING})
+
+    def mark_running(self, job_id: str) -> None:
+        self._write(job_id, {"status": RUNNING, "started_at": time.time()})
+
+    def mark_done(self, job_id: str, result: str) -> None:
+        self._write(job_id, {"status": DONE, "result": result, "finished_at": time.time()})
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._write(job_id, {"status": FAILED, "error": error, "finished_at": time.time()})
+
+    def delete(self, job_id: str) -> None:
+        self.client.delete(self._key(job_id))
+
+    def _write(self, job_id: str, fields: dict) -> None:
+        key = self._key(job_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
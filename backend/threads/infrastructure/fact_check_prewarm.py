@@ -0,0 +1,69 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import List, Tuple
+
+from django.db.models import F
+from django.utils import timezone
+
+from threads.infrastructure.external.openai_client import OpenAIClient
+from threads.infrastructure.fact_check_cache import FactCheckCache, fact_check_with_cache
+from threads.infrastructure.rate_limit import CapacityExceeded
+from threads.models import Post
+
+logger = logging.getLogger(__name__)
+
+
+def select_viral_posts(limit: int, window_hours: float) -> List[Tuple[int, str]]:
+    """近 window_hours 小時內 likes_count + reposts_count 最高的原創貼文
+
+    以 post_created_id_idx 取時間範圍，只在視窗內排序，不會掃整張表；轉發本身不查核，熱度算在原文上。
+    """
+    since = timezone.now() - timedelta(hours=window_hours)
+    return list(
+        Post.objects.filter(created_at__gte=since, is_repost=False)
+        .exclude(content="")
+        .annotate(score=F("likes_count") + F("reposts_count"))
+        .order_by("-score", "-id")
+        .values_list("id", "content")[:limit]
+    )
+
+
+def prewarm_fact_checks(limit: int, window_hours: float, concurrency: int, client=None, cache=None) -> dict:
+    """替熱門貼文預先查核並寫入查核快取，使用者點「查核」時直接命中
+
+    與使用者點擊相同，以貼文內容、不帶 prompt 為鍵；已在快取中的略過。
+    並行數刻意小於 LLM_MAX_CONCURRENCY，預熱不會把使用者的查核擠到 429；名額已滿的貼文留給下一輪。
+    """
+    started = time.perf_counter()
+    client = client or OpenAIClient()
+    cache = cache or FactCheckCache()
+    posts = select_viral_posts(limit, window_hours)
+    stats = {"selected": len(posts), "cached": 0, "checked": 0, "busy": 0, "failed": 0}
+
+    pending = []
+    for post_id, content in posts:
+        if cache.get(content, None, client.model) is not None:
+            stats["cached"] += 1
+        else:
+            pending.append((post_id, content))
+
+    def check(item):
+        post_id, content = item
+        try:
+            fact_check_with_cache(content, None, client=client, cache=cache)
+            return "checked"
+        except CapacityExceeded:
+            return "busy"
+        except Exception:
+            logger.exception("[Prewarm] 貼文 %s 查核失敗", post_id)
+            return "failed"
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="fact-check-prewarm") as pool:
+            for outcome in pool.map(check, pending):
+                stats[outcome] += 1
+
+    stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000)
+    return stats
@@ -0,0 +1,141 @@
+import logging
+import math
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+import redis
+from django.conf import settings
+
+from threads.infrastructure.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+# 取令牌前先依經過時間補充，整段在 Redis 內原子執行，多個 worker 同時扣也不會超發
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+# 持有者存在 ZSET，score 是租約到期時間；worker 當掉沒釋放的名額會在到期後自動清掉
+SEMAPHORE_ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+    return 1
+end
+return 0
+"""
+
+
+class CapacityExceeded(Exception):
+    """名額或令牌用完，retry_after 為建議等待秒數"""
+
+    def __init__(self, message: str, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class TokenBucket:
+    """每個 key 一個令牌桶：容量 capacity，每秒補 rate 個"""
+
+    KEY_PREFIX = "ratelimit"
+
+    def __init__(self, capacity: float, rate: float, client=redis_client):
+        self.capacity = capacity
+        self.rate = rate
+        self.client = client
+        self._consume = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, key: str) -> Tuple[bool, float]:
+        """回傳 (是否放行, 下一個令牌的等待秒數)"""
+        try:
+            allowed, retry_after = self._consume(
+                keys=[f"{self.KEY_PREFIX}:{key}"], args=[self.capacity, self.rate, time.time()]
+            )
+        except redis.RedisError as e:
+            # 限流只是保護，Redis 掛掉時放行，不讓整個查核功能跟著停擺
+            logger.warning("[RateLimit] 令牌桶無法使用，暫不限流: %s", e)
+            return True, 0.0
+        return bool(allowed), float(retry_after)
+
+
+class RedisSemaphore:
+    """跨行程的計數號誌，限制同時進行中的上游呼叫數"""
+
+    KEY_PREFIX = "semaphore"
+
+    def __init__(self, name: str, limit: int, lease_seconds: float, retry_after: float, client=redis_client):
+        self.key = f"{self.KEY_PREFIX}:{name}"
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self.retry_after = retry_after
+        self.client = client
+        self._acquire = client.register_script(SEMAPHORE_ACQUIRE_SCRIPT)
+
+    def acquire(self) -> Optional[str]:
+        """取得名額回傳 token，額滿時丟 CapacityExceeded；Redis 無法使用時回傳 None 並放行"""
+        token = uuid.uuid4().hex
+        now = time.time()
+        try:
+            acquired = self._acquire(
+                keys=[self.key],
+                args=[now, self.limit, now + self.lease_seconds, token, math.ceil(self.lease_seconds)],
+            )
+        except redis.RedisError as e:
+            logger.warning("[RateLimit] 號誌無法使用，暫不限制並行數: %s", e)
+            return None
+        if not acquired:
+            raise CapacityExceeded("同時進行中的查核已達上限", self.retry_after)
+        return token
+
+    def release(self, token: Optional[str]) -> None:
+        if token is None:
+            return
+        try:
+            self.client.zrem(self.key, token)
+        except redis.RedisError as e:
+            logger.warning("[RateLimit] 釋放號誌失敗，等待租約到期: %s", e)
+
+    @contextmanager
+    def hold(self):
+        token = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(token)
+
+
+def llm_semaphore() -> RedisSemaphore:
+    """所有 web / celery 行程共用的 LLM 並行上限"""
+    return RedisSemaphore(
+        "llm",
+        limit=settings.LLM_MAX_CONCURRENCY,
+        lease_seconds=settings.LLM_SEMAPHORE_LEASE_SECONDS,
+        retry_after=settings.LLM_SEMAPHORE_RETRY_AFTER_SECONDS,
+    )
+
+
+def fact_check_bucket() -> TokenBucket:
+    return TokenBucket(
+        capacity=settings.FACT_CHECK_RATE_BURST,
+        rate=settings.FACT_CHECK_RATE_PER_MINUTE / 60,
+    )
@@ -7,6 +7,8 @@ from threads.models import Post as DatabasePost
 from threads.models import Comment as DatabaseComment
 
 from threads.infrastructure.repository.content_base_repository import ContentBaseRepository
+from threads.infrastructure.entity_cache import entity_cache
+from threads.domain.pagination import PageCursor
 
 
 from django.db import DatabaseError, IntegrityError, transaction
@@ -17,28 +19,14 @@ from typing import Optional, List
 
 class CommentRepositoryImpl(CommentRepository, ContentBaseRepository):
     def get_comment_by_id(self, comment_id: int, auth_user_id: int) -> Optional[DomainComment]:
+        # 與觀看者無關的部分走 read-through 快取，is_liked 另外查
         try:
-            db_comment = (
-                DatabaseComment.objects
-                .select_related("author", "parent_post", "parent_comment")
-                .annotate(
-                    is_liked = self._annotate_is_liked_for_content("comment", auth_user_id)
-                )
-                .get(id = comment_id)
-            )
-        except DatabaseComment.DoesNotExist:
-            return None
-        except DatabaseError:
-            raise EntityOperationFailed(message="資料庫操作失敗")
+            domain_comments = self.get_comments_by_ids(auth_user_id, [comment_id])
         except EntityOperationFailed as e:
             raise
-        except InvalidEntityInput as e:
-            raise 
-        
-        try:
-            return self._decode_orm_comment(db_comment)
         except InvalidEntityInput as e:
             raise
+        return domain_comments[0] if domain_comments else None
     
     def create_comment(self, comment: DomainComment) -> DomainComment:
         if comment.parent_post_id and not DatabasePost.objects.filter(id=comment.parent_post_id).exists():
@@ -57,39 +45,25 @@ class CommentRepositoryImpl(CommentRepository, ContentBaseRepository):
         except DatabaseError:
             raise EntityOperationFailed(message="資料庫操作失敗")
         
-        try: 
-            db_comment = (
-                DatabaseComment.objects
-                .select_related('author', 'parent_post', 'parent_comment')
-                .get(id=db_comment.id)
-            )
-        except DatabaseError:
-            raise EntityOperationFailed(message="資料庫操作失敗")
+        # create() 回傳的物件已帶有 id 與時間戳，計數欄位為預設值，直接轉成 Entity 不必再查一次
         try:
             return self._decode_orm_comment(db_comment)
         except InvalidEntityInput as e:
             raise
 
-    def update_comment(self, comment: DomainComment) -> Optional[DomainComment]:
+    def update_comment(self, comment: DomainComment) -> DomainComment:
         try:
-            db_comment =(
-                DatabaseComment.objects.filter(id = comment.id)
-                .update(
-                    content = comment.content,
-                    updated_at = comment.updated_at
-                )
+            db_comment = self._update_returning(
+                DatabaseComment, comment.id,
+                content = comment.content,
+                updated_at = comment.updated_at
             )
         except DatabaseError:
             raise EntityOperationFailed(message="資料庫在更新留言時，發生失敗")
-        
-        try:
-            db_comment = (
-                DatabaseComment.objects
-                .select_related("author", "parent_post", "parent_comment")
-                .get(id=comment.id)
-            )
-        except DatabaseError:
-            raise EntityOperationFailed(message="資料庫取出更新後的留言失敗")
+        entity_cache.invalidate("comment", [comment.id])
+        if db_comment is None:
+            # 讀取與更新之間留言已被刪除
+            raise EntityDoesNotExist(message="找不到留言")
         
         try:
             return self._decode_orm_comment(db_comment)
@@ -101,23 +75,21 @@ class CommentRepositoryImpl(CommentRepository, ContentBaseRepository):
             DatabaseComment.objects.filter(id = comment.id).delete()
         except DatabaseError:
             raise EntityOperationFailed(message="資料庫操作失敗")
+        entity_cache.invalidate("comment", [comment.id])
 
         return None
     
     #組裝貼文的留言
-    def get_comments_by_post_id(self, auth_user_id:int, post_id:int, offset:int, limit:int) -> List[DomainComment]:
+    def get_comments_by_post_id(self, auth_user_id:int, post_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainComment]:
         if post_id and not DatabasePost.objects.filter(id=post_id).exists():
             raise EntityDoesNotExist(message="貼文不存在")
         
         try:
-            db_comments = (
+            db_comments = self._paginate(
                 DatabaseComment.objects
                 .filter(parent_post_id = post_id)
-                .select_related("author", "parent_post", "parent_comment")
-                .annotate(
-                    is_liked = self._annotate_is_liked_for_content("comment", auth_user_id)
-                )
-                .order_by('created_at')[offset:offset+limit]
+                .annotate(**self._is_liked_annotation("comment", auth_user_id)),
+                offset, limit, cursor
             )
         except DatabaseError:
             raise EntityOperationFailed(message="資料庫操作失敗")
@@ -125,20 +97,17 @@ class CommentRepositoryImpl(CommentRepository, ContentBaseRepository):
             raise
        
         try:
-            return [self._decode_orm_comment(db_comment) for db_comment in db_comments]
+            return self._resolve_is_liked("comment", auth_user_id, self._decode_orm_comments(db_comments))
         except InvalidEntityInput as e:
             raise
     
-    def get_all_child_comments_by_comment_id(self, auth_user_id:int, comment:DomainComment, offset:int, limit:int) -> List[DomainComment]:
+    def get_all_child_comments_by_comment_id(self, auth_user_id:int, comment:DomainComment, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainComment]:
         try:
-            db_comments = (
+            db_comments = self._paginate(
                 DatabaseComment.objects
                 .filter(parent_comment_id = comment.id)
-                .select_related("author", "parent_post","parent_comment")
-                .annotate(
-                    is_liked = self._annotate_is_liked_for_content("comment", auth_user_id)
-                )
-                .order_by("-created_at")[offset:offset+limit]
+                .annotate(**self._is_liked_annotation("comment", auth_user_id)),
+                offset, limit, cursor, descending=True
             )
         except DatabaseError :
             raise EntityOperationFailed(message="資料庫操作失敗")
@@ -146,10 +115,41 @@ class CommentRepositoryImpl(CommentRepository, ContentBaseRepository):
             raise
 
         try:
-            return [self._decode_orm_comment(db_comment) for db_comment in db_comments]
+            return self._resolve_is_liked("comment", auth_user_id, self._decode_orm_comments(db_comments))
+        except InvalidEntityInput as e:
+            raise
+        
+    # 依照傳入順序批次取回留言，已被刪除的 id 直接略過；快照走快取，整批最多一次資料庫查詢
+    def get_comments_by_ids(self, auth_user_id:int, comment_ids:List[int]) -> List[DomainComment]:
+        try:
+            return self._get_contents_by_ids(
+                "comment", auth_user_id, comment_ids,
+                DatabaseComment.objects,
+                self._decode_orm_comments,
+            )
+        except EntityOperationFailed as e:
+            raise
         except InvalidEntityInput as e:
             raise
         
+    # async 讀取路徑：查詢與 sync 版本相同，改用 async ORM 與 redis.asyncio，給 ASGI 下的 async view 使用
+    async def aget_comments_by_post_id(self, auth_user_id:int, post_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainComment]:
+        if post_id and not await DatabasePost.objects.filter(id=post_id).aexists():
+            raise EntityDoesNotExist(message="貼文不存在")
+
+        try:
+            domain_comments = await self._adecode_orm_comments(self._paginate(
+                DatabaseComment.objects
+                .filter(parent_post_id = post_id)
+                .annotate(**self._is_liked_annotation("comment", auth_user_id)),
+                offset, limit, cursor
+            ))
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        except InvalidEntityInput as e:
+            raise
+        return await self._aresolve_is_liked("comment", auth_user_id, domain_comments)
+
     def repost_comment(self, comment: DomainComment) -> DomainComment:
         try:
             repost_of_content_type = self.get_content_type_from_literal(comment.repost_of_content_type)
@@ -167,10 +167,6 @@ class CommentRepositoryImpl(CommentRepository, ContentBaseRepository):
             )
         except DatabaseError as e:
             raise EntityOperationFailed(message="資料庫操作失敗")
-        try:
-            db_comment = DatabaseComment.objects.select_related("author","parent_post","parent_comment").get(id=db_comment.id)
-        except DatabaseError:
-            raise EntityOperationFailed(message="資料庫操作失敗")
         try:
             return self._decode_orm_comment(db_comment)
         except InvalidEntityInput as e:
@@ -1,5 +1,6 @@
 from threads.domain.entities import Post as DomainPost
 from threads.domain.entities import Comment as DomainComment
+from threads.domain.pagination import PageCursor
 from threads.models import Post as DatabasePost
 from threads.models import Comment as DatabaseComment
 from threads.models import LikePost as DatabaseLikePost
@@ -12,7 +13,14 @@ from django.contrib.contenttypes.models import ContentType
 from threads.common.base_exception import DomainValidationError
 from threads.common.exceptions.repository_exceptions import InvalidEntityInput, InvalidOperation, EntityOperationFailed
 from django.db.models import Exists, OuterRef
-from django.db import DatabaseError
+from django.db import DatabaseError, connection
+from typing import Optional, List, Set, Dict
+from dataclasses import asdict
+from datetime import datetime
+from threads.infrastructure.entity_cache import entity_cache
+from threads.infrastructure.author_cache import author_cache
+from django.conf import settings
+from asgiref.sync import sync_to_async
 
 
 from functools import lru_cache
@@ -20,6 +28,7 @@ class ContentBaseRepository:
 
     _content_type_literals = {}
     _content_type_ids = {}
+    _content_types_primed = False
 
     @classmethod
     @lru_cache(maxsize=8)
@@ -46,12 +55,15 @@ class ContentBaseRepository:
         except KeyError:
             raise InvalidEntityInput(f"找不到 ContentType，id={content_type_id}")
 
-    def _decode_orm_post(self, db_post:DatabasePost) -> DomainPost:
+    def _decode_orm_post(self, db_post:DatabasePost, author_names:Optional[Dict[int, str]] = None) -> DomainPost:
+        # 作者名稱從作者快取取得，查詢本身不需要 join app_user
+        if author_names is None:
+            author_names = author_cache.get_usernames([db_post.author_id])
         try:
             return DomainPost(
                 id=db_post.id,
                 author_id=db_post.author_id,
-                author_name=db_post.author.username,
+                author_name=author_names.get(db_post.author_id),
                 content=db_post.content,
                 created_at=db_post.created_at,
                 updated_at=db_post.updated_at,
@@ -71,13 +83,15 @@ class ContentBaseRepository:
         except TypeError as e:
             raise InvalidEntityInput(message=f"封裝 Post 失敗: {str(e)}")
     
-    def _decode_orm_comment(self, db_comment:DatabaseComment) -> DomainComment:
-        print(f"content_type_id:{db_comment.repost_of_content_type_id}", flush=True)
+    def _decode_orm_comment(self, db_comment:DatabaseComment, author_names:Optional[Dict[int, str]] = None) -> DomainComment:
+        # 作者名稱從作者快取取得，查詢本身不需要 join app_user
+        if author_names is None:
+            author_names = author_cache.get_usernames([db_comment.author_id])
         try:
             return DomainComment(
                 id=db_comment.id,
                 author_id=db_comment.author_id,
-                author_name=db_comment.author.username,
+                author_name=author_names.get(db_comment.author_id),
                 content=db_comment.content,
                 created_at=db_comment.created_at,
                 updated_at=db_comment.updated_at,
@@ -90,8 +104,8 @@ class ContentBaseRepository:
                     self.get_content_type_from_ids(db_comment.repost_of_content_type_id)
                     if db_comment.is_repost == True else None
                 ),
-                parent_post_id=db_comment.parent_post.id,
-                parent_comment_id=db_comment.parent_comment.id if db_comment.parent_comment else None,
+                parent_post_id=db_comment.parent_post_id,
+                parent_comment_id=db_comment.parent_comment_id,
                 is_liked = getattr(db_comment, 'is_liked', False)
             )
         except DomainValidationError as e:
@@ -99,6 +113,53 @@ class ContentBaseRepository:
         except TypeError as e:
             raise InvalidEntityInput(message=f"封裝 Comment 失敗: {str(e)}")
 
+    def _update_returning(self, model, row_id:int, **values):
+        # 一條 UPDATE ... RETURNING 同時完成更新與取回更新後的整列，不必再 SELECT 一次；列不存在時回傳 None
+        quote = connection.ops.quote_name
+        fields = [model._meta.get_field(name) for name in values]
+        assignments = ", ".join(f"{quote(field.column)} = %s" for field in fields)
+        params = [field.get_db_prep_save(value, connection) for field, value in zip(fields, values.values())]
+        sql = (
+            f"UPDATE {quote(model._meta.db_table)} SET {assignments} "
+            f"WHERE {quote(model._meta.pk.column)} = %s RETURNING *"
+        )
+        rows = list(model.objects.raw(sql, params + [row_id]))
+        return rows[0] if rows else None
+
+    def _decode_orm_posts(self, db_posts) -> List[DomainPost]:
+        db_posts = list(db_posts)
+        author_names = author_cache.get_usernames(db_post.author_id for db_post in db_posts)
+        return [self._decode_orm_post(db_post, author_names) for db_post in db_posts]
+
+    def _decode_orm_comments(self, db_comments) -> List[DomainComment]:
+        db_comments = list(db_comments)
+        author_names = author_cache.get_usernames(db_comment.author_id for db_comment in db_comments)
+        return [self._decode_orm_comment(db_comment, author_names) for db_comment in db_comments]
+
+    async def _adecode_orm_posts(self, db_posts) -> List[DomainPost]:
+        await self._aprime_content_types()
+        db_posts = [db_post async for db_post in db_posts]
+        author_names = await author_cache.aget_usernames(db_post.author_id for db_post in db_posts)
+        return [self._decode_orm_post(db_post, author_names) for db_post in db_posts]
+
+    async def _adecode_orm_comments(self, db_comments) -> List[DomainComment]:
+        await self._aprime_content_types()
+        db_comments = [db_comment async for db_comment in db_comments]
+        author_names = await author_cache.aget_usernames(db_comment.author_id for db_comment in db_comments)
+        return [self._decode_orm_comment(db_comment, author_names) for db_comment in db_comments]
+
+    async def _aprime_content_types(self) -> None:
+        # get_content_type_from_ids 第一次呼叫會查 django_content_type，async 環境不能直接做同步查詢，
+        # 每個行程先在執行緒裡把 lru_cache 填好一次，之後 decode 就只是記憶體查表
+        if ContentBaseRepository._content_types_primed:
+            return
+        await sync_to_async(self._prime_content_types)()
+        ContentBaseRepository._content_types_primed = True
+
+    def _prime_content_types(self) -> None:
+        for model in (DatabasePost, DatabaseComment):
+            self.get_content_type_from_ids(ContentType.objects.get_for_model(model).id)
+
     def _annotate_is_liked_for_content(self, content_type:str, auth_user_id:int):
         databases = {
             "post": (DatabaseLikePost, "post"),
@@ -114,4 +175,157 @@ class ContentBaseRepository:
         return Exists(model.objects.filter(
             user=auth_user_id,
             **{content_type_field:OuterRef('pk')}
-        ))
\ No newline at end of file
+        ))
+
+    def _is_liked_annotation(self, content_type:str, auth_user_id:int) -> dict:
+        # batch 模式下列表查詢不帶 EXISTS 子查詢，取回整頁後再由 _resolve_is_liked 一次補上
+        if settings.IS_LIKED_LOOKUP_MODE == "batch":
+            return {}
+        return {"is_liked": self._annotate_is_liked_for_content(content_type, auth_user_id)}
+
+    def _resolve_is_liked(self, content_type:str, auth_user_id:int, entities:list) -> list:
+        if settings.IS_LIKED_LOOKUP_MODE != "batch":
+            return entities
+        try:
+            liked_ids = self._liked_content_ids(content_type, auth_user_id, [entity.id for entity in entities])
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        for entity in entities:
+            entity.is_liked = entity.id in liked_ids
+        return entities
+
+    async def _aresolve_is_liked(self, content_type:str, auth_user_id:int, entities:list) -> list:
+        if settings.IS_LIKED_LOOKUP_MODE != "batch":
+            return entities
+        try:
+            liked_ids = await self._aliked_content_ids(content_type, auth_user_id, [entity.id for entity in entities])
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        for entity in entities:
+            entity.is_liked = entity.id in liked_ids
+        return entities
+
+    def _paginate(self, queryset, offset:int, limit:int, cursor:Optional[PageCursor] = None, descending:bool = False):
+        # 沒帶 cursor 維持原本的 offset 分頁；帶 cursor 時改用 (created_at, id) seek，深層分頁不需再掃過前面所有資料
+        ordering = ("-created_at", "-id") if descending else ("created_at", "id")
+        queryset = queryset.order_by(*ordering)
+        if cursor is None:
+            return queryset[offset:offset+limit]
+
+        if descending:
+            queryset = (
+                queryset
+                .filter(created_at__lte=cursor.created_at)
+                .exclude(created_at=cursor.created_at, id__gte=cursor.id)
+            )
+        else:
+            queryset = (
+                queryset
+                .filter(created_at__gte=cursor.created_at)
+                .exclude(created_at=cursor.created_at, id__lte=cursor.id)
+            )
+        return queryset[:limit]
+
+    def _liked_content_ids(self, content_type:str, auth_user_id:int, content_ids:List[int]) -> Set[int]:
+        # 整頁只查一次按讚表，取代每列一個 EXISTS 子查詢
+        if not auth_user_id or not content_ids:
+            return set()
+        model, target_field = {
+            "post": (DatabaseLikePost, "post_id"),
+            "comment": (DatabaseLikeComment, "comment_id"),
+        }[content_type]
+        return set(
+            model.objects
+            .filter(user_id=auth_user_id, **{f"{target_field}__in": content_ids})
+            .values_list(target_field, flat=True)
+        )
+
+    async def _aliked_content_ids(self, content_type:str, auth_user_id:int, content_ids:List[int]) -> Set[int]:
+        if not auth_user_id or not content_ids:
+            return set()
+        model, target_field = {
+            "post": (DatabaseLikePost, "post_id"),
+            "comment": (DatabaseLikeComment, "comment_id"),
+        }[content_type]
+        return {
+            content_id
+            async for content_id in (
+                model.objects
+                .filter(user_id=auth_user_id, **{f"{target_field}__in": content_ids})
+                .values_list(target_field, flat=True)
+            )
+        }
+
+    def _to_snapshot(self, entity) -> dict:
+        snapshot = asdict(entity)
+        snapshot.pop("is_liked", None)
+        # 作者名稱會變，不跟著快照一起快取，讀取時再從作者快取補上
+        snapshot.pop("author_name", None)
+        snapshot["created_at"] = entity.created_at.isoformat()
+        snapshot["updated_at"] = entity.updated_at.isoformat()
+        return snapshot
+
+    def _from_snapshot(self, content_type:str, snapshot:dict, is_liked:bool, author_name:Optional[str]):
+        entity_class = {"post": DomainPost, "comment": DomainComment}[content_type]
+        try:
+            return entity_class(
+                **{
+                    **snapshot,
+                    "created_at": datetime.fromisoformat(snapshot["created_at"]),
+                    "updated_at": datetime.fromisoformat(snapshot["updated_at"]),
+                    "is_liked": is_liked,
+                    "author_name": author_name,
+                }
+            )
+        except (DomainValidationError, TypeError, KeyError) as e:
+            raise InvalidEntityInput(message=f"快取資料轉換為 Entity 失敗: {str(e)}")
+
+    def _get_contents_by_ids(self, content_type:str, auth_user_id:int, content_ids:List[int], queryset, decode_many) -> list:
+        # 先讀快照快取，只對 miss 的 id 查一次資料庫並回填；is_liked 另外一次 IN 查詢補上
+        if not content_ids:
+            return []
+        snapshots, versions = entity_cache.get_many(content_type, content_ids)
+        missing_ids = [content_id for content_id in content_ids if content_id not in snapshots]
+        try:
+            if missing_ids:
+                fetched = {
+                    entity.id: self._to_snapshot(entity)
+                    for entity in decode_many(queryset.filter(id__in=missing_ids))
+                }
+                entity_cache.set_many(content_type, fetched, versions)
+                snapshots.update(fetched)
+            liked_ids = self._liked_content_ids(content_type, auth_user_id, list(snapshots))
+            author_names = author_cache.get_usernames(snapshot["author_id"] for snapshot in snapshots.values())
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        return self._assemble_from_snapshots(content_type, content_ids, snapshots, liked_ids, author_names)
+
+    async def _aget_contents_by_ids(self, content_type:str, auth_user_id:int, content_ids:List[int], queryset, adecode_many) -> list:
+        # 與 _get_contents_by_ids 相同流程，快取走 redis.asyncio、資料庫走 async ORM
+        if not content_ids:
+            return []
+        snapshots, versions = await entity_cache.aget_many(content_type, content_ids)
+        missing_ids = [content_id for content_id in content_ids if content_id not in snapshots]
+        try:
+            if missing_ids:
+                fetched = {
+                    entity.id: self._to_snapshot(entity)
+                    for entity in await adecode_many(queryset.filter(id__in=missing_ids))
+                }
+                await entity_cache.aset_many(content_type, fetched, versions)
+                snapshots.update(fetched)
+            liked_ids = await self._aliked_content_ids(content_type, auth_user_id, list(snapshots))
+            author_names = await author_cache.aget_usernames(snapshot["author_id"] for snapshot in snapshots.values())
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        return self._assemble_from_snapshots(content_type, content_ids, snapshots, liked_ids, author_names)
+
+    def _assemble_from_snapshots(self, content_type:str, content_ids:List[int], snapshots:dict, liked_ids:Set[int], author_names:Dict[int, str]) -> list:
+        return [
+            self._from_snapshot(
+                content_type, snapshots[content_id], content_id in liked_ids,
+                author_names.get(snapshots[content_id]["author_id"]),
+            )
+            for content_id in content_ids
+            if content_id in snapshots
+        ]
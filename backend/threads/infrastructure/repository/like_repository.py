@@ -13,7 +13,6 @@ from threads.models import LikeComment as DatabaseLikeComment
 
 
 from typing import Optional, List, Union, Literal
-from django.db.models import F
 
 class LikeBaseRepository:
     def _decode_orm_like(self, db_like: Union[DatabaseLikePost, DatabaseLikeComment]) -> DomainLike:
@@ -21,8 +20,8 @@ class LikeBaseRepository:
             try:
                 return DomainLike(
                     id = db_like.id,
-                    user_id=db_like.user.id,
-                    content_item_id=db_like.post.id,
+                    user_id=db_like.user_id,
+                    content_item_id=db_like.post_id,
                     content_type="post"
                 )
             except DomainValidationError as e:
@@ -33,8 +32,8 @@ class LikeBaseRepository:
             try:
                 return DomainLike(
                     id = db_like.id,
-                    user_id=db_like.user.id,
-                    content_item_id=db_like.comment.id,
+                    user_id=db_like.user_id,
+                    content_item_id=db_like.comment_id,
                     content_type="comment"
                 )
             except DomainValidationError as e:
@@ -63,28 +62,6 @@ class LikeBaseRepository:
         like_model, target_field = like_model_map[content_type]
         return like_model, target_field
     
-    def adjust_likes_count(self, content_type:str, content_id:int, delta:int ):
-        if not isinstance(delta, int):
-            raise InvalidOperation (message=f"快取更新必需是整數1/-1，但收到的是 {type(delta).__name__}")
-    
-        target_databases = {
-            "post": DatabasePost,
-            "comment": DatabaseComment
-        }
-        model = target_databases[content_type]
-        
-        if model is None:
-            raise InvalidEntityInput(message="不支援的內容類型")
-        
-        try:
-            model.objects.filter(id=content_id).update(
-                likes_count=F('likes_count') + delta    
-            )
-        except DatabaseError as e:
-            raise InvalidOperation(message="錯誤的快取變動")
-    
-    
-   
 
 class LikeRepositoryImpl(LikeRepository, LikeBaseRepository):
     def create_like(self, like: DomainLike) -> DomainLike:
@@ -101,7 +78,6 @@ class LikeRepositoryImpl(LikeRepository, LikeBaseRepository):
         try:
             with transaction.atomic():
                 db_like = like_model.objects.create(**like_kwargs)
-                self.adjust_likes_count(like.content_type, like.content_item_id,1)
         except IntegrityError:
                 raise EntityAlreadyExists(message="已經按讚過了")
         except DatabaseError :
@@ -111,12 +87,7 @@ class LikeRepositoryImpl(LikeRepository, LikeBaseRepository):
         except InvalidOperation as e:
             raise
        
-        try: 
-            db_like = (like_model.objects.select_related('user',like.content_type)
-                       .get(**like_kwargs))
-        except DatabaseError :
-            raise EntityOperationFailed(message="資料庫操作失敗")
-        
+        # 只用到外鍵 id，create() 回傳的物件就足夠，不必再 join user 與目標內容查一次
         try:
             return self._decode_orm_like(db_like)
         except InvalidEntityInput as e:
@@ -130,7 +101,6 @@ class LikeRepositoryImpl(LikeRepository, LikeBaseRepository):
                 deleted_rows, _ = like_model.objects.filter(id=like.id).delete()
                 if not deleted_rows:
                     raise EntityDoesNotExist("Like 不存在")
-                self.adjust_likes_count(like.content_type, like.content_item_id, -1)
         except DatabaseError as e:
             raise EntityOperationFailed(message="資料庫操作失敗")
         except InvalidEntityInput as e:
@@ -151,9 +121,7 @@ class LikeRepositoryImpl(LikeRepository, LikeBaseRepository):
             target_field: content_id
         }
         try:
-            db_like = (like_model.objects
-                       .select_related('user',content_type)
-                       .get(**like_kwargs))
+            db_like = like_model.objects.get(**like_kwargs)
         except like_model.DoesNotExist:
             return None
         except DatabaseError :
@@ -5,6 +5,8 @@ from threads.models import Post as DatabasePost
 from threads.models import User as DatabaseUser
 from threads.models import Comment as DatabaseComment
 from threads.infrastructure.repository.content_base_repository import ContentBaseRepository
+from threads.infrastructure.entity_cache import entity_cache
+from threads.domain.pagination import PageCursor
 
 from threads.common.exceptions.repository_exceptions import EntityDoesNotExist, EntityOperationFailed, InvalidEntityInput, InvalidOperation
 
@@ -23,59 +25,35 @@ class PostRepositoryImpl(PostRepository, ContentBaseRepository):
         except DatabaseError :
             raise EntityOperationFailed(message="資料庫操作失敗")
         
-        try:
-            db_post = DatabasePost.objects.select_related("author").get(id=db_post.id)
-        except DatabaseError :
-            raise EntityOperationFailed(message="資料庫操作失敗")        
+        # create() 回傳的物件已帶有 id 與時間戳，計數欄位為預設值，直接轉成 Entity 不必再查一次
         try:
             return self._decode_orm_post(db_post)
         except InvalidEntityInput as e:
             raise
         
     def get_post_by_id(self, post_id:int, auth_user_id: int) -> Optional[DomainPost]:
+        # 與觀看者無關的部分走 read-through 快取，is_liked 另外查，熱門貼文不再每次打到主庫
         try:
-            db_post =(
-                DatabasePost.objects
-                .select_related("author")
-                .annotate(
-                    is_liked = self._annotate_is_liked_for_content("post", auth_user_id)
-                )
-                .get(id=post_id)
-            ) 
-        except DatabasePost.DoesNotExist:
-            return None
-        except DatabaseError :
-            raise EntityOperationFailed(message="資料庫操作失敗")
+            domain_posts = self.get_posts_by_ids(auth_user_id, [post_id])
         except EntityOperationFailed as e:
             raise
         except InvalidEntityInput as e:
             raise
-
-        try:
-            return self._decode_orm_post(db_post)
-        except InvalidEntityInput as e:
-            raise
-        
-    def update_post(self, post: DomainPost) -> Optional[DomainPost]:        
-        try:
-            db_post =(
-                DatabasePost.objects.filter(id=post.id)
-                .update(
-                    content = post.content,
-                    updated_at = post.updated_at
-                )
-            )
-        except DatabaseError :
-            raise EntityOperationFailed(message="資料庫操作失敗")
+        return domain_posts[0] if domain_posts else None
         
+    def update_post(self, post: DomainPost) -> DomainPost:        
         try:
-            db_post = (
-                DatabasePost.objects
-                .select_related("author")
-                .get(id = post.id)
+            db_post = self._update_returning(
+                DatabasePost, post.id,
+                content = post.content,
+                updated_at = post.updated_at
             )
         except DatabaseError :
             raise EntityOperationFailed(message="資料庫操作失敗")
+        entity_cache.invalidate("post", [post.id])
+        if db_post is None:
+            # 讀取與更新之間貼文已被刪除
+            raise EntityDoesNotExist(message="欲更新貼文不存在")
         
         try:
             return self._decode_orm_post(db_post)
@@ -87,77 +65,134 @@ class PostRepositoryImpl(PostRepository, ContentBaseRepository):
             db_post = DatabasePost.objects.filter(id=post.id).delete()
         except DatabaseError as e:
             raise EntityOperationFailed(message="資料庫操作失敗")
+        entity_cache.invalidate("post", [post.id])
         return None
     
     
     #組裝Home-Page貼文列表
-    def get_all_posts(self,auth_user_id:int ,offset:int ,limit:int) -> List[DomainPost]:
+    def get_all_posts(self,auth_user_id:int ,offset:int ,limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
         try:
-            db_posts = (
+            db_posts = self._paginate(
                 DatabasePost.objects
-                .select_related("author")
-                .annotate(
-                    is_liked = self._annotate_is_liked_for_content("post", auth_user_id)
-                )
-                .order_by('created_at')[offset:offset+limit]
-            ) 
+                .annotate(**self._is_liked_annotation("post", auth_user_id)),
+                offset, limit, cursor
+            )
         except DatabaseError:
             raise EntityOperationFailed(message="資料庫操作失敗")
         except InvalidEntityInput as e:
             raise
         try:
-            return [self._decode_orm_post(db_post) for db_post in db_posts]
+            return self._resolve_is_liked("post", auth_user_id, self._decode_orm_posts(db_posts))
         except InvalidEntityInput as e:
             raise
 
     #組裝Profile-Page貼文列表
-    def get_posts_by_author_id(self, auth_user_id:int, author_id:int, offset:int, limit:int) -> List[DomainPost]:
+    def get_posts_by_author_id(self, auth_user_id:int, author_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
         if not DatabaseUser.objects.filter(id=author_id).exists():
             raise EntityDoesNotExist(message="作者不存在")
         try:
-            db_posts = (
+            db_posts = self._paginate(
                 DatabasePost.objects
                 .filter(author=author_id)
-                .select_related("author")
-                .annotate(
-                    is_liked = self._annotate_is_liked_for_content("post", auth_user_id)
-                ).order_by('created_at')[offset:offset+limit]
+                .annotate(**self._is_liked_annotation("post", auth_user_id)),
+                offset, limit, cursor
             )
         except DatabaseError :
             raise EntityOperationFailed(message="資料庫操作失敗")
         except InvalidEntityInput as e:
             raise 
         try:
-            return [self._decode_orm_post(db_post) for db_post in db_posts]
+            return self._resolve_is_liked("post", auth_user_id, self._decode_orm_posts(db_posts))
         except InvalidEntityInput as e:
             raise
     
     # 組裝追蹤對象們的貼文列表
-    def get_posts_by_following_ids(self, auth_user_id:int, following_ids:List[int], offset:int, limit:int) -> List[DomainPost]:
+    def get_posts_by_following_ids(self, auth_user_id:int, following_ids:List[int], offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
 
         if not following_ids:
             return []
-        print(f"追蹤對象{following_ids}", flush=True)
         try:
-            db_posts =(
+            db_posts = self._paginate(
                 DatabasePost.objects
                 .filter(author__in=following_ids)
-                .select_related("author")
-                .annotate(
-                    is_liked = self._annotate_is_liked_for_content("post", auth_user_id)
-                )
-                .order_by('created_at')[offset:offset+limit]
+                .annotate(**self._is_liked_annotation("post", auth_user_id)),
+                offset, limit, cursor
             )
         except DatabaseError :
             raise EntityOperationFailed(message="資料庫操作失敗")
         except InvalidEntityInput as e:
             raise
         try:
-            return [self._decode_orm_post(db_post) for db_post in db_posts]
+            return self._resolve_is_liked("post", auth_user_id, self._decode_orm_posts(db_posts))
+        except InvalidEntityInput as e:
+            raise
+    
+
+    # 依照傳入順序批次取回貼文，已被刪除的 id 直接略過；快照走快取，整批最多一次資料庫查詢
+    def get_posts_by_ids(self, auth_user_id:int, post_ids:List[int]) -> List[DomainPost]:
+        try:
+            return self._get_contents_by_ids(
+                "post", auth_user_id, post_ids,
+                DatabasePost.objects,
+                self._decode_orm_posts,
+            )
+        except EntityOperationFailed as e:
+            raise
         except InvalidEntityInput as e:
             raise
     
 
+    # async 讀取路徑：查詢與 sync 版本相同，改用 async ORM 與 redis.asyncio，給 ASGI 下的 async view 使用
+    async def aget_post_by_id(self, post_id:int, auth_user_id: int) -> Optional[DomainPost]:
+        try:
+            domain_posts = await self.aget_posts_by_ids(auth_user_id, [post_id])
+        except EntityOperationFailed as e:
+            raise
+        except InvalidEntityInput as e:
+            raise
+        return domain_posts[0] if domain_posts else None
+
+    async def aget_posts_by_ids(self, auth_user_id:int, post_ids:List[int]) -> List[DomainPost]:
+        try:
+            return await self._aget_contents_by_ids(
+                "post", auth_user_id, post_ids,
+                DatabasePost.objects,
+                self._adecode_orm_posts,
+            )
+        except EntityOperationFailed as e:
+            raise
+        except InvalidEntityInput as e:
+            raise
+
+    async def aget_all_posts(self, auth_user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
+        try:
+            domain_posts = await self._adecode_orm_posts(self._paginate(
+                DatabasePost.objects
+                .annotate(**self._is_liked_annotation("post", auth_user_id)),
+                offset, limit, cursor
+            ))
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        except InvalidEntityInput as e:
+            raise
+        return await self._aresolve_is_liked("post", auth_user_id, domain_posts)
+
+    async def aget_posts_by_author_id(self, auth_user_id:int, author_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
+        if not await DatabaseUser.objects.filter(id=author_id).aexists():
+            raise EntityDoesNotExist(message="作者不存在")
+        try:
+            domain_posts = await self._adecode_orm_posts(self._paginate(
+                DatabasePost.objects
+                .filter(author=author_id)
+                .annotate(**self._is_liked_annotation("post", auth_user_id)),
+                offset, limit, cursor
+            ))
+        except DatabaseError :
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        except InvalidEntityInput as e:
+            raise
+        return await self._aresolve_is_liked("post", auth_user_id, domain_posts)
+
     #轉發貼文
     def repost_post(self, post:DomainPost) -> DomainPost:
         try:
@@ -176,10 +211,6 @@ class PostRepositoryImpl(PostRepository, ContentBaseRepository):
         except DatabaseError as e:
             raise EntityOperationFailed(message="資料庫操作失敗")        
             
-        try:
-            db_post = DatabasePost.objects.select_related("author").get(id = db_post.id)
-        except DatabaseError:
-            raise EntityOperationFailed("資料庫操作失敗")
         try:
             return self._decode_orm_post(db_post)
         except InvalidEntityInput as e:
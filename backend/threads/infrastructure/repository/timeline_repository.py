@@ -0,0 +1,292 @@
+from threads.domain.repository import TimelineRepository
+from threads.domain.pagination import PageCursor
+from threads.models import Post as DatabasePost
+from threads.models import User as DatabaseUser
+from threads.models import Follow as DatabaseFollow
+from threads.infrastructure.cache import redis_client, get_async_redis_client
+
+from threads.common.exceptions.repository_exceptions import EntityOperationFailed
+
+from django.conf import settings
+from django.db import DatabaseError
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Tuple
+import heapq
+import redis
+
+# 只推進已經建立（近期有讀取）或正在重建的 timeline，冷掉的 timeline 等下次讀取時再從資料庫重建；
+# KEYS 兩兩一組：timeline key 與它重建用的暫存 key
+FAN_OUT_SCRIPT = """
+local added = 0
+for i = 1, #KEYS, 2 do
+    local key = KEYS[i]
+    if redis.call('EXISTS', key) == 0 then
+        key = KEYS[i + 1]
+    end
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('ZADD', key, ARGV[1], ARGV[2])
+        redis.call('ZREMRANGEBYRANK', key, 1, -(tonumber(ARGV[3]) + 1))
+        added = added + 1
+    end
+end
+return added
+"""
+
+# 把資料庫讀到的貼文與重建期間推進暫存 key 的貼文合併進 timeline；
+# 暫存 key 不見了代表重建期間 timeline 被清除（追蹤關係已變），這次的結果直接丟掉。
+# ARGV[1] 為保留長度、ARGV[2] 為 TTL，其餘為 (score, post_id) 成對
+BUILD_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    redis.call('ZADD', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+redis.call('ZUNIONSTORE', KEYS[1], 2, KEYS[1], KEYS[2], 'AGGREGATE', 'MAX')
+redis.call('DEL', KEYS[2])
+redis.call('ZREMRANGEBYRANK', KEYS[1], 1, -(tonumber(ARGV[1]) + 1))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# 佔位成員：score 為 0 永遠排在最後，用來區分「已建立但為空」與「尚未建立」
+SENTINEL_MEMBER = "0"
+FAN_OUT_BATCH_SIZE = 500
+# 同一毫秒內可能有多篇貼文，cursor 讀取時多取一些來排除已看過的
+TIE_BUFFER = 20
+# 重建中途 worker 當掉時，暫存 key 在這段時間後自行過期
+BUILDING_TTL_SECONDS = 300
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _score(created_at: datetime) -> int:
+    # 以整數運算取毫秒，避免浮點誤差讓同一毫秒的貼文在 Redis 與資料庫兩邊落在不同毫秒
+    return (created_at - EPOCH) // timedelta(milliseconds=1)
+
+
+def _millisecond_ceiling(created_at: datetime) -> datetime:
+    return created_at.replace(microsecond=created_at.microsecond // 1000 * 1000) + timedelta(milliseconds=1)
+
+
+def _before_cursor(score: int, post_id: int, cursor: Optional[PageCursor]) -> bool:
+    return cursor is None or (score, post_id) < (_score(cursor.created_at), cursor.id)
+
+
+class TimelineRepositoryImpl(TimelineRepository):
+    _fan_out_script = redis_client.register_script(FAN_OUT_SCRIPT)
+    _build_script = redis_client.register_script(BUILD_SCRIPT)
+
+    def _key(self, user_id:int) -> str:
+        return f"timeline:{user_id}"
+
+    def _building_key(self, user_id:int) -> str:
+        return f"timeline:{user_id}:building"
+
+    def _is_pull_author(self, author_id:int) -> bool:
+        return (
+            DatabaseUser.objects
+            .filter(id=author_id, followers_count__gte=settings.TIMELINE_FANOUT_MAX_FOLLOWERS)
+            .exists()
+        )
+
+    def _follower_ids(self, author_id:int):
+        return (
+            DatabaseFollow.objects
+            .filter(following_id=author_id)
+            .values_list("follower_id", flat=True)
+            .iterator(chunk_size=FAN_OUT_BATCH_SIZE)
+        )
+
+    def fan_out_post(self, author_id:int, post_id:int, created_at:datetime) -> int:
+        try:
+            if self._is_pull_author(author_id):
+                return 0
+            added = 0
+            batch = []
+            for follower_id in self._follower_ids(author_id):
+                batch.extend([self._key(follower_id), self._building_key(follower_id)])
+                if len(batch) >= FAN_OUT_BATCH_SIZE * 2:
+                    added += self._fan_out_script(keys=batch, args=[_score(created_at), post_id, settings.TIMELINE_MAX_LENGTH])
+                    batch = []
+            if batch:
+                added += self._fan_out_script(keys=batch, args=[_score(created_at), post_id, settings.TIMELINE_MAX_LENGTH])
+            return added
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+
+    def remove_post(self, author_id:int, post_id:int) -> None:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for index, follower_id in enumerate(self._follower_ids(author_id), start=1):
+                pipe.zrem(self._key(follower_id), post_id)
+                pipe.zrem(self._building_key(follower_id), post_id)
+                if index % FAN_OUT_BATCH_SIZE == 0:
+                    pipe.execute()
+            pipe.execute()
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+
+    def invalidate(self, user_id:int) -> None:
+        try:
+            redis_client.delete(self._key(user_id), self._building_key(user_id))
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+
+    def get_post_ids(self, user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[int]:
+        try:
+            pull_author_ids = list(self._pull_author_ids(user_id))
+            self._ensure_built(user_id, pull_author_ids)
+
+            # 有 pull 作者時，兩邊都要取到 offset+limit 才能正確合併後再切頁
+            window = limit if cursor is not None or not pull_author_ids else offset + limit
+            pushed = self._read_pushed(user_id, 0 if pull_author_ids else offset, window, cursor)
+            if not pull_author_ids:
+                return [post_id for _, post_id in pushed]
+
+            pulled = self._read_pulled(pull_author_ids, window, cursor)
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+        return self._merge(pushed, pulled, offset, limit, cursor)
+
+    async def aget_post_ids(self, user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[int]:
+        # 與 get_post_ids 相同流程，Redis 走 redis.asyncio、資料庫走 async ORM
+        try:
+            pull_author_ids = [author_id async for author_id in self._pull_author_ids(user_id)]
+            await self._aensure_built(user_id, pull_author_ids)
+
+            window = limit if cursor is not None or not pull_author_ids else offset + limit
+            pushed = await self._aread_pushed(user_id, 0 if pull_author_ids else offset, window, cursor)
+            if not pull_author_ids:
+                return [post_id for _, post_id in pushed]
+
+            pulled = self._pulled_entries(
+                [row async for row in self._pulled_rows(pull_author_ids, window, cursor)], window, cursor
+            )
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+        return self._merge(pushed, pulled, offset, limit, cursor)
+
+    def _pull_author_ids(self, user_id:int):
+        return (
+            DatabaseFollow.objects
+            .filter(follower_id=user_id, following__followers_count__gte=settings.TIMELINE_FANOUT_MAX_FOLLOWERS)
+            .values_list("following_id", flat=True)
+        )
+
+    def _merge(self, pushed, pulled, offset:int, limit:int, cursor:Optional[PageCursor]) -> List[int]:
+        merged = []
+        seen = set()
+        for _, post_id in heapq.merge(pushed, pulled, reverse=True):
+            if post_id not in seen:
+                seen.add(post_id)
+                merged.append(post_id)
+        start = 0 if cursor is not None else offset
+        return merged[start:start+limit]
+
+    def _timeline_entries(self, user_id:int, pull_author_ids:List[int]):
+        return (
+            DatabasePost.objects
+            .filter(author__in=DatabaseFollow.objects.filter(follower_id=user_id).values("following_id"))
+            .exclude(author__in=pull_author_ids)
+            .order_by("-created_at", "-id")
+            .values_list("id", "created_at")[:settings.TIMELINE_MAX_LENGTH]
+        )
+
+    def _ensure_built(self, user_id:int, pull_author_ids:List[int]) -> None:
+        key = self._key(user_id)
+        if redis_client.expire(key, settings.TIMELINE_TTL_SECONDS):
+            return
+
+        # 先建立暫存 key 再讀資料庫：讀取之後才 commit 的貼文會由 fan-out 推進暫存 key，不會兩邊都漏掉
+        building_key = self._building_key(user_id)
+        pipe = redis_client.pipeline()
+        pipe.zadd(building_key, {SENTINEL_MEMBER: 0})
+        pipe.expire(building_key, BUILDING_TTL_SECONDS)
+        pipe.execute()
+
+        args = [settings.TIMELINE_MAX_LENGTH, settings.TIMELINE_TTL_SECONDS]
+        for post_id, created_at in self._timeline_entries(user_id, pull_author_ids):
+            args.extend([_score(created_at), post_id])
+        self._build_script(keys=[key, building_key], args=args)
+
+    async def _aensure_built(self, user_id:int, pull_author_ids:List[int]) -> None:
+        client = get_async_redis_client()
+        key = self._key(user_id)
+        if await client.expire(key, settings.TIMELINE_TTL_SECONDS):
+            return
+
+        building_key = self._building_key(user_id)
+        pipe = client.pipeline()
+        pipe.zadd(building_key, {SENTINEL_MEMBER: 0})
+        pipe.expire(building_key, BUILDING_TTL_SECONDS)
+        await pipe.execute()
+
+        args = [settings.TIMELINE_MAX_LENGTH, settings.TIMELINE_TTL_SECONDS]
+        async for post_id, created_at in self._timeline_entries(user_id, pull_author_ids):
+            args.extend([_score(created_at), post_id])
+        await client.register_script(BUILD_SCRIPT)(keys=[key, building_key], args=args)
+
+    def _read_pushed(self, user_id:int, offset:int, limit:int, cursor:Optional[PageCursor]) -> List[Tuple[int, int]]:
+        key = self._key(user_id)
+        if cursor is None:
+            rows = redis_client.zrevrange(key, offset, offset + limit - 1, withscores=True)
+        else:
+            rows = redis_client.zrevrangebyscore(
+                key, _score(cursor.created_at), 1, start=0, num=limit + TIE_BUFFER, withscores=True
+            )
+        return self._pushed_entries(rows, limit, cursor)
+
+    async def _aread_pushed(self, user_id:int, offset:int, limit:int, cursor:Optional[PageCursor]) -> List[Tuple[int, int]]:
+        client = get_async_redis_client()
+        key = self._key(user_id)
+        if cursor is None:
+            rows = await client.zrevrange(key, offset, offset + limit - 1, withscores=True)
+        else:
+            rows = await client.zrevrangebyscore(
+                key, _score(cursor.created_at), 1, start=0, num=limit + TIE_BUFFER, withscores=True
+            )
+        return self._pushed_entries(rows, limit, cursor)
+
+    def _pushed_entries(self, rows, limit:int, cursor:Optional[PageCursor]) -> List[Tuple[int, int]]:
+        entries = []
+        for member, score in rows:
+            post_id = int(member)
+            if post_id == int(SENTINEL_MEMBER):
+                continue
+            if not _before_cursor(int(score), post_id, cursor):
+                continue
+            entries.append((int(score), post_id))
+        # Redis 同分時依成員字串排序，這裡統一成 (score, id) 由大到小
+        entries.sort(reverse=True)
+        return entries[:limit]
+
+    def _read_pulled(self, author_ids:List[int], limit:int, cursor:Optional[PageCursor]) -> List[Tuple[int, int]]:
+        return self._pulled_entries(list(self._pulled_rows(author_ids, limit, cursor)), limit, cursor)
+
+    def _pulled_rows(self, author_ids:List[int], limit:int, cursor:Optional[PageCursor]):
+        queryset = DatabasePost.objects.filter(author__in=author_ids)
+        if cursor is not None:
+            # 資料庫只粗略切到 cursor 所在毫秒的結尾，同一毫秒內的先後由 _pulled_entries 以 (score, id) 判斷
+            queryset = queryset.filter(created_at__lt=_millisecond_ceiling(cursor.created_at))
+            limit += TIE_BUFFER
+        return queryset.order_by("-created_at", "-id").values_list("id", "created_at")[:limit]
+
+    def _pulled_entries(self, rows, limit:int, cursor:Optional[PageCursor]) -> List[Tuple[int, int]]:
+        # 與 push 端、合併時相同，以 (毫秒 score, id) 比較與排序
+        entries = [
+            (_score(created_at), post_id)
+            for post_id, created_at in rows
+            if _before_cursor(_score(created_at), post_id, cursor)
+        ]
+        entries.sort(reverse=True)
+        return entries[:limit]
@@ -0,0 +1,134 @@
+from threads.domain.repository import TrendingRepository
+from threads.models import Post as DatabasePost
+from threads.infrastructure.cache import redis_client, get_async_redis_client
+
+from threads.common.exceptions.repository_exceptions import EntityOperationFailed
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+from datetime import datetime, timedelta
+from typing import List
+import heapq
+import math
+import uuid
+import redis
+
+TRENDING_KEY = "trending:posts"
+
+# 只更新已經建立的排行，尚未建立時等下一次 rebuild 或讀取時從資料庫建；
+# ARGV[1] 為保留長度、ARGV[2] 為要更新的篇數，接著是 (score, post_id) 成對，其餘 ARGV 是要移除的 post_id
+UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local count = tonumber(ARGV[2])
+for i = 0, count - 1 do
+    redis.call('ZADD', KEYS[1], ARGV[3 + i * 2], ARGV[4 + i * 2])
+end
+for i = 3 + count * 2, #ARGV do
+    redis.call('ZREM', KEYS[1], ARGV[i])
+end
+redis.call('ZREMRANGEBYRANK', KEYS[1], 1, -(tonumber(ARGV[1]) + 1))
+return 1
+"""
+
+# 佔位成員：score 為 0 永遠排在最後，用來區分「排行為空」與「尚未建立」
+SENTINEL_MEMBER = "0"
+
+
+def trending_score(likes:int, comments:int, reposts:int, created_at:datetime) -> float:
+    """log2(互動加權和) + 發文時間 / 半衰期
+
+    等同 互動 × 2^(-貼文年齡/半衰期) 取 log：排序只和貼文本身有關、不隨現在時間改變，
+    計數變動時只要重算那一篇，不必把整個排行依時間重新衰減。
+    """
+    engagement = likes + 2 * comments + 3 * reposts
+    return math.log2(1 + engagement) + created_at.timestamp() / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+class TrendingRepositoryImpl(TrendingRepository):
+    _update_script = redis_client.register_script(UPDATE_SCRIPT)
+
+    def _candidates(self):
+        since = timezone.now() - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+        # 轉發本身不上排行，熱度算在原文上；時間範圍走 post_created_id_idx，不掃整張表
+        return DatabasePost.objects.filter(created_at__gte=since, is_repost=False)
+
+    def _scored(self, queryset):
+        rows = queryset.values_list("id", "created_at", "likes_count", "comments_count", "reposts_count")
+        return (
+            (trending_score(likes, comments, reposts, created_at), post_id)
+            for post_id, created_at, likes, comments, reposts in rows.iterator(chunk_size=2000)
+        )
+
+    def rebuild(self) -> int:
+        try:
+            top = heapq.nlargest(settings.TRENDING_MAX_LENGTH, self._scored(self._candidates()))
+            mapping = {SENTINEL_MEMBER: 0}
+            mapping.update({str(post_id): score for score, post_id in top})
+
+            # 先寫到暫存 key 再 RENAME，讀取端不會看到建到一半的排行
+            building_key = f"{TRENDING_KEY}:building:{uuid.uuid4().hex}"
+            pipe = redis_client.pipeline()
+            pipe.zadd(building_key, mapping)
+            pipe.expire(building_key, settings.TRENDING_TTL_SECONDS)
+            pipe.rename(building_key, TRENDING_KEY)
+            pipe.execute()
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+        return len(top)
+
+    def update_scores(self, post_ids:List[int]) -> None:
+        post_ids = [int(post_id) for post_id in post_ids]
+        if not post_ids:
+            return
+        try:
+            scored = list(self._scored(self._candidates().filter(id__in=post_ids)))
+            # 已超出時間範圍、轉發或已刪除的貼文一併從排行移除
+            removed = set(post_ids) - {post_id for _, post_id in scored}
+            args = [settings.TRENDING_MAX_LENGTH, len(scored)]
+            for score, post_id in scored:
+                args.extend([score, post_id])
+            args.extend(removed)
+            self._update_script(keys=[TRENDING_KEY], args=args)
+        except DatabaseError:
+            raise EntityOperationFailed(message="資料庫操作失敗")
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+
+    def remove_post(self, post_id:int) -> None:
+        try:
+            redis_client.zrem(TRENDING_KEY, post_id)
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+
+    def get_post_ids(self, offset:int, limit:int) -> List[int]:
+        # limit <= 0 會變成 ZREVRANGE offset -1 之類的範圍，讀出整個排行
+        if offset < 0 or limit < 1:
+            return []
+        try:
+            if not redis_client.exists(TRENDING_KEY):
+                self.rebuild()
+            members = redis_client.zrevrange(TRENDING_KEY, offset, offset + limit - 1)
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+        return self._post_ids(members)
+
+    async def aget_post_ids(self, offset:int, limit:int) -> List[int]:
+        if offset < 0 or limit < 1:
+            return []
+        client = get_async_redis_client()
+        try:
+            if not await client.exists(TRENDING_KEY):
+                await sync_to_async(self.rebuild)()
+            members = await client.zrevrange(TRENDING_KEY, offset, offset + limit - 1)
+        except redis.RedisError:
+            raise EntityOperationFailed(message="快取服務操作失敗")
+        return self._post_ids(members)
+
+    def _post_ids(self, members) -> List[int]:
+        return [int(member) for member in members if member.decode() != SENTINEL_MEMBER]
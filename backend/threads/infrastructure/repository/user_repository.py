@@ -44,6 +44,19 @@ class UserRepositoryImpl(UserRepository):
             return self._decode_orm_user(db_user)
         except InvalidEntityInput as e:
             raise
+
+    async def aget_user_by_id(self, user_id: int) -> Optional[DomainUser]:
+        try:
+            db_user = await DatabaseUser.objects.aget(id=user_id)
+        except DatabaseUser.DoesNotExist:
+            raise EntityDoesNotExist(message="使用者不存在")
+        except DatabaseError as e :
+            raise EntityOperationFailed(message="資料庫操作失敗")
+
+        try:
+            return self._decode_orm_user(db_user)
+        except InvalidEntityInput as e:
+            raise
         
     # def update_user(self, user: DomainUser) -> DomainUser:
         
@@ -1,20 +1,20 @@
 from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from threads.models import Comment,Post
-from threads.infrastructure.cache import redis_client
-from threads.tasks import flush_comment_counts, flush_repost_counts
-import threading
+from threads.models import Comment,Post,LikePost,LikeComment,User,Follow
+from threads.infrastructure.author_cache import author_cache
+from threads.infrastructure.counters import buffer_counter_delta
+from threads.infrastructure.repository.timeline_repository import TimelineRepositoryImpl
+from threads.common.exceptions.repository_exceptions import EntityOperationFailed
+from threads.tasks import schedule_counter_flush, fan_out_post_to_timelines, remove_post_from_timelines, remove_post_from_trending
 from django.db import transaction
+from django.db.models import F
 
 import logging
 logger = logging.getLogger(__name__)
-_thread_locals = threading.local()
 
 def _ensure_flush_scheduled():
-    """同一交易僅排程一次 Celery 任務"""
-    if not getattr(_thread_locals, "flush_scheduled", False):
-        transaction.on_commit(lambda: flush_comment_counts.delay())
-        _thread_locals.flush_scheduled = True
+    """交易提交後排程 flush，實際是否送出任務由 schedule_counter_flush 防抖"""
+    transaction.on_commit(schedule_counter_flush)
 
 
 @receiver(post_save, sender=Comment)
@@ -23,28 +23,24 @@ def increment_comment_count(sender, instance, created, **kwargs):
         return
 
     if instance.parent_post_id:
-        post_key = f"post:{instance.parent_post_id}"
         logger.info(f"[Signal] 新增留言，post:{instance.parent_post_id}")
-        redis_client.hincrby(post_key, "comments_count", 1)
+        buffer_counter_delta("post", instance.parent_post_id, "comments_count", 1)
 
     if instance.parent_comment_id:
-        comment_key = f"comment:{instance.parent_comment_id}"
         logger.info(f"[Signal] 新增子留言，comment:{instance.parent_comment_id}")
-        redis_client.hincrby(comment_key, "comments_count", 1)
+        buffer_counter_delta("comment", instance.parent_comment_id, "comments_count", 1)
         
     _ensure_flush_scheduled()
 
 @receiver(post_delete, sender=Comment)
 def decrement_comment_count(sender, instance, **kwargs):
     if instance.parent_post_id:
-        key = f"post:{instance.parent_post_id}"
         logger.info(f"[Signal] 刪除留言，post:{instance.parent_post_id}")
-        redis_client.hincrby(key, "comments_count", -1)
+        buffer_counter_delta("post", instance.parent_post_id, "comments_count", -1)
 
     if instance.parent_comment_id:
-        comment_key = f"comment:{instance.parent_comment_id}"
         logger.info(f"[Signal] 刪除子留言，comment:{instance.parent_comment_id}")
-        redis_client.hincrby(comment_key, "comments_count", -1)
+        buffer_counter_delta("comment", instance.parent_comment_id, "comments_count", -1)
     
     _ensure_flush_scheduled()
 
@@ -54,29 +50,109 @@ def increment_post_reposts_count(sender, instance, created, **kwargs):
     if not created:
         return
     if instance.is_repost:
-        key = f"{instance.repost_of_content_type.model}:{instance.repost_of_content_item_id}"
-        redis_client.hincrby(key, "reposts_count", 1)
-    flush_repost_counts.delay()
+        buffer_counter_delta(instance.repost_of_content_type.model, instance.repost_of_content_item_id, "reposts_count", 1)
+        _ensure_flush_scheduled()
 
 @receiver(post_save, sender=Comment)
 def increment_comment_reposts_count(sender, instance, created, **kwargs):
     if not created:
         return
     if instance.is_repost:
-        key = f"{instance.repost_of_content_type.model}:{instance.repost_of_content_item_id}"
-        redis_client.hincrby(key, "reposts_count", 1)
-    flush_repost_counts.delay()
+        buffer_counter_delta(instance.repost_of_content_type.model, instance.repost_of_content_item_id, "reposts_count", 1)
+        _ensure_flush_scheduled()
 
 @receiver(post_delete, sender=Post)
 def decrement_post_reposts_count(sender, instance, **kwargs):
     if instance.is_repost:
-        key = f"{instance.repost_of_content_type.model}:{instance.repost_of_content_item_id}"
-        redis_client.hincrby(key, "reposts_count", -1)
-    flush_repost_counts.delay()
+        buffer_counter_delta(instance.repost_of_content_type.model, instance.repost_of_content_item_id, "reposts_count", -1)
+        _ensure_flush_scheduled()
 
 @receiver(post_delete, sender=Comment)
 def decrement_comment_reposts_count(sender, instance, **kwargs):
     if instance.is_repost:
-        key = f"{instance.repost_of_content_type.model}:{instance.repost_of_content_item_id}"
-        redis_client.hincrby(key, "reposts_count", -1)
-    flush_repost_counts.delay()
\ No newline at end of file
+        buffer_counter_delta(instance.repost_of_content_type.model, instance.repost_of_content_item_id, "reposts_count", -1)
+        _ensure_flush_scheduled()
+
+
+def _buffer_like_delta(kind:str, content_id:int, delta:int):
+    """按讚數只在交易提交後寫進 Redis 緩衝，不在請求交易內鎖熱門貼文那一列"""
+    def _apply():
+        buffer_counter_delta(kind, content_id, "likes_count", delta)
+        schedule_counter_flush()
+    transaction.on_commit(_apply)
+
+@receiver(post_save, sender=LikePost)
+def increment_post_likes_count(sender, instance, created, **kwargs):
+    if not created:
+        return
+    _buffer_like_delta("post", instance.post_id, 1)
+
+@receiver(post_delete, sender=LikePost)
+def decrement_post_likes_count(sender, instance, **kwargs):
+    _buffer_like_delta("post", instance.post_id, -1)
+
+@receiver(post_save, sender=LikeComment)
+def increment_comment_likes_count(sender, instance, created, **kwargs):
+    if not created:
+        return
+    _buffer_like_delta("comment", instance.comment_id, 1)
+
+@receiver(post_delete, sender=LikeComment)
+def decrement_comment_likes_count(sender, instance, **kwargs):
+    _buffer_like_delta("comment", instance.comment_id, -1)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if not created:
+        return
+    # 交易提交後才推送，避免 worker 讀不到尚未 commit 的貼文
+    author_id, post_id, created_at_ts = instance.author_id, instance.id, instance.created_at.timestamp()
+    transaction.on_commit(lambda: fan_out_post_to_timelines.delay(author_id, post_id, created_at_ts))
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_timeline(sender, instance, **kwargs):
+    # 刪除完成後 instance.id 會被清成 None，先取出來
+    author_id, post_id = instance.author_id, instance.id
+    transaction.on_commit(lambda: remove_post_from_timelines.delay(author_id, post_id))
+    transaction.on_commit(lambda: remove_post_from_trending.delay(post_id))
+
+
+def _invalidate_timeline(user_id):
+    try:
+        TimelineRepositoryImpl().invalidate(user_id)
+    except EntityOperationFailed as e:
+        logger.warning(f"[Signal] 清除 timeline 失敗，user:{user_id}: {e.message}")
+
+@receiver(post_save, sender=Follow)
+def increment_follow_counts(sender, instance, created, **kwargs):
+    if not created:
+        return
+    # followers_count 同時決定作者走 push 或 pull，要跟追蹤關係在同一個交易裡更新
+    User.objects.filter(id=instance.following_id).update(followers_count=F("followers_count") + 1)
+    User.objects.filter(id=instance.follower_id).update(followings_count=F("followings_count") + 1)
+
+@receiver(post_delete, sender=Follow)
+def decrement_follow_counts(sender, instance, **kwargs):
+    # 刪除使用者時 Follow 會被連帶刪除，對方那一列可能也已不存在，update 不到就略過
+    User.objects.filter(id=instance.following_id, followers_count__gt=0).update(followers_count=F("followers_count") - 1)
+    User.objects.filter(id=instance.follower_id, followings_count__gt=0).update(followings_count=F("followings_count") - 1)
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follower_timeline(sender, instance, **kwargs):
+    # 讀取會延長 timeline 的 TTL，活躍使用者的 timeline 不會自然過期；
+    # 追蹤/取消追蹤後直接丟掉，下次讀取依新的追蹤關係重建，補上新作者的舊貼文、移除已取消追蹤的作者
+    follower_id = instance.follower_id
+    transaction.on_commit(lambda: _invalidate_timeline(follower_id))
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_summary(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    # 登入只會更新 last_login，不需要清作者快取
+    if update_fields is not None and "username" not in update_fields:
+        return
+    user_id = instance.id
+    transaction.on_commit(lambda: author_cache.invalidate(user_id))
\ No newline at end of file
@@ -0,0 +1,51 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.functional import classproperty
+
+from threads.infrastructure.cache import close_async_redis_client
+from threads.infrastructure.external.http_clients import close_async_openai_client
+
+
+class AsyncAPIViewMixin:
+    """讓 DRF APIView 的 handler 可以是 async def
+
+    DRF 的 dispatch 只支援同步 handler，Django 也不允許同一個 view 混用 sync/async handler；
+    這裡把整個 view 標成 async，認證、權限等 DRF 流程與同步 handler 丟到 sync_to_async 執行，
+    async handler 則直接在 event loop 上 await。放在 MRO 最前面：class XView(AsyncAPIViewMixin, XBaseView)
+    """
+
+    @classproperty
+    def view_is_async(cls):
+        return True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # JWT 認證會查 app_user，放到執行緒裡跑
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        finally:
+            # WSGI 下 Django 以 async_to_sync 為每個請求開一個新的 event loop，請求結束 loop 就丟了，
+            # 綁在這個 loop 上的 async client 要在這裡關掉；ASGI 下 loop 常駐，client 留著給下一個請求重用
+            if not isinstance(request._request, ASGIRequest):
+                await close_async_redis_client()
+                await close_async_openai_client()
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
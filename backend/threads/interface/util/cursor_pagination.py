@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from threads.domain.pagination import PageCursor
+
+
+def encode_cursor(cursor: PageCursor) -> str:
+    # 對前端而言 cursor 是不透明字串，只需原封不動帶回下一次請求
+    raw = json.dumps({"t": cursor.created_at.isoformat(), "id": cursor.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Optional[PageCursor]:
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return PageCursor(created_at=datetime.fromisoformat(data["t"]), id=int(data["id"]))
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("無效的 cursor") from e
+
+
+def parse_cursor_params(query_params) -> Tuple[bool, Optional[PageCursor]]:
+    """有帶 cursor 參數（可為空字串代表第一頁）即切換為 cursor 分頁模式"""
+    if "cursor" not in query_params:
+        return False, None
+    return True, decode_cursor(query_params.get("cursor"))
+
+
+def build_cursor_page(data, entities, limit: int) -> dict:
+    next_cursor = None
+    if entities and len(entities) >= limit:
+        next_cursor = encode_cursor(PageCursor.from_entity(entities[-1]))
+    return {
+        "results": data,
+        "next_cursor": next_cursor,
+    }
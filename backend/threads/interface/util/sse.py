@@ -0,0 +1,63 @@
+import json
+import weakref
+from typing import Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    """組一則 Server-Sent Event，data 一律是單行 JSON，換行在 JSON 內會被跳脫"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+
+class _ClosingEvents:
+    """包住事件 generator，串流跑完、中斷或回應被關閉時都會呼叫一次 on_close
+
+    使用者在第一個事件送出前就斷線時 generator 還沒開始跑，它自己的 finally 不會執行；
+    Django 在回應結束時會呼叫 close()，ASGI 下請求被取消時不會，就靠物件回收時的 finalizer 兜底。
+    """
+
+    def __init__(self, events, on_close: Callable[[], None]):
+        self._events = events
+        self._finalizer = weakref.finalize(self, on_close)
+        self._finalizer.atexit = False
+
+    def close(self):
+        try:
+            close = getattr(self._events, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._finalizer()
+
+
+class _SyncClosingEvents(_ClosingEvents):
+    def __iter__(self):
+        try:
+            yield from self._events
+        finally:
+            self.close()
+
+
+class _AsyncClosingEvents(_ClosingEvents):
+    async def __aiter__(self):
+        try:
+            async for event in self._events:
+                yield event
+        finally:
+            await sync_to_async(self._finalizer, thread_sensitive=False)()
+
+
+def sse_response(events, on_close: Optional[Callable[[], None]] = None) -> StreamingHttpResponse:
+    """events 可以是同步或非同步的 iterator：WSGI 要同步的，ASGI 要非同步的，否則 Django 會先整包讀完才送出
+
+    on_close 用來歸還串流期間佔用的資源（LLM 名額、in-flight 鎖），不論串流如何結束都只會執行一次。
+    """
+    if on_close is not None:
+        events = _AsyncClosingEvents(events, on_close) if hasattr(events, "__aiter__") else _SyncClosingEvents(events, on_close)
+    response = StreamingHttpResponse(events, content_type="text/event-stream; charset=utf-8")
+    response["Cache-Control"] = "no-cache"
+    # nginx 預設會緩衝 upstream 回應，關掉才能逐字送到前端
+    response["X-Accel-Buffering"] = "no"
+    return response
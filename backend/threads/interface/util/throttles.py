@@ -0,0 +1,20 @@
+from rest_framework.throttling import BaseThrottle
+
+from threads.infrastructure.rate_limit import fact_check_bucket
+
+
+class FactCheckRateThrottle(BaseThrottle):
+    """每位使用者一個 Redis 令牌桶，只限制會打到 SerpAPI / OpenAI 的 POST，讀取貼文與輪詢結果不受影響"""
+
+    def __init__(self):
+        self.retry_after = None
+
+    def allow_request(self, request, view):
+        if request.method != "POST":
+            return True
+        ident = request.user.pk if request.user and request.user.is_authenticated else self.get_ident(request)
+        allowed, self.retry_after = fact_check_bucket().consume(f"factcheck:{ident}")
+        return allowed
+
+    def wait(self):
+        return self.retry_after
@@ -13,6 +13,7 @@ from threads.use_cases.commands.create_comment import CreateComment
 from threads.use_cases.queries.get_child_comments_by_comment_id import GetChildCommentsByCommentId
 
 
+from threads.interface.util.cursor_pagination import parse_cursor_params, build_cursor_page
 from threads.interface.util.dev_tool import extend_schema_view, extend_schema, OpenApiResponse, OpenApiExample
 # from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse, OpenApiExample, OpenApiRequest
 from threads.interface.serializers.message_serializer import MessageSerializer
@@ -21,7 +22,7 @@ from threads.interface.serializers.message_serializer import MessageSerializer
 @extend_schema_view(
     get=extend_schema(
         summary="取得子留言列表",
-        description="可用 offset、limit 分頁，example: urls後面寫?offset=0&limit=5",        
+        description="可用 offset、limit 分頁，example: urls後面寫?offset=0&limit=5；帶上 cursor 參數（第一頁傳空字串）即改用 cursor 分頁，回傳 results 與 next_cursor",        
         responses={
             200: OpenApiResponse(
                 description="使用者成功讀取子留言列表",
@@ -85,11 +86,17 @@ class ChildCommentListCreateView(CommentBaseView):
         auth_user_id = request.user.id
         offset = int(request.query_params.get("offset", 0))
         limit = int(request.query_params.get("limit", 10))
+        try:
+            cursor_mode, cursor = parse_cursor_params(request.query_params)
+        except Exception as e:
+            return self._handler_exception(e)
 
         try: 
-            domain_child_comments = GetChildCommentsByCommentId(CommentRepositoryImpl()).execute(auth_user_id=auth_user_id, comment_id=comment_id, offset=offset, limit=limit)
+            domain_child_comments = GetChildCommentsByCommentId(CommentRepositoryImpl()).execute(auth_user_id=auth_user_id, comment_id=comment_id, offset=offset, limit=limit, cursor=cursor)
         except Exception as e:
             return self._handler_exception(e)
         
         serializers = CommentSerializer(domain_child_comments, many=True)
+        if cursor_mode:
+            return Response(build_cursor_page(serializers.data, domain_child_comments, limit), status=status.HTTP_200_OK)
         return Response(serializers.data, status=status.HTTP_200_OK)
@@ -6,12 +6,14 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 
 
 from .comment_baseView import CommentBaseView
+from threads.interface.util.async_api_view import AsyncAPIViewMixin
 from ...serializers.comment_serializer import CommentSerializer, CreateCommentSerializer
 
 from threads.infrastructure.repository.comment_repository import CommentRepositoryImpl
 from threads.use_cases.commands.create_comment import CreateComment
 from threads.use_cases.queries.get_comments_by_post_id import GetCommentsByPostId
 
+from threads.interface.util.cursor_pagination import parse_cursor_params, build_cursor_page
 from threads.interface.util.dev_tool import extend_schema_view, extend_schema, OpenApiResponse, OpenApiExample
 # from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse, OpenApiExample, OpenApiRequest
 from threads.interface.serializers.message_serializer import MessageSerializer
@@ -20,7 +22,7 @@ from threads.interface.serializers.message_serializer import MessageSerializer
 @extend_schema_view(
     get=extend_schema(
         summary="取得留言列表",
-        description="可用 offset、limit 分頁，example: urls後面寫?offset=0&limit=5",        
+        description="可用 offset、limit 分頁，example: urls後面寫?offset=0&limit=5；帶上 cursor 參數（第一頁傳空字串）即改用 cursor 分頁，回傳 results 與 next_cursor",        
         responses={
             200: OpenApiResponse(
                 description="使用者成功讀取留言列表",
@@ -62,7 +64,7 @@ from threads.interface.serializers.message_serializer import MessageSerializer
     )
 )
 @extend_schema(tags=["Comments"])
-class CommentListCreateView(CommentBaseView):
+class CommentListCreateView(AsyncAPIViewMixin, CommentBaseView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, post_id):
@@ -78,18 +80,24 @@ class CommentListCreateView(CommentBaseView):
             return self._handler_exception(e)
         return Response({"message": "Comment created successfully"}, status=status.HTTP_200_OK)
     
-    def get(self, request, post_id):
+    async def get(self, request, post_id):
 
         auth_user_id = request.user.id
         offset = int(request.query_params.get("offset", 0))
         limit = int(request.query_params.get("limit", 10))
+        try:
+            cursor_mode, cursor = parse_cursor_params(request.query_params)
+        except Exception as e:
+            return self._handler_exception(e)
 
         repo = CommentRepositoryImpl()
         try:
-            domain_comments = GetCommentsByPostId(repo).execute(auth_user_id, post_id, offset, limit)
+            domain_comments = await GetCommentsByPostId(repo).aexecute(auth_user_id, post_id, offset, limit, cursor)
         except Exception as e:
             return self._handler_exception(e)
           
         serializers = CommentSerializer(domain_comments, many=True)
+        if cursor_mode:
+            return Response(build_cursor_page(serializers.data, domain_comments, limit), status=status.HTTP_200_OK)
         return Response(serializers.data, status=status.HTTP_200_OK)
     
\ No newline at end of file
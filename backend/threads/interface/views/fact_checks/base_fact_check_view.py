@@ -1,26 +1,42 @@
+import logging
+import math
+
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.core.handlers.asgi import ASGIRequest
+from django.urls import reverse
 
 from threads.interface.util.error_response import error_response
+from threads.interface.util.sse import sse_event, sse_response
 
 from threads.interface.serializers.fact_check_serializer import FactCheckSerializer
 from threads.infrastructure.external.openai_client import OpenAIClient
+from threads.infrastructure.fact_check_cache import FactCheckCache, fact_check_with_cache
+from threads.infrastructure.fact_check_jobs import FactCheckJobStore
+from threads.infrastructure.rate_limit import CapacityExceeded, llm_semaphore
+from threads.interface.util.throttles import FactCheckRateThrottle
 
 
 from threads.common.base_exception import BaseAppException
-from threads.common.exceptions.use_case_exceptions import InvalidObject, UnauthorizedAction, NotFound, AlreadyExist, ServiceUnavailable
+from threads.common.exceptions.use_case_exceptions import InvalidObject, UnauthorizedAction, NotFound, AlreadyExist, ServiceUnavailable, TooManyRequests
 
 
+logger = logging.getLogger(__name__)
 
 
+class FactCheckBaseView(APIView):
+    throttle_classes = [FactCheckRateThrottle]
 
-class FactCheckBaseView(APIView):        
     def _handler_exception(self, e):
         if isinstance(e, BaseAppException):
             response_data = e.to_response()
-            return error_response(message=response_data["message"],type_name=response_data["type"], code=self._get_status(e)
+            response = error_response(message=response_data["message"],type_name=response_data["type"], code=self._get_status(e)
             )
+            if getattr(e, "retry_after", None):
+                response["Retry-After"] = str(math.ceil(e.retry_after))
+            return response
         elif isinstance(e, ValueError):
             return error_response(message=str(e), type_name="ValueError",
                 code=status.HTTP_400_BAD_REQUEST
@@ -36,10 +52,21 @@ class FactCheckBaseView(APIView):
             return status.HTTP_400_BAD_REQUEST
         elif isinstance(e, NotFound):
             return status.HTTP_404_NOT_FOUND
+        elif isinstance(e, TooManyRequests):
+            return status.HTTP_429_TOO_MANY_REQUESTS
         elif isinstance(e, ServiceUnavailable):
             return status.HTTP_500_INTERNAL_SERVER_ERROR
         return status.HTTP_500_INTERNAL_SERVER_ERROR
 
+    def throttled(self, request, wait):
+        raise TooManyRequests("查核請求過於頻繁，請稍後再試", retry_after=wait)
+
+    def handle_exception(self, exc):
+        # 限流發生在 DRF 的 initial()，不會經過 handler 裡的 try/except，這裡改用與其他錯誤相同的格式回應
+        if isinstance(exc, TooManyRequests):
+            return self._handler_exception(exc)
+        return super().handle_exception(exc)
+
 
     def _handler_post(self, request):
         serializers = FactCheckSerializer(data= request.data)
@@ -51,17 +78,132 @@ class FactCheckBaseView(APIView):
         if not content:
             return Response({"error": "Missing Post or Comment"}, status=status.HTTP_400_BAD_REQUEST)
         
-        if not prompt:
-            target = content
-        else:
-            target = {
-                "content":content,
-                "prompt":prompt
-            }
-        
-        openai_client  = OpenAIClient()
-        result = openai_client.fact_check(target)
+        mode = request.query_params.get("mode")
+        if mode == "job":
+            return self._enqueue_job(request, content, prompt)
+        if mode == "stream":
+            return self._stream(request, content, prompt)
+
+        # 同內容同問題的查核共用結果，並發的相同請求只會有一個打到 SerpAPI / OpenAI
+        try:
+            result = fact_check_with_cache(content, prompt)
+        except CapacityExceeded as e:
+            return self._handler_exception(TooManyRequests("查核服務忙碌中，請稍後再試", retry_after=e.retry_after))
         return Response({"response":result })
-    
-       
-         
\ No newline at end of file
+
+    def _enqueue_job(self, request, content, prompt):
+        # 查核要等多次搜尋加一次 GPT，丟給 Celery worker 跑，不佔住 web worker
+        from threads.tasks import run_fact_check_job
+
+        store = FactCheckJobStore()
+        job_id = store.create(request.user.id, content, prompt)
+        try:
+            run_fact_check_job.delay(job_id)
+        except Exception:
+            logger.exception("[FactCheck] 查核工作 %s 送出失敗", job_id)
+            store.delete(job_id)
+            return self._handler_exception(ServiceUnavailable("查核服務暫時無法使用，請稍後再試"))
+
+        location = reverse("fact_check_job", kwargs={"job_id": job_id})
+        return Response(
+            {"job_id": job_id, "status": "pending"},
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": location},
+        )
+
+    def _stream(self, request, content, prompt):
+        client = OpenAIClient()
+        cache = FactCheckCache()
+        target = {"content": content, "prompt": prompt} if prompt else content
+        asynchronous = isinstance(request._request, ASGIRequest)
+
+        cached = cache.get(content, prompt, client.model)
+        if cached is not None:
+            return sse_response(self._cached_events(cached))
+
+        # 與一般 POST 共用 in-flight 鎖：相同查核已在進行時不再打上游，等它的結果一次送出
+        token = cache.acquire_inflight(content, prompt, client.model)
+        if token is None:
+            if asynchronous:
+                return sse_response(self._await_events(client, cache, content, prompt))
+            return sse_response(self._wait_events(client, cache, content, prompt))
+
+        # 名額在回應開始前取得，額滿時才能回 429
+        semaphore = llm_semaphore()
+        try:
+            lease = semaphore.acquire()
+        except CapacityExceeded as e:
+            cache.release_inflight(content, prompt, client.model, token)
+            return self._handler_exception(TooManyRequests("查核服務忙碌中，請稍後再試", retry_after=e.retry_after))
+
+        def release():
+            # 串流跑完、失敗、使用者中途離開或回應從未開始讀取，都由 sse_response 呼叫一次
+            semaphore.release(lease)
+            cache.release_inflight(content, prompt, client.model, token)
+
+        if asynchronous:
+            return sse_response(self._aevents(client, cache, content, prompt, target), on_close=release)
+        return sse_response(self._events(client, cache, content, prompt, target), on_close=release)
+
+    def _cached_events(self, cached):
+        yield sse_event("start", {})
+        yield sse_event("token", {"delta": cached})
+        yield sse_event("done", {"cached": True})
+
+    def _wait_result_events(self, result):
+        if isinstance(result, CapacityExceeded):
+            yield sse_event("error", {"message": "查核服務忙碌中，請稍後再試"})
+        elif isinstance(result, Exception):
+            yield sse_event("error", {"message": "查核失敗，請稍後再試"})
+        else:
+            yield sse_event("token", {"delta": result})
+            yield sse_event("done", {"cached": True})
+
+    def _wait_for_result(self, client, cache, content, prompt):
+        # 等持有鎖的請求寫入結果；它失敗或逾時時由這裡接手查核
+        try:
+            return fact_check_with_cache(content, prompt, client=client, cache=cache)
+        except CapacityExceeded as e:
+            return e
+        except Exception as e:
+            logger.exception("[FactCheck] 等待相同查核失敗")
+            return e
+
+    def _wait_events(self, client, cache, content, prompt):
+        yield sse_event("start", {})
+        yield from self._wait_result_events(self._wait_for_result(client, cache, content, prompt))
+
+    async def _await_events(self, client, cache, content, prompt):
+        yield sse_event("start", {})
+        result = await sync_to_async(self._wait_for_result, thread_sensitive=False)(client, cache, content, prompt)
+        for event in self._wait_result_events(result):
+            yield event
+
+    def _events(self, client, cache, content, prompt, target):
+        # 搜尋要花上數秒，先送一則事件讓前端知道連線已建立
+        yield sse_event("start", {})
+        parts = []
+        try:
+            for delta in client.fact_check_stream(target):
+                parts.append(delta)
+                yield sse_event("token", {"delta": delta})
+        except Exception:
+            logger.exception("[FactCheck] 串流查核失敗")
+            yield sse_event("error", {"message": "查核失敗，請稍後再試"})
+            return
+        cache.set(content, prompt, client.model, "".join(parts))
+        yield sse_event("done", {"cached": False})
+
+    async def _aevents(self, client, cache, content, prompt, target):
+        yield sse_event("start", {})
+        parts = []
+        try:
+            async for delta in client.afact_check_stream(target):
+                parts.append(delta)
+                yield sse_event("token", {"delta": delta})
+        except Exception:
+            logger.exception("[FactCheck] 串流查核失敗")
+            yield sse_event("error", {"message": "查核失敗，請稍後再試"})
+            return
+        await sync_to_async(cache.set, thread_sensitive=False)(content, prompt, client.model, "".join(parts))
+        yield sse_event("done", {"cached": False})
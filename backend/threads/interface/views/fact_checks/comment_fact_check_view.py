@@ -43,7 +43,11 @@ from threads.interface.serializers.message_serializer import MessageSerializer
         examples=[OpenApiExample(name="撰寫查核問題",value={"content": "原留言內容","prompt":"選填想要詢問的問題"},summary="這個範例模擬使用者進行查核")],
         responses={
             200:OpenApiResponse(
-                description="使用者取得查核結果",
+                description="使用者取得查核結果；帶 ?mode=stream 時改以 text/event-stream 逐字回傳",
+                response=MessageSerializer
+            ),
+            202:OpenApiResponse(
+                description="帶 ?mode=job 時改為背景查核，回傳 job_id，結果以 GET /factCheck/jobs/{job_id} 輪詢",
                 response=MessageSerializer
             ),
             400:OpenApiResponse(
@@ -0,0 +1,50 @@
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+
+from .base_fact_check_view import FactCheckBaseView
+from threads.infrastructure.fact_check_jobs import FactCheckJobStore, PENDING, RUNNING, DONE, FAILED
+from threads.common.exceptions.use_case_exceptions import NotFound
+
+from threads.interface.util.dev_tool import extend_schema_view, extend_schema, OpenApiResponse
+from threads.interface.serializers.message_serializer import MessageSerializer
+
+# 查核通常要數秒到數十秒，提示前端多久後再來問
+POLL_INTERVAL_SECONDS = 2
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="輪詢背景查核結果",
+        description="status 為 pending / running 時稍後再查；done 時 response 為查核結果；failed 時 error 為失敗原因",
+        responses={
+            200: OpenApiResponse(
+                description="查核工作目前狀態",
+                response=MessageSerializer
+            ),
+            404: OpenApiResponse(
+                description="查核工作不存在、已過期，或不屬於目前使用者",
+                response=MessageSerializer,
+            ),
+        }
+    )
+)
+@extend_schema(tags=["FactCheck"])
+class FactCheckJobView(FactCheckBaseView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = FactCheckJobStore().get(job_id)
+        # 別人的工作也回 404，不透露 job_id 是否存在
+        if job is None or job["user_id"] != request.user.id:
+            return self._handler_exception(NotFound("查核工作不存在或已過期"))
+
+        data = {"job_id": job_id, "status": job["status"]}
+        headers = {}
+        if job["status"] == DONE:
+            data["response"] = job["result"]
+        elif job["status"] == FAILED:
+            data["error"] = "查核失敗，請稍後再試"
+        elif job["status"] in (PENDING, RUNNING):
+            headers["Retry-After"] = str(POLL_INTERVAL_SECONDS)
+        return Response(data, status=status.HTTP_200_OK, headers=headers)
@@ -7,6 +7,7 @@ from rest_framework.permissions import IsAuthenticated
 
 from threads.interface.serializers.post_serializer import PostSerializer
 from .post_baseView import PostBaseView
+from threads.interface.util.async_api_view import AsyncAPIViewMixin
 
 from threads.infrastructure.repository.post_repository import PostRepositoryImpl
 from threads.use_cases.queries.get_post_by_id import GetPostById
@@ -79,15 +80,12 @@ from threads.interface.serializers.message_serializer import MessageSerializer
     )
 )
 @extend_schema(tags=["Post"]) 
-class PostDetailView(PostBaseView):
+class PostDetailView(AsyncAPIViewMixin, PostBaseView):
     permission_classes = [IsAuthenticated]
 
-    def _get_post_by_id(self, request, post_id):
-        return  GetPostById(PostRepositoryImpl()).execute(post_id, request.user.id)   
-
-    def get(self, request, post_id):
+    async def get(self, request, post_id):
         try:
-            domain_post =  self._get_post_by_id(request, post_id)
+            domain_post = await GetPostById(PostRepositoryImpl()).aexecute(post_id, request.user.id)
         except Exception as e:
             return self._handler_exception(e)
         serializers = PostSerializer(domain_post)
@@ -5,26 +5,36 @@ from rest_framework.permissions import IsAuthenticated
 
 from ...serializers.post_serializer import PostSerializer, CreatePostSerializer
 from .post_baseView import PostBaseView
-from threads.infrastructure.repository.user_repository import UserRepositoryImpl
 from threads.infrastructure.repository.post_repository import PostRepositoryImpl
+from threads.infrastructure.repository.timeline_repository import TimelineRepositoryImpl
+from threads.infrastructure.repository.trending_repository import TrendingRepositoryImpl
 
 
 from threads.use_cases.queries.get_profile_posts import GetProfilePost
-from threads.use_cases.queries.get_followings_posts import GetFollowingsPost
+from threads.use_cases.queries.get_home_timeline import GetHomeTimeline
+from threads.use_cases.queries.get_trending_posts import GetTrendingPosts
 from threads.use_cases.queries.get_all_posts import GetAllPost
-from threads.use_cases.queries.get_following_user_ids import GetFollowingUserIds
 from threads.use_cases.commands.create_post import CreatePost
+from threads.common.exceptions.use_case_exceptions import InvalidObject
 
+from threads.interface.util.cursor_pagination import parse_cursor_params, build_cursor_page
+from threads.interface.util.async_api_view import AsyncAPIViewMixin
 from threads.interface.util.dev_tool import extend_schema_view, extend_schema, OpenApiResponse, OpenApiExample
 # from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse, OpenApiExample, OpenApiRequest
 from threads.interface.serializers.message_serializer import MessageSerializer
 
 
+# 熱門動態一頁最多取回的貼文數，避免一次把整個排行讀出來
+TRENDING_MAX_PAGE_SIZE = 50
+
+
 @extend_schema_view(
 
     get=extend_schema(
         summary="取得貼文列表",
-        description="支援 author_id、following 篩選，可用 offset、limit 分頁，example: urls後面寫?author_id=1&following=true&offset=0&limit=5",        
+        description="支援 author_id、following 篩選，可用 offset、limit 分頁，example: urls後面寫?author_id=1&following=true&offset=0&limit=5；"
+                    "帶上 cursor 參數（第一頁傳空字串 ?cursor=&limit=5）即改用 cursor 分頁，回傳 results 與 next_cursor，下一頁帶回 next_cursor 即可；following=true 時依時間由新到舊排列；"
+                    "feed=trending 為熱門動態，依互動數與時間衰減後的分數排序，只支援 offset 分頁，limit 最多 50",        
         responses={
             200: OpenApiResponse(
                 description="使用者成功讀取貼文列表",
@@ -62,40 +72,55 @@ from threads.interface.serializers.message_serializer import MessageSerializer
     )
 )
 @extend_schema(tags=["Posts"]) 
-class PostListCreateView(PostBaseView):
+class PostListCreateView(AsyncAPIViewMixin, PostBaseView):
     permission_classes = [IsAuthenticated]
     
-    def get(self, request):
+    # 列表讀取是最熱的路徑，改為 async，ASGI 下等待資料庫與 Redis 時不佔住執行緒
+    async def get(self, request):
         auth_user_id = request.user.id
         author_id = request.query_params.get("author_id")
         following = request.query_params.get("following") == "true"
+        trending = request.query_params.get("feed") == "trending"
         offset = int(request.query_params.get("offset", 0))
         limit = int(request.query_params.get("limit", 10))
+        try:
+            cursor_mode, cursor = parse_cursor_params(request.query_params)
+        except Exception as e:
+            return self._handler_exception(e)
         
         repo = PostRepositoryImpl()
 
         if author_id:
             try:
-                domain_posts = GetProfilePost(repo).execute(auth_user_id, author_id, offset, limit)
+                domain_posts = await GetProfilePost(repo).aexecute(auth_user_id, author_id, offset, limit, cursor)
             except Exception as e:
                 return self._handler_exception(e)
         elif following:
+            # following 頁面改讀預先 fan-out 的 timeline（由新到舊），只需 ZREVRANGE 加一次批次取回貼文
             try:
-                following_ids = GetFollowingUserIds(UserRepositoryImpl()).execute(auth_user_id)
+                domain_posts = await GetHomeTimeline(TimelineRepositoryImpl(), repo).aexecute(auth_user_id, offset, limit, cursor)
             except Exception as e:
                 return self._handler_exception(e)
-            
+        elif trending:
+            # 熱門動態讀預先算好的排行（ZREVRANGE），排名會隨分數變動，沒有穩定的 cursor 可用
+            if cursor_mode:
+                return self._handler_exception(InvalidObject(message="熱門動態不支援 cursor 分頁，請改用 offset"))
+            if offset < 0 or limit < 1:
+                return self._handler_exception(InvalidObject(message="offset 不可小於 0，limit 至少為 1"))
+            limit = min(limit, TRENDING_MAX_PAGE_SIZE)
             try:
-                domain_posts = GetFollowingsPost(repo).execute(auth_user_id, following_ids, offset, limit)
+                domain_posts = await GetTrendingPosts(TrendingRepositoryImpl(), repo).aexecute(auth_user_id, offset, limit)
             except Exception as e:
                 return self._handler_exception(e)
         else:
             try:
-                domain_posts = GetAllPost(repo).execute(auth_user_id, offset, limit)
+                domain_posts = await GetAllPost(repo).aexecute(auth_user_id, offset, limit, cursor)
             except Exception as e:
                 return self._handler_exception(e)
          
         serializers = PostSerializer(domain_posts, many=True)
+        if cursor_mode:
+            return Response(build_cursor_page(serializers.data, domain_posts, limit), status=status.HTTP_200_OK)
         return Response(serializers.data, status=status.HTTP_200_OK)
     
     def post(self, request):
@@ -4,6 +4,7 @@ from rest_framework.permissions import AllowAny
 
 
 from .user_baseView import UserBaseView
+from threads.interface.util.async_api_view import AsyncAPIViewMixin
 from ...serializers.user_serializer import UserSerializer, RegisterUserSerializer
 
 
@@ -36,12 +37,12 @@ from threads.interface.serializers.message_serializer import MessageSerializer
     )
 )
 @extend_schema(tags=["User"])
-class UserDetailView(UserBaseView):
+class UserDetailView(AsyncAPIViewMixin, UserBaseView):
     permission_classes = [AllowAny]
 
-    def get(self, request, user_id):
+    async def get(self, request, user_id):
         try:
-            domain_user = GetUserProfile(UserRepositoryImpl()).execute(user_id)
+            domain_user = await GetUserProfile(UserRepositoryImpl()).aexecute(user_id)
             serializers = UserSerializer(domain_user)
         except Exception as e:
             return self._handler_exception(e)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from threads.infrastructure.fact_check_cache import FactCheckCache
+from threads.models import Post, Comment
+
+
+class Command(BaseCommand):
+    help = "清除事實查核結果快取，例如查核結論已過時或來源被更正時"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--post", type=int, action="append", default=[], help="清除此貼文內容的查核結果，可重複指定")
+        parser.add_argument("--comment", type=int, action="append", default=[], help="清除此留言內容的查核結果，可重複指定")
+        parser.add_argument("--content", action="append", default=[], help="直接指定要清除的內容文字")
+        parser.add_argument("--all", action="store_true", help="清除全部查核結果")
+
+    def handle(self, *args, **options):
+        cache = FactCheckCache()
+        if options["all"]:
+            deleted = cache.invalidate_all()
+            self.stdout.write(f"已清除 {deleted} 筆內容的查核結果")
+            return
+
+        contents = list(options["content"])
+        contents += self._load(Post, options["post"], "貼文")
+        contents += self._load(Comment, options["comment"], "留言")
+        if not contents:
+            raise CommandError("請指定 --post、--comment、--content 或 --all")
+
+        deleted = sum(cache.invalidate(content) for content in contents)
+        self.stdout.write(f"已清除 {deleted} 筆內容的查核結果（共指定 {len(contents)} 筆）")
+
+    def _load(self, model, ids, label):
+        if not ids:
+            return []
+        found = dict(model.objects.filter(id__in=ids).values_list("id", "content"))
+        missing = sorted(set(ids) - set(found))
+        if missing:
+            raise CommandError(f"{label}不存在: {', '.join(map(str, missing))}")
+        return list(found.values())
@@ -0,0 +1,334 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+OPERATIONS = ("feed", "following", "profile", "create_post", "like", "comment", "repost")
+DEFAULT_MIX = "feed=50,following=15,profile=10,create_post=5,like=10,comment=7,repost=3"
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+POST_POOL_SIZE = 500
+PAGE_SIZE = 20
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """把 "feed=50,like=10" 轉成權重表，未列出的操作權重為 0"""
+    mix = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, sep, weight = part.partition("=")
+        name = name.strip()
+        if not sep or name not in OPERATIONS:
+            raise CommandError(f"無法解析的操作比例: {part}，可用操作: {', '.join(OPERATIONS)}")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise CommandError(f"操作比例必須是整數: {part}")
+        if mix[name] < 0:
+            raise CommandError(f"操作比例不可為負數: {part}")
+    if sum(mix.values()) <= 0:
+        raise CommandError("操作比例總和必須大於 0")
+    return mix
+
+
+class LatencyStats:
+    """單一操作的延遲樣本與狀態碼統計"""
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self.errors = 0
+        self.statuses = Counter()
+
+    def record(self, elapsed_ms: float, status, ok: bool) -> None:
+        self.samples.append(elapsed_ms)
+        self.statuses[status] += 1
+        if not ok:
+            self.errors += 1
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, p: float) -> float:
+        """nearest-rank 百分位數，樣本數少時不內插，避免報出實際沒出現過的延遲"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, -(-len(ordered) * p // 100))
+        return ordered[int(rank) - 1]
+
+    def histogram(self, buckets=HISTOGRAM_BUCKETS_MS) -> List[Tuple[str, int]]:
+        """依上界分桶計數，最後一桶收超過最大上界的樣本"""
+        counts = [0] * (len(buckets) + 1)
+        for sample in self.samples:
+            counts[bisect_left(buckets, sample)] += 1
+        labels = [f"<= {bound}ms" for bound in buckets] + [f"> {buckets[-1]}ms"]
+        return list(zip(labels, counts))
+
+    def merge(self, other: "LatencyStats") -> None:
+        self.samples.extend(other.samples)
+        self.errors += other.errors
+        self.statuses.update(other.statuses)
+
+    def summary(self, elapsed_s: float) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "rps": round(self.count / elapsed_s, 2) if elapsed_s else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(max(self.samples), 2) if self.samples else 0.0,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items(), key=str)},
+            "histogram": dict(self.histogram()),
+        }
+
+
+@dataclass
+class VirtualUser:
+    id: int
+    username: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class LoadTestRunner:
+    """以固定數量的 worker 併發打 API，每個 worker 依權重隨機挑選操作"""
+
+    def __init__(self, base_url, users, password, mix, concurrency, duration, max_requests=None, timeout=10.0, seed=None):
+        self.base_url = base_url.rstrip("/")
+        self.users = [VirtualUser(id=user_id, username=username) for user_id, username in users]
+        self.password = password
+        self.operations = [name for name in OPERATIONS if mix.get(name)]
+        self.weights = [mix[name] for name in self.operations]
+        self.concurrency = concurrency
+        self.duration = duration
+        self.max_requests = max_requests
+        self.timeout = timeout
+        self.random = random.Random(seed)
+        self.stats: Dict[str, LatencyStats] = {}
+        # 從列表回應收集到的貼文 id，讓按讚、留言、轉發有對象可打
+        self.post_ids = deque(maxlen=POST_POOL_SIZE)
+        self._issued = 0
+        self.elapsed_s = 0.0
+
+    async def run(self) -> None:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            await self._authenticate(client)
+            await self._bootstrap(client)
+            deadline = time.monotonic() + self.duration
+            started = time.monotonic()
+            await asyncio.gather(*(self._worker(client, deadline) for _ in range(self.concurrency)))
+            self.elapsed_s = time.monotonic() - started
+
+    async def _authenticate(self, client) -> None:
+        async def fetch_token(user):
+            response = await client.post("/api/token/", json={"username": user.username, "password": self.password})
+            if response.status_code != 200:
+                raise CommandError(f"使用者 {user.username} 取得 JWT 失敗: {response.status_code} {response.text[:200]}")
+            user.headers = {"Authorization": f"Bearer {response.json()['access']}"}
+
+        await asyncio.gather(*(fetch_token(user) for user in self.users))
+
+    async def _bootstrap(self, client) -> None:
+        user = self.users[0]
+        self._collect_posts(await client.get("/api/threads/posts/", params={"cursor": "", "limit": 50}, headers=user.headers))
+        if self.post_ids:
+            return
+        # 空資料庫時先讓每個虛擬使用者發一篇，避免互動類操作全部落空
+        await asyncio.gather(*(
+            client.post("/api/threads/posts/", json={"author_id": u.id, "content": f"loadtest seed by {u.username}"}, headers=u.headers)
+            for u in self.users
+        ))
+        self._collect_posts(await client.get("/api/threads/posts/", params={"cursor": "", "limit": 50}, headers=user.headers))
+
+    def _collect_posts(self, response) -> None:
+        if response.status_code != 200:
+            return
+        body = response.json()
+        results = body["results"] if isinstance(body, dict) else body
+        self.post_ids.extend(post["id"] for post in results)
+
+    def _take_request_slot(self) -> bool:
+        if self.max_requests is not None and self._issued >= self.max_requests:
+            return False
+        self._issued += 1
+        return True
+
+    async def _worker(self, client, deadline: float) -> None:
+        while time.monotonic() < deadline and self._take_request_slot():
+            name = self.random.choices(self.operations, weights=self.weights)[0]
+            user = self.random.choice(self.users)
+            await getattr(self, f"_op_{name}")(client, user)
+
+    async def _timed(self, name, client, method, url, user, ok_statuses=None, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, headers=user.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.setdefault(name, LatencyStats()).record((time.perf_counter() - started) * 1000, type(e).__name__, False)
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        ok = response.status_code in ok_statuses if ok_statuses else response.status_code < 400
+        self.stats.setdefault(name, LatencyStats()).record(elapsed_ms, response.status_code, ok)
+        return response
+
+    def _pick_post(self) -> Optional[int]:
+        return self.random.choice(self.post_ids) if self.post_ids else None
+
+    async def _op_feed(self, client, user) -> None:
+        response = await self._timed("feed", client, "GET", "/api/threads/posts/", user, params={"cursor": "", "limit": PAGE_SIZE})
+        if response is not None:
+            self._collect_posts(response)
+
+    async def _op_following(self, client, user) -> None:
+        params = {"following": "true", "cursor": "", "limit": PAGE_SIZE}
+        response = await self._timed("following", client, "GET", "/api/threads/posts/", user, params=params)
+        if response is not None:
+            self._collect_posts(response)
+
+    async def _op_profile(self, client, user) -> None:
+        author = self.random.choice(self.users)
+        params = {"author_id": author.id, "cursor": "", "limit": PAGE_SIZE}
+        await self._timed("profile", client, "GET", "/api/threads/posts/", user, params=params)
+
+    async def _op_create_post(self, client, user) -> None:
+        body = {"author_id": user.id, "content": f"loadtest post {self.random.getrandbits(32):08x}"}
+        await self._timed("create_post", client, "POST", "/api/threads/posts/", user, json=body)
+
+    async def _op_like(self, client, user) -> None:
+        post_id = self._pick_post()
+        if post_id is None:
+            return await self._op_create_post(client, user)
+        url = f"/api/threads/posts/{post_id}/like"
+        # 已按過讚時回 406，改成收回讚，讓按讚/收回兩條路徑都有負載
+        response = await self._timed("like", client, "POST", url, user, ok_statuses={201, 406})
+        if response is not None and response.status_code == 406:
+            await self._timed("unlike", client, "DELETE", url, user)
+
+    async def _op_comment(self, client, user) -> None:
+        post_id = self._pick_post()
+        if post_id is None:
+            return await self._op_create_post(client, user)
+        body = {"author_id": user.id, "content": f"loadtest comment {self.random.getrandbits(32):08x}"}
+        await self._timed("comment", client, "POST", f"/api/threads/posts/{post_id}/comments", user, json=body)
+
+    async def _op_repost(self, client, user) -> None:
+        post_id = self._pick_post()
+        if post_id is None:
+            return await self._op_create_post(client, user)
+        body = {"author_id": user.id, "content": "loadtest repost", "target_type": "post", "target_post": post_id}
+        await self._timed("repost", client, "POST", f"/api/threads/posts/{post_id}/repost", user, json=body)
+
+    def report(self) -> dict:
+        total = LatencyStats()
+        for stats in self.stats.values():
+            total.merge(stats)
+        return {
+            "elapsed_s": round(self.elapsed_s, 2),
+            "concurrency": self.concurrency,
+            "users": len(self.users),
+            "total": total.summary(self.elapsed_s),
+            "operations": {name: stats.summary(self.elapsed_s) for name, stats in sorted(self.stats.items())},
+        }
+
+
+def provision_users(count: int, prefix: str, password: str) -> List[Tuple[int, str]]:
+    """建立（或重設密碼）壓測用帳號，並讓每人追蹤其他幾位，following 時間軸才有內容
+
+    註冊 API 只寫 hashed_password，無法透過 /api/token/ 登入，所以直接用 ORM 設定 Django 密碼。
+    """
+    from threads.models import User, Follow
+
+    users = []
+    for index in range(count):
+        username = f"{prefix}{index}"
+        user, _ = User.objects.get_or_create(username=username, defaults={"email": f"{username}@loadtest.local"})
+        user.set_password(password)
+        user.save(update_fields=["password"])
+        users.append((user.id, username))
+
+    follows = [
+        Follow(follower_id=follower_id, following_id=users[(index + offset) % count][0])
+        for index, (follower_id, _) in enumerate(users)
+        for offset in range(1, min(count, 6))
+    ]
+    Follow.objects.bulk_create(follows, ignore_conflicts=True)
+    return users
+
+
+class Command(BaseCommand):
+    help = "對執行中的 API 服務產生合成負載（讀取列表、發文、按讚、留言、轉發），輸出吞吐量與延遲分佈"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000", help="API 服務位址")
+        parser.add_argument("--users", type=int, default=20, help="虛擬使用者數量")
+        parser.add_argument("--user-prefix", default="loadtest", help="壓測帳號的 username 前綴，只能是英數字")
+        parser.add_argument("--password", default="loadtest-password", help="壓測帳號密碼")
+        parser.add_argument("--concurrency", type=int, default=20, help="同時進行中的請求數")
+        parser.add_argument("--duration", type=float, default=30.0, help="壓測秒數")
+        parser.add_argument("--requests", type=int, default=None, help="總請求數上限，達到即停止")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help=f"各操作權重，可用操作: {', '.join(OPERATIONS)}")
+        parser.add_argument("--timeout", type=float, default=10.0, help="單一請求逾時秒數")
+        parser.add_argument("--seed", type=int, default=None, help="亂數種子，方便重現相同的操作序列")
+        parser.add_argument("--json", dest="json_path", default=None, help="另外把結果寫成 JSON 檔")
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options["mix"])
+        # httpx 每個請求都會打一行 INFO log，壓測時會淹沒結果
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        if options["users"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--users 與 --concurrency 至少為 1")
+        if not options["user_prefix"].isalnum():
+            raise CommandError("--user-prefix 只能包含英數字")
+
+        users = provision_users(options["users"], options["user_prefix"], options["password"])
+        runner = LoadTestRunner(
+            base_url=options["base_url"],
+            users=users,
+            password=options["password"],
+            mix=mix,
+            concurrency=options["concurrency"],
+            duration=options["duration"],
+            max_requests=options["requests"],
+            timeout=options["timeout"],
+            seed=options["seed"],
+        )
+        try:
+            asyncio.run(runner.run())
+        except httpx.HTTPError as e:
+            raise CommandError(f"無法連線到 {options['base_url']}: {e}")
+
+        report = runner.report()
+        self._print_report(report)
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+    def _print_report(self, report: dict) -> None:
+        total = report["total"]
+        self.stdout.write(
+            f"{report['elapsed_s']}s，{report['users']} 位使用者，併發 {report['concurrency']}："
+            f"{total['count']} 個請求，{total['rps']} req/s，錯誤 {total['errors']}"
+        )
+        self.stdout.write(f"{'operation':<12}{'count':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        for name, summary in report["operations"].items():
+            self.stdout.write(
+                f"{name:<12}{summary['count']:>8}{summary['errors']:>6}{summary['rps']:>9}"
+                f"{summary['p50_ms']:>9}{summary['p95_ms']:>9}{summary['p99_ms']:>9}{summary['max_ms']:>9}"
+            )
+
+        self.stdout.write("\n延遲分佈（全部請求）")
+        histogram = total["histogram"]
+        peak = max(histogram.values()) or 1
+        for label, count in histogram.items():
+            self.stdout.write(f"{label:>10} {count:>8} {'#' * round(40 * count / peak)}")
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from threads.infrastructure.fact_check_prewarm import prewarm_fact_checks
+
+
+class Command(BaseCommand):
+    help = "替近期最熱門的貼文預先執行事實查核，結果寫入查核快取"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=settings.FACT_CHECK_PREWARM_LIMIT, help="查核的貼文數")
+        parser.add_argument("--window-hours", type=float, default=settings.FACT_CHECK_PREWARM_WINDOW_HOURS,
+                            help="只看這段時間內發佈的貼文")
+        parser.add_argument("--concurrency", type=int, default=settings.FACT_CHECK_PREWARM_CONCURRENCY,
+                            help="同時進行的查核數")
+        parser.add_argument("--async", dest="enqueue", action="store_true", help="送到 Celery 執行，不在這裡等待")
+
+    def handle(self, *args, **options):
+        if options["limit"] < 1 or options["concurrency"] < 1 or options["window_hours"] <= 0:
+            raise CommandError("--limit、--concurrency 至少為 1，--window-hours 需大於 0")
+
+        if options["enqueue"]:
+            from threads.tasks import prewarm_fact_checks as task
+
+            result = task.delay(options["limit"], options["window_hours"], options["concurrency"])
+            self.stdout.write(f"已送出預熱任務 {result.id}")
+            return
+
+        stats = prewarm_fact_checks(options["limit"], options["window_hours"], options["concurrency"])
+        self.stdout.write(
+            f"{stats['selected']} 篇熱門貼文：已在快取 {stats['cached']}、新查核 {stats['checked']}、"
+            f"名額已滿略過 {stats['busy']}、失敗 {stats['failed']}，耗時 {stats['elapsed_ms']}ms"
+        )
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:28
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # app_post / app_comment 資料量大，CREATE INDEX CONCURRENTLY 建索引期間不擋寫入；
+    # CONCURRENTLY 不能在交易內執行，所以整個 migration 不包交易
+    atomic = False
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('threads', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['parent_post', 'created_at', 'id'], name='comment_post_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['parent_comment', 'created_at', 'id'], name='comment_parent_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['author', 'created_at', 'id'], name='post_author_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['created_at', 'id'], name='post_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    # 之前沒有任何地方寫這兩個欄位，依現有的追蹤關係補上；之後由 Follow 的 signal 維護
+    User = apps.get_model('threads', 'User')
+    Follow = apps.get_model('threads', 'Follow')
+
+    def counted(field):
+        return Coalesce(Subquery(
+            Follow.objects
+            .filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ), Value(0))
+
+    User.objects.update(
+        followers_count=counted('following'),
+        followings_count=counted('follower'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('threads', '0002_list_access_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
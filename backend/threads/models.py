@@ -70,7 +70,10 @@ class Post(ContentItem):
         db_table = 'app_post'
         ordering = ['-created_at']
         indexes =[
-            models.Index(fields=['repost_of_content_type','repost_of_content_item_id'])
+            models.Index(fields=['repost_of_content_type','repost_of_content_item_id']),
+            # 列表都以 (created_at, id) 排序與 keyset 分頁，作者頁與追蹤動態再加上 author 篩選
+            models.Index(fields=['author', 'created_at', 'id'], name='post_author_created_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='post_created_id_idx'),
         ]
 class Comment(ContentItem):
     repost_of_content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True, limit_choices_to=CONTENT_TYPE_LIMIT)
@@ -84,7 +87,9 @@ class Comment(ContentItem):
         db_table = 'app_comment'
         ordering = ['-created_at']
         indexes =[
-            models.Index(fields=['repost_of_content_type','repost_of_content_item_id'])
+            models.Index(fields=['repost_of_content_type','repost_of_content_item_id']),
+            models.Index(fields=['parent_post', 'created_at', 'id'], name='comment_post_created_id_idx'),
+            models.Index(fields=['parent_comment', 'created_at', 'id'], name='comment_parent_created_id_idx'),
         ]
 
 
@@ -1,13 +1,8 @@
 # core/tasks.py
 from celery import shared_task
-from django.db.models import F
-from threads.infrastructure.cache import redis_client
 
 from celery.utils.log import get_task_logger
 logger = get_task_logger(__name__)
-from redis.lock import Lock
-
-LOCK_KEY = "lock:flush_comment_counts"
 
 @shared_task
 def add(x, y):
@@ -15,51 +10,126 @@ def add(x, y):
 
 
 
+FLUSH_SCHEDULED_KEY = "counters:flush_scheduled"
+
+
+def schedule_counter_flush():
+    """同一個時間窗內最多只有一個待執行的 flush，寫入再多也只送一則 broker 訊息"""
+    from django.conf import settings
+    from threads.infrastructure.cache import redis_client
+
+    window = settings.COUNTER_FLUSH_INTERVAL_SECONDS
+    # token 由 flush 開始時清掉；任務遺失時靠過期時間和 beat 補跑兜底
+    if redis_client.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=window * 2):
+        flush_counters.apply_async(countdown=window)
+
+
+@shared_task
+def flush_counters():
+    from threads.infrastructure.cache import redis_client
+    from threads.infrastructure.counters import flush_counters as flush
+
+    # 先清 token 再取待處理的列，flush 進行中的新寫入會排下一輪
+    redis_client.delete(FLUSH_SCHEDULED_KEY)
+    stats = flush()
+    logger.info(
+        "Flush counters: %s keys, %s rows in %sms", stats["keys"], stats["rows"], stats["elapsed_ms"]
+    )
+    return stats
+
+
+# 舊的任務名稱保留給 broker 裡尚未消化的訊息，一律改走 flush_counters
 @shared_task
 def flush_comment_counts():
-    from threads.models import Post, Comment
-
-    with redis_client.lock(LOCK_KEY, timeout=10):
-        for key in redis_client.scan_iter(match="post:*"):
-            logger.info("Flush sees key %s", key)
-            post_id = key.decode().split(":", 1)[1]
-            delta = int(redis_client.hget(key, "comments_count") or 0)
-            if delta:
-                Post.objects.filter(id=post_id).update(
-                    comments_count=F("comments_count") + delta
-                )
-                redis_client.hdel(key, "comments_count") # 重置或刪除計數欄位
-
-        
-        for key in redis_client.scan_iter(match="comment:*"):
-            logger.info("Flush sees key %s", key)
-            comment_id = key.decode().split(":", 1)[1]
-            delta = int(redis_client.hget(key, "comments_count") or 0)
-            if delta:
-                Comment.objects.filter(id=comment_id).update(
-                    comments_count=F("comments_count") + delta
-                )
-                redis_client.hdel(key, "comments_count")
+    return flush_counters()
 
 @shared_task
 def flush_repost_counts():
-    from threads.models import Post, Comment
-
-    with redis_client.lock(LOCK_KEY, timeout=10):
-        for key in redis_client.scan_iter(match="post:*"):
-            post_id = key.decode().split(":", 1)[1]
-            delta = int(redis_client.hget(key, "reposts_count") or 0)
-            if delta:
-                Post.objects.filter(id=post_id).update(
-                    reposts_count = F("reposts_count") + delta
-                )
-                redis_client.hdel(key, "reposts_count")
-        
-        for key in redis_client.scan_iter(match="comment:*"):
-            comment_id = key.decode().split(":", 1)[1]
-            delta = int(redis_client.hget(key, "reposts_count") or 0)
-            if delta:
-                Comment.objects.filter(id=comment_id).update(
-                    reposts_count = F("reposts_count") + delta
-                )
-                redis_client.hdel(key, "reposts_count")
+    return flush_counters()
+
+@shared_task
+def flush_like_counts():
+    return flush_counters()
+
+
+@shared_task
+def fan_out_post_to_timelines(author_id, post_id, created_at_ts):
+    from datetime import datetime, timezone
+    from threads.infrastructure.repository.timeline_repository import TimelineRepositoryImpl
+
+    created_at = datetime.fromtimestamp(created_at_ts, tz=timezone.utc)
+    added = TimelineRepositoryImpl().fan_out_post(author_id, post_id, created_at)
+    logger.info("Fan-out post %s of author %s to %s timelines", post_id, author_id, added)
+
+
+@shared_task
+def remove_post_from_timelines(author_id, post_id):
+    from threads.infrastructure.repository.timeline_repository import TimelineRepositoryImpl
+
+    TimelineRepositoryImpl().remove_post(author_id, post_id)
+
+
+@shared_task
+def rebuild_trending():
+    from threads.infrastructure.repository.trending_repository import TrendingRepositoryImpl
+
+    count = TrendingRepositoryImpl().rebuild()
+    logger.info("Rebuild trending: %s posts", count)
+    return count
+
+
+@shared_task
+def remove_post_from_trending(post_id):
+    from threads.infrastructure.repository.trending_repository import TrendingRepositoryImpl
+
+    TrendingRepositoryImpl().remove_post(post_id)
+
+
+@shared_task(bind=True, soft_time_limit=120, max_retries=10)
+def run_fact_check_job(self, job_id):
+    from threads.infrastructure.fact_check_jobs import FactCheckJobStore
+    from threads.infrastructure.fact_check_cache import fact_check_with_cache
+    from threads.infrastructure.rate_limit import CapacityExceeded
+
+    store = FactCheckJobStore()
+    job = store.get(job_id)
+    if job is None:
+        # 已過期或被刪除，沒有人會來拿結果
+        logger.warning("Fact-check job %s not found", job_id)
+        return
+
+    store.mark_running(job_id)
+    try:
+        result = fact_check_with_cache(job["content"], job["prompt"])
+    except CapacityExceeded as e:
+        # LLM 名額已滿時排回佇列稍後再跑，前端繼續看到 pending
+        if self.request.retries < self.max_retries:
+            store.mark_pending(job_id)
+            raise self.retry(countdown=e.retry_after)
+        store.mark_failed(job_id, type(e).__name__)
+        return
+    except Exception as e:
+        logger.exception("Fact-check job %s failed", job_id)
+        store.mark_failed(job_id, type(e).__name__)
+        return
+    store.mark_done(job_id, result)
+
+
+@shared_task
+def prewarm_fact_checks(limit=None, window_hours=None, concurrency=None):
+    from django.conf import settings
+    from threads.infrastructure.fact_check_prewarm import prewarm_fact_checks as prewarm
+
+    limit = settings.FACT_CHECK_PREWARM_LIMIT if limit is None else limit
+    if limit <= 0:
+        return None
+    stats = prewarm(
+        limit,
+        settings.FACT_CHECK_PREWARM_WINDOW_HOURS if window_hours is None else window_hours,
+        settings.FACT_CHECK_PREWARM_CONCURRENCY if concurrency is None else concurrency,
+    )
+    logger.info(
+        "Prewarm fact checks: %s selected, %s cached, %s checked, %s busy, %s failed in %sms",
+        stats["selected"], stats["cached"], stats["checked"], stats["busy"], stats["failed"], stats["elapsed_ms"],
+    )
+    return stats
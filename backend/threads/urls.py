@@ -18,6 +18,7 @@ from .interface.views.likes.like_view import LikeContentView
 from .interface.util.ask_gpt import AskGPTView
 from .interface.views.fact_checks.post_fact_check_view import PostFactCheckView
 from .interface.views.fact_checks.comment_fact_check_view import CommentFactCheckView
+from .interface.views.fact_checks.fact_check_job_view import FactCheckJobView
 
 urlpatterns = [
     path('users/', UserCreateView.as_view(), name='user_register'),
@@ -48,5 +49,6 @@ urlpatterns = [
 
     # path('gpt/', AskGPTView.as_view(), name="test_api"),
     path('posts/<int:post_id>/factCheck' , PostFactCheckView.as_view(), name="post_fact_check_with_ai"),
-    path('comments/<int:comment_id>/factCheck', CommentFactCheckView.as_view(), name="comment_fact_check_with_ai")
+    path('comments/<int:comment_id>/factCheck', CommentFactCheckView.as_view(), name="comment_fact_check_with_ai"),
+    path('factCheck/jobs/<str:job_id>', FactCheckJobView.as_view(), name="fact_check_job")
 ]
\ No newline at end of file
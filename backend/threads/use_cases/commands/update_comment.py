@@ -30,6 +30,8 @@ class UpdateComment:
 
         try:
             return self.comment_repository.update_comment(old_domain_comment)
+        except EntityDoesNotExist as e:
+            raise NotFound(message=e.message)
         except EntityOperationFailed as e:
             raise ServiceUnavailable(message=e.message)
         except InvalidEntityInput as e:
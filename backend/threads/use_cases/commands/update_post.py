@@ -30,6 +30,8 @@ class UpdatePost:
         
         try:
             return self.post_repository.update_post(old_domain_post)
+        except EntityDoesNotExist as e:
+            raise NotFound(message=e.message)
         except EntityOperationFailed as e:
             raise ServiceUnavailable(message=e.message)
         except InvalidEntityInput as e:
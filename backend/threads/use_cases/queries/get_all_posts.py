@@ -1,6 +1,7 @@
 from threads.domain.repository import PostRepository
 from threads.domain.entities import Post as DomainPost
-from typing import List
+from typing import List, Optional
+from threads.domain.pagination import PageCursor
 
 from threads.common.exceptions.repository_exceptions import EntityOperationFailed, InvalidEntityInput
 from threads.common.exceptions.use_case_exceptions import ServiceUnavailable, InvalidObject
@@ -9,9 +10,17 @@ class GetAllPost:
     def __init__(self, post_repository: PostRepository):
         self.post_repository = post_repository
     
-    def execute(self,auth_user_id:int, offset:int, limit:int) -> List[DomainPost]:
+    def execute(self,auth_user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
         try: 
-            return self.post_repository.get_all_posts(auth_user_id, offset, limit)
+            return self.post_repository.get_all_posts(auth_user_id, offset, limit, cursor)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+        except InvalidEntityInput as e:
+            raise InvalidObject(message=e.message)
+
+    async def aexecute(self,auth_user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
+        try:
+            return await self.post_repository.aget_all_posts(auth_user_id, offset, limit, cursor)
         except EntityOperationFailed as e:
             raise ServiceUnavailable(message=e.message)
         except InvalidEntityInput as e:
@@ -1,7 +1,8 @@
 from threads.domain.repository import CommentRepository
 from threads.domain.entities import Comment as DomainComment
 
-from typing import List
+from typing import List, Optional
+from threads.domain.pagination import PageCursor
 
 
 from threads.common.exceptions.repository_exceptions import EntityDoesNotExist, EntityOperationFailed, InvalidEntityInput, InvalidOperation
@@ -12,7 +13,7 @@ class GetChildCommentsByCommentId:
     def __init__(self, comment_repository: CommentRepository):
         self.comment_repository = comment_repository
 
-    def execute(self,comment_id:int, auth_user_id:int, offset:int, limit:int)  -> List[DomainComment]:
+    def execute(self,comment_id:int, auth_user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None)  -> List[DomainComment]:
 
         try:
             domain_comment = self.comment_repository.get_comment_by_id(comment_id=comment_id,auth_user_id=auth_user_id)
@@ -26,7 +27,7 @@ class GetChildCommentsByCommentId:
             raise InvalidObject(message=e.message)
         
         try:
-            return self.comment_repository.get_all_child_comments_by_comment_id(auth_user_id, domain_comment, offset, limit)
+            return self.comment_repository.get_all_child_comments_by_comment_id(auth_user_id, domain_comment, offset, limit, cursor)
         except EntityOperationFailed as e:
             raise ServiceUnavailable(message=e.message)
         except InvalidEntityInput as e:
@@ -1,6 +1,7 @@
 from threads.domain.repository import CommentRepository
 from threads.domain.entities import Comment as DomainComment
-from typing import List
+from typing import List, Optional
+from threads.domain.pagination import PageCursor
 
 
 from threads.common.exceptions.repository_exceptions import EntityDoesNotExist, EntityOperationFailed, InvalidEntityInput
@@ -9,9 +10,19 @@ class GetCommentsByPostId:
     def __init__(self, comment_repository: CommentRepository):
         self.comment_repository = comment_repository
     
-    def execute(self,auth_user_id:int, post_id:int, offset:int, limit:int) -> List[DomainComment]:
+    def execute(self,auth_user_id:int, post_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainComment]:
         try:
-            return self.comment_repository.get_comments_by_post_id(auth_user_id, post_id, offset, limit)
+            return self.comment_repository.get_comments_by_post_id(auth_user_id, post_id, offset, limit, cursor)
+        except EntityDoesNotExist as e:
+            raise NotFound(message=e.message)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+        except InvalidEntityInput as e:
+            raise InvalidObject(message=e.message)
+
+    async def aexecute(self,auth_user_id:int, post_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainComment]:
+        try:
+            return await self.comment_repository.aget_comments_by_post_id(auth_user_id, post_id, offset, limit, cursor)
         except EntityDoesNotExist as e:
             raise NotFound(message=e.message)
         except EntityOperationFailed as e:
@@ -1,6 +1,7 @@
 from threads.domain.repository import PostRepository
 from threads.domain.entities import Post as DomainPost
-from typing import List
+from typing import List, Optional
+from threads.domain.pagination import PageCursor
 
 from threads.common.exceptions.repository_exceptions import EntityOperationFailed, InvalidEntityInput
 from threads.common.exceptions.use_case_exceptions import ServiceUnavailable, InvalidObject
@@ -9,9 +10,9 @@ class GetFollowingsPost:
     def __init__(self, post_repository: PostRepository):
         self.post_repository = post_repository
     
-    def execute(self,auth_user_id:int, following_ids:List[int], offset:int, limit:int) -> List[DomainPost]:
+    def execute(self,auth_user_id:int, following_ids:List[int], offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
         try:
-            return self.post_repository.get_posts_by_following_ids(auth_user_id, following_ids, offset, limit)
+            return self.post_repository.get_posts_by_following_ids(auth_user_id, following_ids, offset, limit, cursor)
         except EntityOperationFailed as e:
             raise ServiceUnavailable(message=e.message)
         except InvalidEntityInput as e:
@@ -0,0 +1,38 @@
+from threads.domain.repository import PostRepository, TimelineRepository
+from threads.domain.entities import Post as DomainPost
+from threads.domain.pagination import PageCursor
+from typing import List, Optional
+
+from threads.common.exceptions.repository_exceptions import EntityOperationFailed, InvalidEntityInput
+from threads.common.exceptions.use_case_exceptions import ServiceUnavailable, InvalidObject
+
+class GetHomeTimeline:
+    def __init__(self, timeline_repository: TimelineRepository, post_repository: PostRepository):
+        self.timeline_repository = timeline_repository
+        self.post_repository = post_repository
+    
+    def execute(self, auth_user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
+        try:
+            post_ids = self.timeline_repository.get_post_ids(auth_user_id, offset, limit, cursor)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+
+        try:
+            return self.post_repository.get_posts_by_ids(auth_user_id, post_ids)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+        except InvalidEntityInput as e:
+            raise InvalidObject(message=e.message)
+
+    async def aexecute(self, auth_user_id:int, offset:int, limit:int, cursor:Optional[PageCursor] = None) -> List[DomainPost]:
+        try:
+            post_ids = await self.timeline_repository.aget_post_ids(auth_user_id, offset, limit, cursor)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+
+        try:
+            return await self.post_repository.aget_posts_by_ids(auth_user_id, post_ids)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+        except InvalidEntityInput as e:
+            raise InvalidObject(message=e.message)
\ No newline at end of file
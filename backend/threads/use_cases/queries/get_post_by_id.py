@@ -16,5 +16,15 @@ class GetPostById:
             raise NotFound(message=e.message)
         except EntityOperationFailed as e:
             raise ServiceUnavailable(message=e.message)
+        except InvalidEntityInput as e:
+            raise InvalidObject(message=e.message)
+
+    async def aexecute(self, post_id:int, auth_user_id:int) -> Optional[DomainPost]:
+        try:
+            return await self.post_repository.aget_post_by_id(post_id, auth_user_id)
+        except EntityDoesNotExist as e:
+            raise NotFound(message=e.message)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
         except InvalidEntityInput as e:
             raise InvalidObject(message=e.message)
\ No newline at end of file
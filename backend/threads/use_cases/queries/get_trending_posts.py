@@ -0,0 +1,37 @@
+from threads.domain.repository import PostRepository, TrendingRepository
+from threads.domain.entities import Post as DomainPost
+from typing import List
+
+from threads.common.exceptions.repository_exceptions import EntityOperationFailed, InvalidEntityInput
+from threads.common.exceptions.use_case_exceptions import ServiceUnavailable, InvalidObject
+
+class GetTrendingPosts:
+    def __init__(self, trending_repository: TrendingRepository, post_repository: PostRepository):
+        self.trending_repository = trending_repository
+        self.post_repository = post_repository
+
+    def execute(self, auth_user_id:int, offset:int, limit:int) -> List[DomainPost]:
+        try:
+            post_ids = self.trending_repository.get_post_ids(offset, limit)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+
+        try:
+            return self.post_repository.get_posts_by_ids(auth_user_id, post_ids)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+        except InvalidEntityInput as e:
+            raise InvalidObject(message=e.message)
+
+    async def aexecute(self, auth_user_id:int, offset:int, limit:int) -> List[DomainPost]:
+        try:
+            post_ids = await self.trending_repository.aget_post_ids(offset, limit)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+
+        try:
+            return await self.post_repository.aget_posts_by_ids(auth_user_id, post_ids)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
+        except InvalidEntityInput as e:
+            raise InvalidObject(message=e.message)
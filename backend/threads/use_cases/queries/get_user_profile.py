@@ -16,5 +16,15 @@ class GetUserProfile:
             raise NotFound(message=e.message)
         except EntityOperationFailed as e:
             raise ServiceUnavailable(message=e.message)
+        except InvalidEntityInput as e:
+            raise InvalidObject(message=e.message)
+
+    async def aexecute(self, user_id: int) -> Optional[DomainUser]:
+        try:
+            return await self.user_repository.aget_user_by_id(user_id)
+        except EntityDoesNotExist as e:
+            raise NotFound(message=e.message)
+        except EntityOperationFailed as e:
+            raise ServiceUnavailable(message=e.message)
         except InvalidEntityInput as e:
             raise InvalidObject(message=e.message)
\ No newline at end of file